@@ -1,18 +1,430 @@
-from openai import OpenAI
 import json
+import time
+import openai
+from src import metrics
+from src.catalog_encoder import CatalogEncoder
+from src.catalog_resolver import etf_resolver, name_resolver
+from src.json_repair import MemberScanner, loads as repair_loads, strip_fences
+from src.etf_retriever import ETFRetriever
+from src.llm_cache import LLMResponseCache, fingerprint
+from src.llm_client import LLMClient
+from src.rate_limiter import RateLimiter
+from src.relevance_gate import RelevanceGate
+from src.sector_groups import SectorGroups
+from src.text_index import NgramIndex, tokenize
 from src.utils import load_config, setup_logger
 
 logger = setup_logger('ETFAnalyzer')
 
+# Bump whenever a prompt template changes, so cached responses are not reused
+PROMPT_VERSION = 4
+
+# Completion budget reserved per request by the tokens-per-minute limiter
+ESTIMATED_COMPLETION_TOKENS = 300
+
+# Top-level keys each prompt asks for; a streamed reply is cut off once all have parsed
+REQUIRED_KEYS = {
+    'sector_groups': ('groups',),
+    'keywords': ('summary', 'keywords'),
+    'sectors': ('sectors', 'concepts'),
+    'etfs': ('summary', 'etf_codes'),
+    'all': ('summary', 'etf_codes', 'sectors', 'concepts'),
+}
+
+
+def catalog_section(title, entries, separator='\n'):
+    """
+    Format a candidate catalog for the static prompt prefix.
+
+    Prompts put instructions and catalogs first and the tweet last, so providers
+    with prefix caching (DeepSeek, OpenAI) can reuse the prefix across tweets.
+    Callers must pass entries in a deterministic order; the content version
+    makes a catalog change visible in logs and prompts.
+    """
+    return f"{title}（目录版本 {fingerprint(entries)}）：\n{separator.join(entries)}"
+
+
 class ETFAnalyzer:
     def __init__(self):
         config = load_config()
         llm_conf = config.get('llm_config', {})
-        self.client = OpenAI(
-            base_url=llm_conf.get('api_base'),
-            api_key=llm_conf.get('api_key')
+        # Timeouts, retries, circuit breaking and failover to llm_config_fallback
+        self.client = LLMClient(config)
+        self.model = self.client.model
+        # Ask for a JSON object (response_format) and stream, stopping once the needed keys parse;
+        # each is switched off on its own if the endpoint rejects it
+        self.json_mode = llm_conf.get('json_mode', True)
+        self.stream = llm_conf.get('stream', True)
+        # One call per tweet for summary, ETFs, sectors and concepts
+        self.combined_analysis = llm_conf.get('combined_analysis', False)
+        # Tweets are analyzed by up to max_concurrency threads sharing one rate limiter
+        self.max_concurrency = llm_conf.get('max_concurrency', 4)
+        self.rate_limiter = RateLimiter(
+            llm_conf.get('requests_per_minute', 0),
+            llm_conf.get('tokens_per_minute', 0)
+        )
+        # Offline top-K retrieval, so prompts only carry likely ETF candidates
+        retrieval_conf = config.get('etf_retrieval', {})
+        self.etf_retriever = ETFRetriever(retrieval_conf) if retrieval_conf.get('enabled', True) else None
+        # Its synonym table also ranks sectors/concepts locally
+        self.theme_expander = self.etf_retriever or ETFRetriever(retrieval_conf)
+        # Coarse-to-fine sector/concept selection: theme groups first, then their members
+        selection_conf = config.get('sector_selection', {})
+        self.sector_selection = selection_conf.get('mode', 'grouped')
+        self.max_sector_groups = selection_conf.get('max_groups', 4)
+        self.sector_stage2 = selection_conf.get('stage2', 'llm')
+        self.sector_groups = SectorGroups(selection_conf) if self.sector_selection == 'grouped' else None
+        # Theme-grouped ETF IDs (and optionally sector/concept IDs) keep catalogs short
+        encoding_conf = config.get('catalog_encoding', {})
+        self.catalog_encoder = CatalogEncoder(encoding_conf) if encoding_conf.get('enabled', True) else None
+        # Near-miss names/codes from the LLM are mapped back onto the catalogs
+        self.resolver_min_score = config.get('catalog_resolver', {}).get('min_score', 0.5)
+        self._names_cache = {}  # {kind: (catalog list, length, names)}, see _catalog_names
+        # Cheap local pre-filter; tweets it rejects never reach the LLM
+        gate_conf = config.get('relevance_gate', {})
+        self.relevance_gate = RelevanceGate(gate_conf) if gate_conf.get('enabled', True) else None
+        cache_conf = config.get('llm_cache', {})
+        self.response_cache = LLMResponseCache(cache_conf) if cache_conf.get('enabled', True) else None
+
+    def _chat_json(self, system_prompt, prompt, cache=None):
+        """
+        Send one chat completion and parse the JSON object in its reply.
+
+        Args:
+            system_prompt: System message
+            prompt: User message
+            cache: Optional (method, tweet_text, candidates) tuple; parsed replies are
+                cached under it and a hit skips the network call
+
+        Returns:
+            Parsed JSON value
+
+        Raises:
+            json.JSONDecodeError: If the reply holds no JSON, even after repair (the raw reply is in `e.doc`)
+        """
+        method = cache[0] if cache is not None else 'chat'
+        cache_key = None
+        if cache is not None and self.response_cache is not None:
+            _, tweet_text, candidates = cache
+            cache_key = self.response_cache.make_key(method, tweet_text, self.model, PROMPT_VERSION, candidates)
+        if cache_key is not None:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                metrics.increment('llm_cache_hits')
+                metrics.record_call(method=method, model=self.model, parse='cache_hit')
+                logger.info(f"LLM response for '{method}' served from cache")
+                return cached
+            metrics.increment('llm_cache_misses')
+
+        # Rough estimate (about 2 characters per token) until the provider reports usage
+        estimated_tokens = (len(system_prompt) + len(prompt)) // 2 + ESTIMATED_COMPLETION_TOKENS
+        queued_at = time.monotonic()
+        self.rate_limiter.acquire(estimated_tokens)
+        started_at = time.monotonic()
+        metrics.observe('llm_queue_seconds', started_at - queued_at, method=method)
+
+        metrics.increment('llm_calls')
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        try:
+            content, usage, ttft = self._complete_with_fallback(messages, REQUIRED_KEYS.get(method))
+        except Exception:
+            metrics.record_call(method=method, model=self.model, parse='error',
+                                latency_seconds=round(time.monotonic() - started_at, 3),
+                                retries=self.client.last_call['retries'])
+            raise
+
+        latency = time.monotonic() - started_at
+        metrics.observe('llm_latency_seconds', latency, method=method)
+        if ttft is not None:
+            metrics.observe('llm_ttft_seconds', ttft, method=method)
+        tokens = self._log_usage(usage)
+        if usage is not None:
+            actual_tokens = usage.total_tokens
+        else:
+            # Cut-off stream: the received text is a better guess than the reserved budget
+            actual_tokens = (len(system_prompt) + len(prompt) + len(content)) // 2
+        self.rate_limiter.settle(estimated_tokens, actual_tokens)
+
+        parse = 'ok'
+        try:
+            try:
+                result = json.loads(strip_fences(content))
+            except json.JSONDecodeError:
+                # Trailing commas, prose around the object, a truncated reply...
+                result = repair_loads(content)
+                parse = 'repaired'
+                metrics.increment('llm_json_repaired')
+                logger.warning(f"Repaired malformed LLM JSON response: {content[:200]}")
+        except json.JSONDecodeError:
+            parse = 'failed'
+            metrics.increment('llm_json_failures')
+            raise
+        finally:
+            metrics.record_call(
+                method=method, parse=parse, latency_seconds=round(latency, 3),
+                ttft_seconds=round(ttft, 3) if ttft is not None else None,
+                queue_seconds=round(started_at - queued_at, 3), **self.client.last_call, **tokens
+            )
+        if cache_key is not None:
+            self.response_cache.put(cache_key, result)
+        return result
+
+    def _complete_with_fallback(self, messages, required=None):
+        """
+        Run _complete, switching off only the capability a rejected request names.
+
+        Older or self-hosted endpoints may not support response_format or
+        stream_options; each is disabled separately once the endpoint reports it.
+        Any other BadRequestError is re-raised.
+
+        Args:
+            messages: Chat messages
+            required: Optional top-level keys, passed on to _complete
+
+        Returns:
+            Tuple of (content, usage, ttft) as from _complete
+        """
+        json_mode, stream = self.json_mode, self.stream
+        while True:
+            try:
+                return self._complete(messages, json_mode, stream, required)
+            except openai.BadRequestError as e:
+                message = str(e)
+                if json_mode and 'response_format' in message:
+                    json_mode = self.json_mode = False
+                    logger.warning(f"LLM endpoint rejected response_format ({e}), requesting plain JSON text")
+                elif stream and 'stream_options' in message:
+                    stream = self.stream = False
+                    logger.warning(f"LLM endpoint rejected stream_options ({e}), using non-streaming completions")
+                else:
+                    raise
+
+    def _complete(self, messages, json_mode, stream, required=None):
+        """
+        Run one chat completion and return its text.
+
+        When streaming, each chunk is fed to a MemberScanner, so the reply is
+        scanned once. Reading stops as soon as every required key has parsed (the
+        reply is then rebuilt from the parsed members) or at the first non-trivial
+        output after the object has closed; a reply that ends cleanly is read to
+        the end to pick up the usage chunk.
+
+        Args:
+            messages: Chat messages
+            json_mode: Request a JSON object via response_format
+            stream: Stream the completion
+            required: Optional top-level keys that make the reply usable
+
+        Returns:
+            Tuple of (content, usage, ttft): usage is None if the stream was cut short,
+            ttft (seconds to the first content token) None when not streaming
+        """
+        started_at = time.monotonic()
+        kwargs = {'temperature': 0.3}
+        if json_mode:
+            kwargs['response_format'] = {'type': 'json_object'}
+        if not stream:
+            response = self.client.chat(messages=messages, **kwargs)
+            return response.choices[0].message.content or '', response.usage, None
+
+        response = self.client.chat(messages=messages, stream=True,
+                                    stream_options={'include_usage': True}, **kwargs)
+        parts = []
+        usage = None
+        ttft = None
+        scanner = MemberScanner()
+        try:
+            for chunk in response:
+                if getattr(chunk, 'usage', None):
+                    usage = chunk.usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if not delta:
+                    continue
+                if ttft is None:
+                    ttft = time.monotonic() - started_at
+                if scanner.closed:
+                    if delta.strip().strip('`'):
+                        metrics.increment('llm_stream_early_stops')
+                        return ''.join(parts), None, ttft
+                    continue
+                parts.append(delta)
+                scanner.feed(delta)
+                if required and not scanner.closed and all(key in scanner.members for key in required):
+                    metrics.increment('llm_stream_early_stops')
+                    return json.dumps(scanner.members, ensure_ascii=False), None, ttft
+        finally:
+            response.close()
+        return ''.join(parts), usage, ttft
+
+    @staticmethod
+    def _log_usage(usage):
+        """
+        Log token usage, including the prompt tokens served from the provider's prefix cache.
+
+        Returns:
+            Dict with 'prompt_tokens', 'completion_tokens' and 'cached_tokens' (empty if unknown)
+        """
+        if usage is None:
+            return {}
+        # DeepSeek reports prompt_cache_hit_tokens, OpenAI prompt_tokens_details.cached_tokens
+        cached = getattr(usage, 'prompt_cache_hit_tokens', None)
+        if cached is None:
+            details = getattr(usage, 'prompt_tokens_details', None)
+            cached = getattr(details, 'cached_tokens', None) if details is not None else None
+        cached = cached or 0
+        prompt_tokens = usage.prompt_tokens or 0
+        completion_tokens = usage.completion_tokens or 0
+
+        metrics.increment('llm_prompt_tokens', prompt_tokens)
+        metrics.increment('llm_cached_prompt_tokens', cached)
+        metrics.increment('llm_completion_tokens', completion_tokens)
+        ratio = cached / prompt_tokens if prompt_tokens else 0.0
+        logger.info(
+            f"LLM usage: {prompt_tokens} prompt tokens ({cached} cached, {ratio:.0%}), "
+            f"{completion_tokens} completion tokens"
+        )
+        return {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens, 'cached_tokens': cached}
+
+    def _catalog_names(self, kind, items):
+        """
+        Names of a sector/concept catalog, as the same list object while the catalog is unchanged.
+
+        The shared resolvers recognise an unchanged catalog by list identity, so
+        reusing the list keeps their lookup O(1) instead of fingerprinting it per tweet.
+        """
+        cached = self._names_cache.get(kind)
+        if cached is not None and cached[0] is items and cached[1] == len(items):
+            return cached[2]
+        names = [item.get('板块名称', item.get('name', '')) for item in items]
+        self._names_cache[kind] = (items, len(items), names)
+        return names
+
+    def _etf_ids(self):
+        """Whether the ETF catalog is sent as theme group IDs instead of codes."""
+        return self.catalog_encoder is not None and self.catalog_encoder.etfs
+
+    def _etf_answer_term(self):
+        """How prompts refer to what the LLM returns for an ETF: the group ID shown or the code."""
+        return 'ID' if self._etf_ids() else '代码'
+
+    def _etf_catalog(self, tweet_text, etf_list):
+        """
+        ETF catalog section for the retrieved top-K candidates (all ETFs if retrieval
+        is off): theme-grouped "ID 名称" lines when encoding is on, otherwise
+        "代码 名称" lines sorted by code.
+        """
+        candidates = etf_list if self.etf_retriever is None else self.etf_retriever.select(tweet_text, etf_list)
+        if self._etf_ids():
+            return catalog_section('可用ETF列表（格式：ID 名称，同主题ETF合并为一行）',
+                                   self.catalog_encoder.etf_lines(etf_list, candidates))
+        return catalog_section('可用ETF列表（格式：代码 名称）', sorted(f"{etf['code']} {etf['name']}" for etf in candidates))
+
+    def _name_catalog(self, kind, title, all_names, names):
+        """Sector/concept catalog section, as "编号:名称" entries when sector IDs are on."""
+        if self.catalog_encoder is not None and self.catalog_encoder.sector_ids:
+            return catalog_section(f'{title}（格式：编号:名称，返回编号即可）',
+                                   self.catalog_encoder.name_lines(kind, all_names, names), ', ')
+        return catalog_section(title, names, ', ')
+
+    def _rank_locally(self, tweet_text, names, top_k=None):
+        """
+        Rank names against a tweet with the n-gram index and synonym themes.
+
+        Args:
+            tweet_text: Tweet content
+            names: Candidate names
+            top_k: Maximum number of results (default: all matches)
+
+        Returns:
+            Matching names, best first
+        """
+        if not names:
+            return []
+        themes = self.theme_expander.expand(tweet_text)
+        theme_tokens = [token for theme in themes for token in tokenize(theme)]
+        ranked = NgramIndex(names).search(tweet_text, top_k or len(names), extra_tokens=theme_tokens)
+        return [names[i] for i, _ in ranked]
+
+    def _prioritize(self, tweet_text, names, limit=500):
+        """Keep locally matching names first, then the rest, up to `limit` (returned sorted)."""
+        matched = self._rank_locally(tweet_text, names, limit)
+        seen = set(matched)
+        rest = [name for name in sorted(names) if name not in seen]
+        # Sorted so the catalog text does not depend on relevance order
+        return sorted((matched + rest)[:limit])
+
+    def _select_sector_groups(self, tweet_text, groups):
+        """
+        First stage of grouped selection: pick theme groups from the compact catalog.
+
+        Args:
+            tweet_text: Tweet content
+            groups: Dict from SectorGroups.get_groups()
+
+        Returns:
+            List of chosen group names (at most max_sector_groups)
+        """
+        catalog = catalog_section(
+            '主题分组（格式：分组名（成员数）：示例成员）', self.sector_groups.catalog(groups).split('\n')
         )
-        self.model = llm_conf.get('model', 'gpt-3.5-turbo')
+        prompt = f"""
+任务：分析文末的马斯克推文，从下面的A股主题分组中选出最相关的分组（最多{self.max_sector_groups}个）。
+
+格式要求：请直接返回一个JSON对象，不要包含markdown格式或其他废话。
+{{
+    "groups": ["分组1", "分组2"]
+}}
+
+注意事项：
+- 分组名称必须完全匹配下面的分组名
+- 如果推文没有明确的投资指向，groups返回空数组 []
+
+{catalog}
+
+推文：
+"{tweet_text}"
+"""
+        result = self._chat_json("你是一个精通中国A股行业和概念分类的金融分析助手。", prompt,
+                                 cache=('sector_groups', tweet_text, [catalog]))
+        chosen = result.get('groups', [])
+        if not isinstance(chosen, list):
+            chosen = []
+        chosen = [g for g in chosen if g in groups][:self.max_sector_groups]
+        logger.info(f"Selected theme groups: {chosen}")
+        return chosen
+
+    def _validate_sectors(self, result, sector_names, concept_names):
+        """
+        Resolve the sectors and concepts of an LLM result against the full catalogs.
+
+        Near misses ("半导体概念" for "半导体") are mapped to the canonical name,
+        unknown names dropped, and at most 3 of each kept.
+        """
+        sectors, concepts = result.get('sectors', []), result.get('concepts', [])
+        if self.catalog_encoder is not None and self.catalog_encoder.sector_ids:
+            sectors = self.catalog_encoder.expand_names('sectors', sector_names, sectors)
+            concepts = self.catalog_encoder.expand_names('concepts', concept_names, concepts)
+        return {
+            'sectors': name_resolver('sectors', sector_names, self.resolver_min_score).resolve_many(sectors, 3),
+            'concepts': name_resolver('concepts', concept_names, self.resolver_min_score).resolve_many(concepts, 3)
+        }
+
+    def _validate_etfs(self, result, etf_list, accept_etf=None):
+        """
+        Get the summary and at most 3 ETF codes, resolved against the ETF list, from an LLM result.
+
+        `accept_etf` (a predicate on a code) picks which member of a theme group an ID expands to.
+        """
+        summary = result.get('summary', '')
+        etf_codes = result.get('etf_codes', [])
+        if self._etf_ids():
+            # Group IDs become the first accepted code of their theme, representative first
+            etf_codes = self.catalog_encoder.expand_etfs(etf_list, etf_codes, accept_etf)
+        etf_codes = etf_resolver(etf_list, self.resolver_min_score).resolve_many(etf_codes, 3)
+        return summary, etf_codes
 
     def analyze_tweet(self, tweet_text):
         """
@@ -21,8 +433,7 @@ class ETFAnalyzer:
         logger.info(f"Analyzing tweet: {tweet_text[:50]}...")
         
         prompt = f"""
-请分析这条马斯克的推文：
-"{tweet_text}"
+请分析文末的马斯克推文。
 
 任务：
 1. 理解推文在谈论什么（加密货币、电动车、太空探索、AI、政治、或其他）。如果是评论（Review context if available），请结合上下文分析。
@@ -36,29 +447,13 @@ class ETFAnalyzer:
 }}
 
 如果推文完全是闲聊或无明确投资指向，keywords返回空数组 []，但summary仍需提供。
+
+推文：
+"{tweet_text}"
 """
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个精通金融投资和马斯克言论分析的助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            
-            content = response.choices[0].message.content.strip()
-            # Clean up potential markdown code blocks
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-            
-            content = content.strip()
-            
-            result = json.loads(content)
+            result = self._chat_json("你是一个精通金融投资和马斯克言论分析的助手。", prompt,
+                                     cache=('keywords', tweet_text, None))
             keywords = result.get('keywords', [])
             summary = result.get('summary', '')
             
@@ -66,11 +461,11 @@ class ETFAnalyzer:
                 logger.info(f"Extracted keywords: {keywords}, Summary: {summary}")
                 return keywords, summary
             else:
-                logger.warning(f"LLM returned unexpected keywords format: {content}")
+                logger.warning(f"LLM returned unexpected keywords format: {result}")
                 return [], ""
                 
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse LLM JSON response: {content}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM JSON response: {e.doc}")
             return [], ""
                 
         except Exception as e:
@@ -93,20 +488,51 @@ class ETFAnalyzer:
         logger.info(f"Analyzing relevant sectors for tweet: {tweet_text[:50]}...")
 
         # Extract sector/concept names
-        sector_names = [s.get('板块名称', s.get('name', '')) for s in sector_list]
-        concept_names = [c.get('板块名称', c.get('name', '')) for c in concept_list]
+        sector_names = self._catalog_names('sectors', sector_list)
+        concept_names = self._catalog_names('concepts', concept_list)
+        catalogs = (sector_names, concept_names)
 
-        # Limit to avoid token overflow - take first 500 each
-        sector_names_str = ', '.join(sector_names[:500])
-        concept_names_str = ', '.join(concept_names[:500])
+        try:
+            if self.sector_groups is not None:
+                # Only the members of the chosen theme groups reach the final selection
+                groups = self.sector_groups.get_groups(sector_names, concept_names)
+                chosen = self._select_sector_groups(tweet_text, groups)
+                sector_names, concept_names = self.sector_groups.members(groups, chosen)
+                if not sector_names and not concept_names:
+                    return {'sectors': [], 'concepts': []}
+                if self.sector_stage2 == 'local':
+                    relevant = {
+                        'sectors': self._rank_locally(tweet_text, sector_names, 3),
+                        'concepts': self._rank_locally(tweet_text, concept_names, 3)
+                    }
+                    logger.info(f"Extracted sectors: {relevant['sectors']}, concepts: {relevant['concepts']} (local)")
+                    return relevant
+            else:
+                # Limit to avoid token overflow - take first 500 each (sorted, so the set is stable)
+                sector_names, concept_names = sorted(sector_names)[:500], sorted(concept_names)[:500]
 
-        prompt = f"""
-请分析这条马斯克的推文，并从给定的行业和概念列表中找出最相关的：
-"{tweet_text}"
+            return self._select_sectors(tweet_text, sector_names, concept_names, catalogs)
 
-可用行业列表：{sector_names_str}
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM JSON response: {e.doc}")
+            return {'sectors': [], 'concepts': []}
 
-可用概念列表：{concept_names_str}
+        except Exception as e:
+            logger.error(f"LLM sector analysis failed: {e}")
+            return {'sectors': [], 'concepts': []}
+
+    def _select_sectors(self, tweet_text, sector_names, concept_names, catalogs):
+        """
+        Final selection of up to 3 sectors and 3 concepts from the given names.
+
+        Args:
+            catalogs: (all sector names, all concept names) the answer is resolved against
+        """
+        sector_names_str = self._name_catalog('sectors', '可用行业列表', catalogs[0], sorted(sector_names))
+        concept_names_str = self._name_catalog('concepts', '可用概念列表', catalogs[1], sorted(concept_names))
+
+        prompt = f"""
+请分析文末的马斯克推文，并从给定的行业和概念列表中找出最相关的。
 
 任务：
 1. 理解推文的核心内容
@@ -123,61 +549,31 @@ class ETFAnalyzer:
 - 如果没有相关的行业，sectors返回空数组 []
 - 如果没有相关的概念，concepts返回空数组 []
 - 行业和概念名称必须完全匹配列表中的名称
-"""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个精通中国A股行业和概念分类的金融分析助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-
-            content = response.choices[0].message.content.strip()
-            # Clean up potential markdown code blocks
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-
-            content = content.strip()
-
-            result = json.loads(content)
-            sectors = result.get('sectors', [])
-            concepts = result.get('concepts', [])
 
-            # Ensure they are lists
-            if not isinstance(sectors, list):
-                sectors = []
-            if not isinstance(concepts, list):
-                concepts = []
+{sector_names_str}
 
-            # Limit to top 3 each
-            sectors = sectors[:3]
-            concepts = concepts[:3]
+{concept_names_str}
 
-            logger.info(f"Extracted sectors: {sectors}, concepts: {concepts}")
-            return {'sectors': sectors, 'concepts': concepts}
+推文：
+"{tweet_text}"
+"""
 
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse LLM JSON response: {content}")
-            return {'sectors': [], 'concepts': []}
+        result = self._chat_json("你是一个精通中国A股行业和概念分类的金融分析助手。", prompt,
+                                 cache=('sectors', tweet_text, [sector_names_str, concept_names_str]))
+        relevant = self._validate_sectors(result, *catalogs)
 
-        except Exception as e:
-            logger.error(f"LLM sector analysis failed: {e}")
-            return {'sectors': [], 'concepts': []}
+        logger.info(f"Extracted sectors: {relevant['sectors']}, concepts: {relevant['concepts']}")
+        return relevant
 
-    def analyze_relevant_etfs(self, tweet_text, etf_list):
+    def analyze_relevant_etfs(self, tweet_text, etf_list, accept_etf=None):
         """
         Analyze tweet and select the 3 most relevant ETFs from the given list.
 
         Args:
             tweet_text: Tweet content to analyze
             etf_list: List of available ETFs, each as a dict with 'code' and 'name' keys
+            accept_etf: Optional predicate on an ETF code; a theme group ID expands to
+                its first member it accepts
 
         Returns:
             Tuple of (summary, etf_codes):
@@ -187,73 +583,127 @@ class ETFAnalyzer:
         """
         logger.info(f"Analyzing relevant ETFs for tweet: {tweet_text[:50]}...")
 
-        # Format ETF list for the prompt: "代码 名称"
-        etf_entries = [f"{etf['code']} {etf['name']}" for etf in etf_list]
-        etf_list_str = '\n'.join(etf_entries)
+        etf_list_str = self._etf_catalog(tweet_text, etf_list)
+        term = self._etf_answer_term()
 
         prompt = f"""
-请分析这条马斯克的推文，并从给定的ETF列表中选择最相关的3个：
-"{tweet_text}"
-
-可用ETF列表（格式：代码 名称）：
-{etf_list_str}
+请分析文末的马斯克推文，并从给定的ETF列表中选择最相关的3个。
 
 任务：
 1. 理解推文的核心内容和投资指向，用简短的中文总结（不超过50字）
 2. 从ETF列表中选择最相关的3个ETF
-3. 返回这3个ETF的代码（不是名称）
+3. 返回这3个ETF在列表中的{term}（不是名称）
 
 格式要求：请直接返回一个JSON对象，不要包含markdown格式或其他废话。
 {{
     "summary": "推文的中文总结",
-    "etf_codes": ["代码1", "代码2", "代码3"]
+    "etf_codes": ["{term}1", "{term}2", "{term}3"]
 }}
 
 注意事项：
-- ETF代码必须是列表中存在的代码
+- ETF的{term}必须是列表中显示的{term}
 - 如果没有相关的ETF，etf_codes返回空数组 []，但summary仍需提供
-- 只返回ETF代码，不返回名称
-"""
+- 只返回ETF的{term}，不返回名称
 
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个精通中国A股ETF投资和马斯克言论分析的金融助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-
-            content = response.choices[0].message.content.strip()
-            # Clean up potential markdown code blocks
-            if content.startswith('```json'):
-                content = content[7:]
-            if content.startswith('```'):
-                content = content[3:]
-            if content.endswith('```'):
-                content = content[:-3]
-
-            content = content.strip()
-
-            result = json.loads(content)
-            summary = result.get('summary', '')
-            etf_codes = result.get('etf_codes', [])
+{etf_list_str}
 
-            # Ensure types
-            if not isinstance(etf_codes, list):
-                etf_codes = []
+推文：
+"{tweet_text}"
+"""
 
-            # Limit to top 3
-            etf_codes = etf_codes[:3]
+        try:
+            result = self._chat_json("你是一个精通中国A股ETF投资和马斯克言论分析的金融助手。", prompt,
+                                     cache=('etfs', tweet_text, [etf_list_str]))
+            summary, etf_codes = self._validate_etfs(result, etf_list, accept_etf)
 
             logger.info(f"Summary: {summary}, Selected ETF codes: {etf_codes}")
             return summary, etf_codes
 
-        except json.JSONDecodeError:
-            logger.error(f"Failed to parse LLM JSON response: {content}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM JSON response: {e.doc}")
             return "", []
 
         except Exception as e:
             logger.error(f"LLM ETF selection failed: {e}")
             return "", []
+
+    def analyze_all(self, tweet_text, etf_list, sector_list, concept_list, accept_etf=None):
+        """
+        Get the summary, ETFs, sectors and concepts for a tweet in a single LLM call.
+
+        Applies the same validation as analyze_relevant_etfs and analyze_relevant_sectors.
+
+        Args:
+            tweet_text: Tweet content to analyze
+            etf_list: List of available ETFs, each as a dict with 'code' and 'name' keys
+            sector_list: List of available sectors
+            concept_list: List of available concepts
+            accept_etf: Optional predicate on an ETF code (see analyze_relevant_etfs)
+
+        Returns:
+            Dict with 'summary' (string), 'etf_codes', 'sectors' and 'concepts' (top 3 each)
+        """
+        logger.info(f"Analyzing tweet (combined): {tweet_text[:50]}...")
+
+        etf_list_str = self._etf_catalog(tweet_text, etf_list)
+        term = self._etf_answer_term()
+        sector_names = self._catalog_names('sectors', sector_list)
+        concept_names = self._catalog_names('concepts', concept_list)
+        # One call cannot do grouped selection, so local matches are kept first within the 500 cap
+        sector_names_str = self._name_catalog('sectors', '可用行业列表', sector_names,
+                                              self._prioritize(tweet_text, sector_names))
+        concept_names_str = self._name_catalog('concepts', '可用概念列表', concept_names,
+                                               self._prioritize(tweet_text, concept_names))
+
+        prompt = f"""
+请分析文末的马斯克推文，并从给定的ETF、行业和概念列表中找出最相关的。
+
+任务：
+1. 理解推文的核心内容和投资指向，用简短的中文总结（不超过50字）
+2. 从ETF列表中选择最相关的3个ETF，返回它们在列表中的{term}（不是名称）
+3. 从行业列表中选择最相关的3个行业
+4. 从概念列表中选择最相关的3个概念
+
+格式要求：请直接返回一个JSON对象，不要包含markdown格式或其他废话。
+{{
+    "summary": "推文的中文总结",
+    "etf_codes": ["{term}1", "{term}2", "{term}3"],
+    "sectors": ["行业1", "行业2", "行业3"],
+    "concepts": ["概念1", "概念2", "概念3"]
+}}
+
+注意事项：
+- ETF的{term}必须是列表中显示的{term}
+- 行业和概念名称必须完全匹配列表中的名称
+- 没有相关项时对应字段返回空数组 []，但summary仍需提供
+
+{etf_list_str}
+
+{sector_names_str}
+
+{concept_names_str}
+
+推文：
+"{tweet_text}"
+"""
+
+        empty = {'summary': '', 'etf_codes': [], 'sectors': [], 'concepts': []}
+        try:
+            result = self._chat_json("你是一个精通中国A股ETF、行业和概念分类以及马斯克言论分析的金融助手。", prompt,
+                                     cache=('all', tweet_text, [etf_list_str, sector_names_str, concept_names_str]))
+            summary, etf_codes = self._validate_etfs(result, etf_list, accept_etf)
+            relevant = self._validate_sectors(result, sector_names, concept_names)
+
+            logger.info(
+                f"Summary: {summary}, Selected ETF codes: {etf_codes}, "
+                f"sectors: {relevant['sectors']}, concepts: {relevant['concepts']}"
+            )
+            return {'summary': summary, 'etf_codes': etf_codes, **relevant}
+
+        except json.JSONDecodeError as e:
+            logger.error(f"Failed to parse LLM JSON response: {e.doc}")
+            return empty
+
+        except Exception as e:
+            logger.error(f"LLM combined analysis failed: {e}")
+            return empty
@@ -0,0 +1,330 @@
+"""
+asyncio-based Twitter monitor engine on playwright.async_api.
+Shares state, caches and tweet processing with TwitterMonitor, but loads pages
+as concurrent tasks: instances are raced with hedged starts and reply contexts
+are fetched in parallel under a semaphore.
+"""
+
+import asyncio
+import time
+from src.browser_pool import AsyncBrowserPool
+from src.feed_fetcher import NOT_MODIFIED
+from src.monitor import TwitterMonitor, TIMELINE_EXTRACT_JS, TIMELINE_FINGERPRINT_QUERY, REPLY_CONTEXT_JS
+from src.nitter_parser import parse_html, parse_reply_context, parse_reply_threads, parse_timeline, timeline_hrefs
+from src.utils import setup_logger
+
+logger = setup_logger('AsyncTwitterMonitor')
+
+
+class AsyncTwitterMonitor(TwitterMonitor):
+    """TwitterMonitor with `async fetch_tweets()`, returning the same tweet dicts."""
+
+    def __init__(self):
+        super().__init__()
+        self.browser_pool = AsyncBrowserPool(self.config.get('browser_pool', {}))
+
+    async def close(self):
+        """Release the shared browser and HTTP session. Call once at shutdown."""
+        await self.browser_pool.close()
+        if self.feed_fetcher is not None:
+            self.feed_fetcher.close()
+
+    async def fetch_tweets(self, handle=None):
+        """
+        Poll one account for new tweets.
+
+        Args:
+            handle: Account handle (default: the highest-priority account)
+
+        Returns:
+            List of new tweet dicts {id, text, link, published, author}
+        """
+        account = self._account(handle)
+        # Skipped while other accounts' polls still have pages open
+        await self.browser_pool.maybe_recycle()
+        try:
+            return await self._fetch_tweets_async(account)
+        finally:
+            self.rss_health.save()
+            self.browser_health.save()
+            self._poll_count += 1
+            if self.health_log_every and self._poll_count % self.health_log_every == 0:
+                self.log_instance_health()
+
+    async def fetch_many(self, handles=None):
+        """
+        Poll several accounts concurrently on the shared browser, with at most
+        `max_concurrent_accounts` polls in flight.
+
+        Args:
+            handles: Account handles (default: all accounts)
+
+        Returns:
+            Dict mapping handle to its list of new tweet dicts
+        """
+        accounts = [self._account(h) for h in handles] if handles else list(self.accounts.values())
+        accounts.sort(key=lambda a: a.priority, reverse=True)
+        semaphore = asyncio.Semaphore(self.config.get('max_concurrent_accounts', 3))
+
+        async def poll(account):
+            async with semaphore:
+                try:
+                    return await self.fetch_tweets(account.handle)
+                except Exception as e:
+                    logger.error(f"Error fetching @{account.handle}: {e}", exc_info=True)
+                    return []
+
+        results = await asyncio.gather(*(poll(account) for account in accounts))
+        return {account.handle: tweets for account, tweets in zip(accounts, results)}
+
+    async def _fetch_feed_items_async(self, instances, handle):
+        """
+        Async variant of _fetch_feed_items.
+
+        Only the HTTP request runs in a worker thread; health updates are applied
+        here on the event loop thread, which is also the one saving them.
+        """
+        for instance in instances:
+            logger.info(f"Trying to fetch RSS feed from {instance}")
+            started_at = time.monotonic()
+            items = await asyncio.to_thread(self.feed_fetcher.fetch, instance, handle)
+            if self._record_feed_result(instance, items, time.monotonic() - started_at):
+                return instance, items
+        return None, None
+
+    async def _fetch_tweets_async(self, account):
+        # Cheap RSS fast path first, the browser is only a fallback
+        if self.feed_fetcher is not None:
+            instance, items = await self._fetch_feed_items_async(
+                self.rss_health.ranked(self.nitter_instances, include_quarantined=False), account.handle
+            )
+            if items is NOT_MODIFIED:
+                return []
+            if items:
+                return await self._process_items_async(instance, items, account)
+            logger.info("RSS fast path unavailable on all instances, falling back to browser")
+
+        instances = self.browser_health.ranked(self.nitter_instances)
+        while instances:
+            instance, page, instances = await self._race_timeline_async(instances, account.handle)
+            if page is None:
+                break
+
+            try:
+                new_tweets = await self._read_timeline_async(instance, page, account)
+                if new_tweets is not None:
+                    return new_tweets
+            except Exception as e:
+                logger.error(f"Error scraping {instance}: {e}")
+            finally:
+                await page.close()
+
+        return []
+
+    async def _read_timeline_async(self, instance, page, account):
+        """Async counterpart of TwitterMonitor._read_timeline; the HTML is parsed in a thread."""
+        if self.timeline_extraction == 'html':
+            # Capture once; the href scan is cheap, the full parse only runs on a change
+            html = await page.content()
+            fingerprint = self._hash_hrefs(timeline_hrefs(html))
+        else:
+            html = None
+            fingerprint = self._hash_hrefs(await page.eval_on_selector_all(*TIMELINE_FINGERPRINT_QUERY))
+        if self._timeline_unchanged(instance, account, fingerprint):
+            return []
+
+        if html is not None:
+            items = await asyncio.to_thread(parse_timeline, html, 10)
+        else:
+            items = await page.evaluate(TIMELINE_EXTRACT_JS, 10)
+        if not items:
+            logger.warning(f"No timeline items found on {instance}")
+            self.browser_health.record_failure(instance, "no timeline items")
+            return None
+
+        logger.info(f"Successfully fetched {len(items)} items from {instance}")
+        new_tweets = await self._process_items_async(instance, items, account)
+        account.timeline_fingerprints[instance] = fingerprint
+        return new_tweets
+
+    async def _load_timeline(self, instance, handle):
+        """
+        Load an instance's profile page until timeline items appear.
+
+        Returns:
+            The loaded page; the caller must close it
+        """
+        url = self.get_profile_url(instance, handle)
+        logger.info(f"Trying to fetch tweets from {url}")
+        timeout_ms = self.hedge_config.get('timeout', 30) * 1000
+        page = await self.browser_pool.new_page()
+        started_at = time.monotonic()
+        try:
+            await page.goto(url, timeout=timeout_ms, wait_until='domcontentloaded')
+            await page.wait_for_selector('.timeline-item', timeout=timeout_ms)
+        except asyncio.CancelledError:
+            await page.close()
+            raise
+        except Exception as e:
+            await page.close()
+            self.browser_health.record_failure(instance, e, time.monotonic() - started_at)
+            raise
+
+        self.browser_health.record_success(instance, time.monotonic() - started_at)
+        return page
+
+    async def _race_timeline_async(self, instances, handle):
+        """
+        Race timeline loads across instances. A new instance is started every
+        `hedged_fetch.delay` seconds, or as soon as one fails, with at most
+        `hedged_fetch.fanout` in flight (1 when hedging is disabled). The first
+        page with timeline items wins and the other tasks are cancelled.
+
+        Args:
+            instances: Instance base URLs in preference order
+            handle: Account handle
+
+        Returns:
+            Tuple of (instance, page, remaining_instances); instance and page are None
+            if every instance failed
+        """
+        hedging = self.hedge_config.get('enabled', False)
+        fanout = max(1, self.hedge_config.get('fanout', 3)) if hedging else 1
+        delay = self.hedge_config.get('delay', 2.0)
+
+        pending = list(instances)
+        tasks = {}  # {task: instance}
+        winner = None
+
+        try:
+            while winner is None and (pending or tasks):
+                if pending and len(tasks) < fanout:
+                    instance = pending.pop(0)
+                    tasks[asyncio.create_task(self._load_timeline(instance, handle))] = instance
+
+                # Wait for a result, but only up to the hedge delay if another instance could start
+                can_hedge = pending and len(tasks) < fanout
+                done, _ = await asyncio.wait(
+                    tasks, timeout=delay if can_hedge else None,
+                    return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    instance = tasks.pop(task)
+                    if task.exception() is not None:
+                        logger.error(f"Error scraping {instance}: {task.exception()}")
+                    elif winner is None:
+                        winner = (instance, task.result())
+                    else:
+                        await task.result().close()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # A task may have finished between the last wait and its cancellation
+            for task in tasks:
+                if not task.cancelled() and task.exception() is None:
+                    await task.result().close()
+
+        if winner is None:
+            return None, None, []
+        logger.info(f"{winner[0]} won the timeline race")
+        return winner[0], winner[1], pending
+
+    async def _process_items_async(self, instance, items, account):
+        """Async counterpart of TwitterMonitor._process_items."""
+        new_items = self._select_new_items(items, account)
+        replies = self._reply_links(instance, new_items)
+        contexts = await self._resolve_reply_contexts_async(replies) if replies else {}
+        return self._build_tweets(instance, new_items, contexts, account)
+
+    async def _read_reply_context_async(self, detail_page, tweet_id):
+        """Async counterpart of TwitterMonitor._read_reply_context; parsing runs in a thread."""
+        document = await asyncio.to_thread(parse_html, await detail_page.content())
+        if self.timeline_extraction == 'html':
+            ancestors = parse_reply_context(document)
+        else:
+            ancestors = await detail_page.evaluate(REPLY_CONTEXT_JS)
+        return ancestors or [], parse_reply_threads(document, tweet_id)
+
+    async def _load_reply_pages_async(self, ordered, links, contexts, check_cache=True):
+        """Load detail pages concurrently under `reply_context.concurrency` and cache their conversations."""
+        semaphore = asyncio.Semaphore(self.reply_config.get('concurrency', 3))
+        timeout_ms = self.reply_config.get('timeout', 20) * 1000
+
+        async def resolve(link, tweet_id):
+            async with semaphore:
+                if check_cache and self._resolve_from_cache(tweet_id, contexts):
+                    return
+                detail_page = await self.browser_pool.new_page()
+                try:
+                    await detail_page.goto(link, timeout=timeout_ms, wait_until='domcontentloaded')
+                    await detail_page.wait_for_selector('.main-tweet', timeout=timeout_ms)
+                    ancestors, threads = await self._read_reply_context_async(detail_page, tweet_id)
+                    self._record_thread(tweet_id, ancestors, contexts, threads)
+                except Exception as e:
+                    logger.error(f"Failed to fetch context for {tweet_id}: {e}")
+                finally:
+                    await detail_page.close()
+
+        await asyncio.gather(*(resolve(link, links[link]) for link in ordered))
+
+    async def _resolve_reply_contexts_async(self, replies):
+        """
+        Get the parent tweet text for a batch of replies; same strategy as
+        TwitterMonitor._resolve_reply_contexts, with the remaining detail pages
+        loaded as concurrent tasks.
+
+        Args:
+            replies: List of (tweet_id, detail_link) tuples
+
+        Returns:
+            Dict mapping tweet ID to parent text for the replies that could be resolved
+        """
+        contexts, links = self._cached_reply_contexts(replies)
+
+        # Newest first, so older replies in the same thread can resolve from its ancestors
+        ordered = sorted(links, key=lambda link: int(links[link]), reverse=True)
+        if len(ordered) > 1:
+            first, ordered = ordered[0], ordered[1:]
+            await self._load_reply_pages_async([first], links, contexts)
+            ordered = [link for link in ordered if not self._resolve_from_cache(links[link], contexts)]
+            parent_link, parent_id = self._parent_page(first, links, ordered)
+            if parent_link is not None:
+                logger.info(f"Loading parent {parent_id} to resolve {len(ordered)} sibling replies")
+                links[parent_link] = parent_id
+                await self._load_reply_pages_async([parent_link], links, contexts, check_cache=False)
+        await self._load_reply_pages_async(ordered, links, contexts)
+
+        self.reply_cache.save()
+        return contexts
+
+
+class AsyncMonitorRunner:
+    """
+    Blocking facade that drives an AsyncTwitterMonitor on its own event loop,
+    so the synchronous scheduler in main.py can use the async engine unchanged.
+    """
+
+    def __init__(self, monitor=None):
+        self.loop = asyncio.new_event_loop()
+        self.monitor = monitor or AsyncTwitterMonitor()
+
+    @property
+    def accounts(self):
+        return self.monitor.accounts
+
+    def fetch_tweets(self, handle=None):
+        return self.loop.run_until_complete(self.monitor.fetch_tweets(handle))
+
+    def fetch_many(self, handles=None):
+        return self.loop.run_until_complete(self.monitor.fetch_many(handles))
+
+    def log_instance_health(self):
+        self.monitor.log_instance_health()
+
+    def close(self):
+        try:
+            self.loop.run_until_complete(self.monitor.close())
+        finally:
+            self.loop.close()
@@ -0,0 +1,455 @@
+"""
+Long-lived Playwright browser pool shared across monitor polls.
+Keeps one Chromium instance and context alive, health-checks it before use and,
+between polls, recycles it after a page budget or memory ceiling is exceeded.
+"""
+
+import asyncio
+import os
+import time
+from urllib.parse import urlparse
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright
+from src.utils import DEFAULT_USER_AGENT, setup_logger
+
+logger = setup_logger('BrowserPool')
+
+# Only these resource types are fetched; images, media, fonts and CSS are aborted
+DEFAULT_RESOURCE_ALLOWLIST = ['document', 'script', 'xhr', 'fetch']
+
+
+def process_tree_rss_mb(root_pid=None):
+    """
+    Sum the resident memory of a process and all of its descendants.
+
+    Args:
+        root_pid: Root process id (defaults to the current process)
+
+    Returns:
+        RSS in MB, or None if /proc is not available (e.g. on Windows)
+    """
+    if not os.path.isdir('/proc'):
+        return None
+
+    root_pid = root_pid or os.getpid()
+    children = {}
+    rss_kb = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/status', 'r') as f:
+                ppid = None
+                rss = 0
+                for line in f:
+                    if line.startswith('PPid:'):
+                        ppid = int(line.split()[1])
+                    elif line.startswith('VmRSS:'):
+                        rss = int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+        pid = int(entry)
+        rss_kb[pid] = rss
+        children.setdefault(ppid, []).append(pid)
+
+    total = 0
+    stack = [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss_kb.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total / 1024
+
+
+def is_navigation_error(error):
+    """True if a page call failed only because a navigation is still committing."""
+    message = str(error)
+    return 'context was destroyed' in message or 'navigating' in message
+
+
+def start_navigation(page, url):
+    """Start navigating a page to a URL without waiting for it to load."""
+    page.evaluate("url => { window.location.href = url; }", url)
+
+
+class _BrowserPoolBase:
+    """
+    Settings, request filtering, health checks, recycling rules and page tracking
+    shared by BrowserPool and AsyncBrowserPool. Nothing here talks to the browser.
+    """
+
+    def __init__(self, config=None):
+        """
+        Initialize the pool. The browser is launched lazily on first use.
+
+        Args:
+            config: Dict with optional keys:
+                - headless: Run Chromium headless (default True)
+                - max_pages: Recycle the browser after this many pages (default 200)
+                - max_memory_mb: Recycle when the process tree RSS exceeds this (default 1024, 0 disables)
+                - user_agent: User agent for the shared context
+                - block_resources: Abort requests outside the allowlist (default True)
+                - resource_allowlist: Resource types that may load (default document/script/xhr/fetch)
+                - block_third_party: Abort sub-resources from other hosts than the page (default True)
+        """
+        config = config or {}
+        self.headless = config.get('headless', True)
+        self.max_pages = config.get('max_pages', 200)
+        self.max_memory_mb = config.get('max_memory_mb', 1024)
+        self.user_agent = config.get('user_agent', DEFAULT_USER_AGENT)
+        self.block_resources = config.get('block_resources', True)
+        self.resource_allowlist = set(config.get('resource_allowlist', DEFAULT_RESOURCE_ALLOWLIST))
+        self.block_third_party = config.get('block_third_party', True)
+
+        self._playwright = None
+        self._browser = None
+        self._context = None
+        self._pages_served = 0
+        # Pages handed out and not closed yet; the browser is never recycled under them
+        self._open_pages = set()
+
+    def _should_block(self, request):
+        """Decide whether a request is non-essential or third-party."""
+        if request.resource_type not in self.resource_allowlist:
+            return True
+
+        if self.block_third_party and not request.is_navigation_request():
+            try:
+                page_host = urlparse(request.frame.url).hostname
+            except Exception:
+                page_host = None
+            if page_host and urlparse(request.url).hostname != page_host:
+                return True
+
+        return False
+
+    def _is_healthy(self):
+        """Check that the browser is still connected."""
+        try:
+            return self._browser is not None and self._browser.is_connected()
+        except Exception:
+            return False
+
+    def _should_recycle(self):
+        """Decide whether the browser has exceeded its page or memory budget."""
+        if self.max_pages and self._pages_served >= self.max_pages:
+            logger.info(f"Browser served {self._pages_served} pages, recycling")
+            return True
+
+        if self.max_memory_mb:
+            rss_mb = process_tree_rss_mb()
+            if rss_mb is not None and rss_mb > self.max_memory_mb:
+                logger.info(f"Browser process tree uses {rss_mb:.0f} MB (limit {self.max_memory_mb} MB), recycling")
+                return True
+
+        return False
+
+    def _can_recycle(self):
+        """Whether a running browser is idle and over its page or memory budget."""
+        if self._browser is None:
+            return False
+        if self._open_pages:
+            logger.debug(f"{len(self._open_pages)} pages still open, not recycling the browser")
+            return False
+        return self._should_recycle()
+
+    def _track(self, page):
+        """Count a page as served and open until its 'close' event fires."""
+        self._pages_served += 1
+        self._open_pages.add(page)
+        page.on('close', lambda closed: self._open_pages.discard(closed))
+        return page
+
+
+class BrowserPool(_BrowserPoolBase):
+    """Own a persistent Chromium browser/context and hand out pages from it."""
+
+    def _start(self):
+        """Launch Playwright, Chromium and the shared context."""
+        if self._playwright is None:
+            self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=self.headless)
+        self._context = self._browser.new_context(
+            user_agent=self.user_agent,
+            ignore_https_errors=True
+        )
+        if self.block_resources:
+            self._context.route('**/*', self._route_request)
+        self._pages_served = 0
+        logger.info("Launched persistent Chromium browser")
+
+    def _route_request(self, route):
+        """Abort non-essential and third-party requests, let everything else through."""
+        if self._should_block(route.request):
+            return route.abort()
+        return route.continue_()
+
+    def _close_browser(self):
+        """Close the context and browser, ignoring errors from a dead browser."""
+        for closable in (self._context, self._browser):
+            if closable is None:
+                continue
+            try:
+                closable.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing browser: {e}")
+        self._context = None
+        self._browser = None
+        self._open_pages.clear()
+
+    def recycle(self):
+        """Close the current browser so the next request launches a fresh one."""
+        self._close_browser()
+
+    def maybe_recycle(self):
+        """
+        Recycle the browser if it is over budget and no page is open.
+
+        Called once per poll before any page is opened, so the memory scan does
+        not run per page and in-flight loads are never closed under their pages.
+
+        Returns:
+            True if the browser was closed
+        """
+        if not self._can_recycle():
+            return False
+        self._close_browser()
+        return True
+
+    def context(self):
+        """
+        Get the shared browser context, launching or relaunching a dead browser as needed.
+
+        Returns:
+            Playwright BrowserContext
+        """
+        if self._browser is not None and not self._is_healthy():
+            logger.warning("Browser is no longer connected, relaunching")
+            self._close_browser()
+
+        if self._browser is None:
+            self._start()
+
+        return self._context
+
+    def new_page(self):
+        """
+        Open a new page in the shared context. The caller is responsible for closing it.
+
+        Returns:
+            Playwright Page
+        """
+        try:
+            page = self.context().new_page()
+        except Exception as e:
+            if self._open_pages and self._is_healthy():
+                # Other pages are still loading on this browser; do not close it under them
+                raise
+            logger.warning(f"Failed to open page ({e}), relaunching browser")
+            self._close_browser()
+            page = self.context().new_page()
+
+        return self._track(page)
+
+    def load_concurrently(self, urls, ready_selector, timeout=30, max_concurrency=3,
+                          poll_interval_ms=100, should_load=None, hedge_delay=None,
+                          error_selector=None):
+        """
+        Load several URLs in parallel pages and yield each one as soon as it is ready.
+
+        Navigations are started without blocking and polled round-robin, so at most
+        `max_concurrency` pages are in flight and a slow page does not hold up the rest.
+        With `hedge_delay`, URLs are started one at a time instead: the next one
+        after that many seconds, or right away when a load fails. Pages still
+        loading when the caller stops iterating are closed, which cancels them.
+
+        Args:
+            urls: URLs to load, in priority order
+            ready_selector: CSS selector that marks a page as loaded
+            timeout: Per-page timeout in seconds
+            max_concurrency: Maximum number of pages loading at once
+            poll_interval_ms: Delay between polling rounds
+            should_load: Optional callback checked right before a URL is started;
+                URLs for which it returns False are skipped
+            hedge_delay: Optional seconds to wait before starting each further URL
+            error_selector: Optional CSS selector that marks a page as failed
+
+        Yields:
+            Tuples of (url, page, error). On success page is set and the caller must
+            close it; on failure page is None and error describes the problem.
+        """
+        pending = list(urls)
+        inflight = {}  # {url: (page, started_at)}
+        next_launch = 0.0  # Earliest start of the next hedged URL
+
+        try:
+            while pending or inflight:
+                while pending and len(inflight) < max_concurrency:
+                    if hedge_delay is not None and inflight and time.monotonic() < next_launch:
+                        break
+                    url = pending.pop(0)
+                    if should_load is not None and not should_load(url):
+                        continue
+                    page = self.new_page()
+                    try:
+                        start_navigation(page, url)
+                        inflight[url] = (page, time.monotonic())
+                        next_launch = time.monotonic() + (hedge_delay or 0)
+                    except Exception as e:
+                        page.close()
+                        next_launch = 0.0
+                        yield url, None, e
+
+                for url, (page, started_at) in list(inflight.items()):
+                    try:
+                        if page.query_selector(ready_selector):
+                            del inflight[url]
+                            yield url, page, None
+                            continue
+                        if error_selector is not None and page.query_selector(error_selector):
+                            raise RuntimeError(f"page shows {error_selector}")
+                    except Exception as e:
+                        # Execution context is destroyed while the navigation is committing
+                        if not is_navigation_error(e):
+                            del inflight[url]
+                            page.close()
+                            next_launch = 0.0
+                            yield url, None, e
+                            continue
+
+                    if time.monotonic() - started_at > timeout:
+                        del inflight[url]
+                        page.close()
+                        next_launch = 0.0
+                        yield url, None, TimeoutError(f"timed out after {timeout}s")
+
+                if inflight:
+                    next(iter(inflight.values()))[0].wait_for_timeout(poll_interval_ms)
+        finally:
+            for page, _ in inflight.values():
+                page.close()
+
+    def close(self):
+        """Shut down the browser and Playwright driver."""
+        self._close_browser()
+        if self._playwright is not None:
+            try:
+                self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Ignoring error while stopping Playwright: {e}")
+            self._playwright = None
+            logger.info("Browser pool closed")
+
+
+class AsyncBrowserPool(_BrowserPoolBase):
+    """
+    asyncio variant of BrowserPool built on playwright.async_api.
+    Settings, health checks and recycling rules are shared with BrowserPool
+    through _BrowserPoolBase; every method that talks to the browser is a
+    coroutine here, and parallel loads are asyncio tasks in the caller instead
+    of load_concurrently(). Launching, relaunching and recycling run under an
+    asyncio.Lock, so concurrent polls share one browser instead of each
+    launching their own.
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self._lock = asyncio.Lock()
+
+    async def _start(self):
+        """Launch Playwright, Chromium and the shared context."""
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(headless=self.headless)
+        self._context = await self._browser.new_context(
+            user_agent=self.user_agent,
+            ignore_https_errors=True
+        )
+        if self.block_resources:
+            await self._context.route('**/*', self._route_request)
+        self._pages_served = 0
+        logger.info("Launched persistent Chromium browser (async)")
+
+    async def _route_request(self, route):
+        """Abort non-essential and third-party requests, let everything else through."""
+        if self._should_block(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _close_browser(self):
+        """Close the context and browser, ignoring errors from a dead browser."""
+        for closable in (self._context, self._browser):
+            if closable is None:
+                continue
+            try:
+                await closable.close()
+            except Exception as e:
+                logger.debug(f"Ignoring error while closing browser: {e}")
+        self._context = None
+        self._browser = None
+        self._open_pages.clear()
+
+    async def recycle(self):
+        """Close the current browser so the next request launches a fresh one."""
+        async with self._lock:
+            await self._close_browser()
+
+    async def maybe_recycle(self):
+        """Recycle the browser if it is over budget and no page is open (see BrowserPool)."""
+        async with self._lock:
+            if not self._can_recycle():
+                return False
+            await self._close_browser()
+            return True
+
+    async def context(self):
+        """
+        Get the shared browser context, launching or relaunching a dead browser as needed.
+
+        Returns:
+            Playwright async BrowserContext
+        """
+        async with self._lock:
+            if self._browser is not None and not self._is_healthy():
+                logger.warning("Browser is no longer connected, relaunching")
+                await self._close_browser()
+
+            if self._browser is None:
+                await self._start()
+
+            return self._context
+
+    async def new_page(self):
+        """
+        Open a new page in the shared context. The caller is responsible for closing it.
+
+        Returns:
+            Playwright async Page
+        """
+        context = await self.context()
+        try:
+            page = await context.new_page()
+        except Exception as e:
+            async with self._lock:
+                # Another caller may already have relaunched; only close the browser that failed
+                if self._context is context:
+                    if self._open_pages and self._is_healthy():
+                        raise
+                    logger.warning(f"Failed to open page ({e}), relaunching browser")
+                    await self._close_browser()
+            page = await (await self.context()).new_page()
+
+        return self._track(page)
+
+    async def close(self):
+        """Shut down the browser and Playwright driver."""
+        async with self._lock:
+            await self._close_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.debug(f"Ignoring error while stopping Playwright: {e}")
+            self._playwright = None
+            logger.info("Browser pool closed")
@@ -5,6 +5,7 @@ Provides unified caching with configurable expiration times.
 
 import os
 import json
+import threading
 import time
 import pandas as pd
 from src.utils import setup_logger
@@ -23,6 +24,9 @@ class CacheManager:
         self.config = self._load_config(config_path)
         self.cache_dir = self.config.get('cache_dir', 'data/cache')
         self.cache_times = self.config.get('cache_times', {})
+        # One lock per key, so concurrent callers do not fetch or write the same file twice
+        self._key_locks = {}
+        self._key_locks_guard = threading.Lock()
 
         # Ensure cache directory exists
         if not os.path.exists(self.cache_dir):
@@ -95,20 +99,27 @@ class CacheManager:
         """
         cache_file = self._get_cache_file_path(cache_key, file_type)
 
-        # Check if cache is valid
-        if not self._is_expired(cache_file, cache_time_key):
-            logger.debug(f"Loading from cache: {cache_key}")
-            return self._load(cache_file, file_type)
+        with self._key_lock(cache_key):
+            # Check if cache is valid
+            if not self._is_expired(cache_file, cache_time_key):
+                logger.debug(f"Loading from cache: {cache_key}")
+                return self._load(cache_file, file_type)
 
-        # Cache expired or doesn't exist, fetch fresh data
-        logger.info(f"Fetching fresh data: {cache_key}")
-        data = fetch_func()
+            # Cache expired or doesn't exist, fetch fresh data
+            logger.info(f"Fetching fresh data: {cache_key}")
+            data = fetch_func()
 
-        if data is not None:
-            self._save(cache_file, data, file_type)
-            logger.info(f"Cached data: {cache_key}")
+            if data is not None:
+                self._save(cache_file, data, file_type)
+                logger.info(f"Cached data: {cache_key}")
 
-        return data
+            return data
+
+    def _key_lock(self, cache_key):
+        with self._key_locks_guard:
+            if cache_key not in self._key_locks:
+                self._key_locks[cache_key] = threading.Lock()
+            return self._key_locks[cache_key]
 
     def _load(self, cache_file, file_type):
         """Load data from cache file."""
@@ -0,0 +1,211 @@
+"""
+Compact ID-coded catalogs for LLM prompts.
+ETFs tracking the same index or theme (ten "新能源车ETF" from different fund
+companies) are merged into one group with a short ID such as "E12", and
+sector/concept names can be given numeric IDs. The LLM answers with IDs, which
+are expanded back to ETF codes or names locally. Encodings are versioned,
+cached on disk with the same expiry as their source catalog, and the prompt
+token savings are reported through src.metrics.
+"""
+
+import re
+import unicodedata
+from src import metrics
+from src.cache_manager import get_cache_manager
+from src.llm_cache import fingerprint
+from src.utils import setup_logger
+
+logger = setup_logger('CatalogEncoder')
+
+# Bump whenever the encoding scheme changes, so cached encodings are rebuilt
+ENCODER_VERSION = 1
+
+# Fund company names prefixed or appended to otherwise identical ETF names
+FUND_COMPANIES = [
+    '华泰柏瑞', '国联安', '前海开源', '民生加银', '西部利得', '创金合信', '海富通', '汇添富',
+    '易方达', '华夏', '广发', '南方', '嘉实', '富国', '国泰', '华宝', '博时', '鹏华', '招商',
+    '天弘', '工银', '建信', '银华', '平安', '华安', '景顺', '大成', '万家', '兴业', '中欧',
+    '浦银', '永赢', '华泰', '国投', '东财', '摩根', '泰康', '申万', '长城', '中银', '交银',
+    '诺安', '融通', '财通', '汇安', '华富', '宝盈', '华商', '中金', '国寿', '浙商', '鹏扬',
+]
+_ETF_NOISE_RE = re.compile('|'.join(['ETF', 'LOF', '基金', '联接', '指数'] + FUND_COMPANIES))
+_CJK_RE = re.compile(r'[一-鿿]')
+# IDs at the start of a reply value, e.g. 'E12', 'E12 新能源车ETF', '35', '35:半导体'
+_ETF_ID_RE = re.compile(r'^E\d+(?![\d])', re.IGNORECASE)
+_NAME_ID_RE = re.compile(r'^\d+(?=$|[:：\s])')
+
+
+def estimate_tokens(text):
+    """Rough token count: about 0.6 per CJK character and 0.3 per other character."""
+    cjk = len(_CJK_RE.findall(text))
+    return round(cjk * 0.6 + (len(text) - cjk) * 0.3)
+
+
+def etf_theme(name):
+    """Tracked index/theme of an ETF name, without fund company and 'ETF'/'基金' noise."""
+    theme = _ETF_NOISE_RE.sub('', unicodedata.normalize('NFKC', name)).strip()
+    return theme or name
+
+
+def encode_etfs(etf_list):
+    """
+    Group ETFs by theme and assign group IDs.
+
+    Args:
+        etf_list: List of ETF dicts with 'code' and 'name' keys
+
+    Returns:
+        Dict with 'groups' ({id: {'label', 'codes'}}, representative code first)
+        and 'code_to_id' ({code: id})
+    """
+    by_theme = {}
+    for etf in etf_list:
+        by_theme.setdefault(etf_theme(etf['name']), []).append(etf)
+
+    groups, code_to_id = {}, {}
+    for number, theme in enumerate(sorted(by_theme), 1):
+        # The plainest name (usually the original fund of the theme) represents the group
+        members = sorted(by_theme[theme], key=lambda etf: (len(etf['name']), etf['code']))
+        group_id = f'E{number}'
+        groups[group_id] = {'label': members[0]['name'], 'codes': [etf['code'] for etf in members]}
+        code_to_id.update(dict.fromkeys(groups[group_id]['codes'], group_id))
+    return {'groups': groups, 'code_to_id': code_to_id}
+
+
+def encode_names(names):
+    """
+    Assign numeric IDs to names in sorted order.
+
+    Returns:
+        Dict with 'ids' ({id: name}) and 'name_to_id' ({name: id})
+    """
+    ids = {str(number): name for number, name in enumerate(sorted(set(names)), 1)}
+    return {'ids': ids, 'name_to_id': {name: i for i, name in ids.items()}}
+
+
+class CatalogEncoder:
+    """Versioned, cached ID encodings of the ETF, sector and concept catalogs."""
+
+    def __init__(self, config=None, cache=None):
+        """
+        Initialize the encoder.
+
+        Args:
+            config: Dict with optional keys:
+                - etfs: Merge ETFs by theme behind group IDs (default true)
+                - sector_ids: Numeric IDs for sectors and concepts (default false; short
+                  Chinese names cost about as many prompt tokens as the IDs save in replies)
+            cache: CacheManager instance (default: the shared one)
+        """
+        config = config or {}
+        self.etfs = config.get('etfs', True)
+        self.sector_ids = config.get('sector_ids', False)
+        self.cache = cache or get_cache_manager()
+        self._encodings = {}  # {kind: encoding}
+
+    def _encoding(self, kind, entries, build, cache_time_key):
+        """Get an encoding from memory or disk, rebuilding it when the source catalog changed."""
+        version = f"{ENCODER_VERSION}-{fingerprint(entries)}"
+        encoding = self._encodings.get(kind)
+        if encoding is not None and encoding['version'] == version:
+            return encoding
+
+        def encode():
+            logger.info(f"Encoding {kind} catalog ({len(entries)} entries, version {version})")
+            return {'version': version, **build()}
+
+        cache_key = f'catalog_encoding_{kind}'
+        encoding = self.cache.get(cache_key, encode, cache_time_key, 'json')
+        if not encoding or encoding.get('version') != version:
+            self.cache.clear_key(cache_key)
+            encoding = self.cache.get(cache_key, encode, cache_time_key, 'json')
+        self._encodings[kind] = encoding
+        return encoding
+
+    def etf_encoding(self, etf_list):
+        entries = sorted(f"{etf['code']} {etf['name']}" for etf in etf_list)
+        return self._encoding('etfs', entries, lambda: encode_etfs(etf_list), 'etf_list')
+
+    def name_encoding(self, kind, names):
+        """Encoding of the full 'sectors' or 'concepts' catalog."""
+        cache_time_key = 'sector_list' if kind == 'sectors' else 'concept_list'
+        return self._encoding(kind, sorted(names), lambda: encode_names(names), cache_time_key)
+
+    @staticmethod
+    def report(kind, plain_lines, encoded_lines, separator='\n'):
+        """Log and count the estimated prompt tokens saved by an encoded catalog."""
+        plain = estimate_tokens(separator.join(plain_lines))
+        encoded = estimate_tokens(separator.join(encoded_lines))
+        metrics.increment('catalog_tokens_plain', plain)
+        metrics.increment('catalog_tokens_encoded', encoded)
+        saved = 1 - encoded / plain if plain else 0.0
+        logger.info(
+            f"{kind} catalog: {len(plain_lines)} -> {len(encoded_lines)} lines, "
+            f"~{plain} -> ~{encoded} tokens ({saved:.0%} saved)"
+        )
+
+    def etf_lines(self, etf_list, candidates):
+        """
+        Prompt lines "ID 名称" for the groups of the candidate ETFs, in ID order.
+
+        Args:
+            etf_list: Full ETF list (defines the IDs)
+            candidates: ETFs to show (e.g. the retrieved top-K)
+        """
+        encoding = self.etf_encoding(etf_list)
+        group_ids = {encoding['code_to_id'][etf['code']] for etf in candidates}
+        lines = [f"{i} {encoding['groups'][i]['label']}" for i in sorted(group_ids, key=lambda i: int(i[1:]))]
+        self.report('ETF', sorted(f"{etf['code']} {etf['name']}" for etf in candidates), lines)
+        return lines
+
+    def expand_etfs(self, etf_list, values, accept=None):
+        """
+        Map group IDs from an LLM reply to ETF codes.
+
+        The members of a group are tried in order, representative first, and the
+        first one `accept` returns True for is used, so an ID still yields an ETF
+        when its representative is unusable (e.g. has no holdings data). Groups with
+        no accepted member are dropped. Values that are not group IDs (e.g. a plain
+        code) are passed through unchanged.
+
+        Args:
+            etf_list: Full ETF list (defines the IDs)
+            values: Values from the LLM reply
+            accept: Optional predicate on an ETF code (default: accept the representative)
+        """
+        if not isinstance(values, list):
+            return values
+        groups = self.etf_encoding(etf_list)['groups']
+        expanded = []
+        for value in values:
+            match = _ETF_ID_RE.match(str(value).strip())
+            group = groups.get(match.group(0).upper()) if match else None
+            if group is None:
+                expanded.append(value)
+                continue
+            code = next((c for c in group['codes'] if c not in expanded and (accept is None or accept(c))), None)
+            if code is None:
+                logger.info(f"No usable ETF in group {match.group(0).upper()} ({group['label']})")
+                continue
+            expanded.append(code)
+        return expanded
+
+    def name_lines(self, kind, all_names, names):
+        """
+        Prompt entries "ID:名称" for `names`, with IDs from the full catalog `all_names`.
+        """
+        name_to_id = self.name_encoding(kind, all_names)['name_to_id']
+        lines = [f"{name_to_id[name]}:{name}" for name in names if name in name_to_id]
+        self.report(kind, list(names), lines, ', ')
+        return lines
+
+    def expand_names(self, kind, all_names, values):
+        """Map numeric IDs from an LLM reply to names; other values are passed through."""
+        if not isinstance(values, list):
+            return values
+        ids = self.name_encoding(kind, all_names)['ids']
+        expanded = []
+        for value in values:
+            match = _NAME_ID_RE.match(str(value).strip())
+            expanded.append(ids.get(match.group(0), value) if match else value)
+        return expanded
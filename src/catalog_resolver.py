@@ -0,0 +1,182 @@
+"""
+Resolution of LLM-returned identifiers to canonical catalog entries.
+The LLM is asked for exact sector/concept names and ETF codes, but sometimes
+answers "半导体概念" for "半导体", drops a leading zero or gives an ETF name
+instead of its code. Each catalog gets a resolver with an exact hash map, a
+map of normalized keys and a character n-gram fallback with a score threshold.
+Resolvers are cached per catalog and rebuilt only when the catalog changes.
+"""
+
+import re
+import threading
+import unicodedata
+from src import metrics
+from src.llm_cache import fingerprint
+from src.text_index import NgramIndex
+from src.utils import setup_logger
+
+logger = setup_logger('CatalogResolver')
+
+# Suffixes the LLM tends to add to or drop from sector/concept names
+_SUFFIXES = ('概念股', '概念', '板块', '行业')
+_PUNCT_RE = re.compile(r'[\s\-_·•,，。.、/\\()（）\[\]【】"\'“”‘’:：]+')
+# Exchange prefixes/suffixes on codes, e.g. sh512480 or 512480.SH
+_EXCHANGE_RE = re.compile(r'^(sh|sz|bj)(?=\d)|\.(sh|sz|bj)$')
+
+
+def normalize_key(text):
+    """
+    Normalize a name or code for lookup.
+
+    Full-width characters, case, punctuation, exchange markers and a trailing
+    '概念'/'板块'/'行业' are ignored; numeric codes are zero-padded to 6 digits.
+    """
+    key = unicodedata.normalize('NFKC', str(text)).lower().strip()
+    key = _PUNCT_RE.sub('', _EXCHANGE_RE.sub('', key))
+    if key.isdigit():
+        return key.zfill(6)
+    for suffix in _SUFFIXES:
+        if key.endswith(suffix) and len(key) > len(suffix):
+            return key[:-len(suffix)]
+    return key
+
+
+class CatalogResolver:
+    """Map free-form identifiers to canonical catalog IDs."""
+
+    def __init__(self, entries, min_score=0.5, ngram_sizes=(2, 3)):
+        """
+        Build the lookup maps; the n-gram index is built on the first fuzzy lookup.
+
+        Args:
+            entries: Dict mapping canonical ID to the keys it can be looked up by
+                (e.g. an ETF code to [code, name]); earlier entries win on collisions
+            min_score: Minimum n-gram cosine similarity for a fuzzy match
+            ngram_sizes: Character n-gram sizes for the fuzzy index
+        """
+        self.min_score = min_score
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.exact = {}
+        self.normalized = {}
+        self._keys = []
+        self._owners = []
+        for canonical, keys in entries.items():
+            for key in keys:
+                key = str(key)
+                self.exact.setdefault(key, canonical)
+                self.normalized.setdefault(normalize_key(key), canonical)
+                self._keys.append(key)
+                self._owners.append(canonical)
+        self._index = None
+
+    def resolve(self, value):
+        """
+        Resolve one identifier.
+
+        Args:
+            value: Name or code returned by the LLM
+
+        Returns:
+            Canonical ID, or None if nothing matches well enough
+        """
+        if value is None or value == '':
+            return None
+        value = str(value).strip()
+        canonical = self.exact.get(value)
+        if canonical is not None:
+            return canonical
+        canonical = self.normalized.get(normalize_key(value))
+        if canonical is not None:
+            metrics.increment('resolver_normalized')
+            return canonical
+
+        if self._index is None:
+            self._index = NgramIndex(self._keys, self.ngram_sizes)
+        ranked = self._index.search(value, top_k=1)
+        if ranked and ranked[0][1] >= self.min_score:
+            index, score = ranked[0]
+            metrics.increment('resolver_fuzzy')
+            logger.info(f"Resolved '{value}' to '{self._keys[index]}' (score {score:.2f})")
+            return self._owners[index]
+
+        metrics.increment('resolver_unresolved')
+        logger.warning(f"Could not resolve '{value}' against the catalog")
+        return None
+
+    def resolve_many(self, values, limit=None):
+        """
+        Resolve a list of identifiers, dropping unknown ones and duplicates.
+
+        Args:
+            values: Names or codes returned by the LLM (non-lists yield [])
+            limit: Maximum number of results
+
+        Returns:
+            List of canonical IDs in the original order
+        """
+        if not isinstance(values, list):
+            return []
+        resolved = {}
+        for value in values:
+            canonical = self.resolve(value)
+            if canonical is not None:
+                resolved[canonical] = None
+        return list(resolved)[:limit]
+
+
+class ETFResolver(CatalogResolver):
+    """Resolver over the ETF list, keyed by code and name; `items` maps code to the ETF dict."""
+
+    def __init__(self, etf_list, **kwargs):
+        self.items = {etf['code']: etf for etf in etf_list}
+        super().__init__({code: [code, etf['name']] for code, etf in self.items.items()}, **kwargs)
+
+
+_lock = threading.Lock()
+_resolvers = {}  # {kind: (catalog, length, signature, resolver)}
+
+
+def _cached(kind, catalog, signature, build):
+    """
+    Shared resolver for a catalog list.
+
+    The same list object with the same length (callers reuse one list until the
+    catalog cache refreshes) is an O(1) hit. Only when that misses is the catalog
+    fingerprinted, so an equal but rebuilt list still reuses the resolver.
+
+    Args:
+        kind: Cache slot, e.g. 'etfs:0.5'
+        catalog: The catalog list the resolver is built from
+        signature: Callable returning the catalog fingerprint
+        build: Callable building the resolver
+    """
+    with _lock:
+        cached = _resolvers.get(kind)
+        if cached is not None and cached[0] is catalog and cached[1] == len(catalog):
+            return cached[3]
+    fresh = signature()
+    if cached is not None and cached[2] == fresh:
+        resolver = cached[3]
+    else:
+        resolver = build()
+        logger.info(f"Built {kind} resolver")
+    with _lock:
+        _resolvers[kind] = (catalog, len(catalog), fresh, resolver)
+    return resolver
+
+
+def name_resolver(kind, names, min_score=0.5):
+    """
+    Shared resolver over a name catalog ('sectors', 'concepts', ...).
+
+    Rebuilt only when the names change, i.e. after the catalog cache refreshes.
+    """
+    return _cached(f"{kind}:{min_score}", names, lambda: fingerprint(names),
+                   lambda: CatalogResolver({name: [name] for name in names if name}, min_score))
+
+
+def etf_resolver(etf_list, min_score=0.5):
+    """Shared ETFResolver, rebuilt only when the ETF list changes."""
+    return _cached(f"etfs:{min_score}", etf_list,
+                   lambda: fingerprint(f"{etf['code']} {etf['name']}" for etf in etf_list),
+                   lambda: ETFResolver(etf_list, min_score=min_score))
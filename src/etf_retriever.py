@@ -0,0 +1,185 @@
+"""
+Local ETF candidate retrieval.
+Ranks the ETF list against a tweet with a character n-gram TF-IDF index over
+ETF names plus a keyword-to-theme synonym table, so only the top-K candidates
+are sent to the LLM. Runs fully offline; the index is rebuilt only when the
+ETF list itself changes (i.e. after the ETF list cache refreshes).
+"""
+
+import hashlib
+import re
+from itertools import zip_longest
+from src.catalog_encoder import etf_theme
+from src.text_index import NgramIndex, tokenize
+from src.utils import setup_logger
+
+logger = setup_logger('ETFRetriever')
+
+# Keyword (English or Chinese, case-insensitive) -> A-share ETF themes
+DEFAULT_SYNONYMS = {
+    'tesla': ['新能源车', '汽车', '智能驾驶', '锂电池'],
+    'cybertruck': ['新能源车', '汽车'],
+    'fsd': ['智能驾驶', '汽车', '人工智能'],
+    'autopilot': ['智能驾驶', '汽车'],
+    'robotaxi': ['智能驾驶', '新能源车'],
+    'ev': ['新能源车', '锂电池'],
+    '特斯拉': ['新能源车', '汽车', '智能驾驶', '锂电池'],
+    'spacex': ['航天', '卫星', '军工'],
+    'starship': ['航天', '卫星', '军工'],
+    'rocket': ['航天', '军工'],
+    'mars': ['航天', '卫星'],
+    'starlink': ['卫星', '通信', '5G'],
+    '星链': ['卫星', '通信', '5G'],
+    'satellite': ['卫星', '通信'],
+    'ai': ['人工智能', '芯片', '算力', '云计算'],
+    'grok': ['人工智能', '软件', '云计算'],
+    'xai': ['人工智能', '算力', '芯片'],
+    'gpu': ['芯片', '半导体', '算力'],
+    'nvidia': ['芯片', '半导体', '人工智能'],
+    'chip': ['芯片', '半导体'],
+    'semiconductor': ['半导体', '芯片'],
+    'optimus': ['机器人', '人工智能'],
+    'robot': ['机器人', '人工智能'],
+    'humanoid': ['机器人'],
+    'neuralink': ['医疗', '生物科技', '创新药'],
+    'bitcoin': ['区块链', '金融科技', '证券'],
+    'crypto': ['区块链', '金融科技'],
+    'doge': ['区块链', '金融科技'],
+    'dogecoin': ['区块链', '金融科技'],
+    'solar': ['光伏', '新能源'],
+    'battery': ['电池', '锂电', '储能'],
+    'megapack': ['储能', '电池', '电力'],
+    'energy': ['能源', '电力', '新能源'],
+    'oil': ['石油', '油气', '能源'],
+    'gold': ['黄金'],
+    'tariff': ['出口', '中概互联'],
+    'china': ['中概互联', '恒生'],
+    'nasdaq': ['纳斯达克', '纳指'],
+    'twitter': ['传媒', '互联网'],
+    'boring': ['基建', '工程机械'],
+    'hyperloop': ['基建', '高铁'],
+    'defense': ['军工', '国防'],
+    'fed': ['银行', '证券', '国债'],
+    'car': ['汽车', '新能源车'],
+    'cars': ['汽车', '新能源车'],
+    'falcon': ['航天', '卫星'],
+    'dragon': ['航天', '卫星'],
+    'interest': ['银行', '证券', '国债'],
+    'rates': ['银行', '证券', '国债'],
+    'inflation': ['黄金', '国债'],
+}
+
+
+class ETFRetriever:
+    """Select the ETFs most likely to be relevant to a tweet, without calling the LLM."""
+
+    def __init__(self, config=None):
+        """
+        Initialize the retriever.
+
+        Args:
+            config: Dict with optional keys:
+                - top_k: Number of candidates sent to the LLM (default 50)
+                - ngram_sizes: Character n-gram sizes for Chinese text (default [2, 3])
+                - synonyms: Extra {keyword: [themes]} merged over the built-in table
+        """
+        config = config or {}
+        self.top_k = config.get('top_k', 50)
+        self.ngram_sizes = tuple(config.get('ngram_sizes', [2, 3]))
+        self.synonyms = {k.lower(): v for k, v in DEFAULT_SYNONYMS.items()}
+        self.synonyms.update({k.lower(): v for k, v in config.get('synonyms', {}).items()})
+        self._synonym_patterns = [(self._keyword_pattern(k), themes) for k, themes in self.synonyms.items()]
+
+        self._index = None
+        self._signature = None
+        self._fallback = []  # ETF positions in padding order
+
+    @staticmethod
+    def _keyword_pattern(keyword):
+        # Latin keywords must match whole words ('ai' should not match 'said')
+        if keyword.isascii():
+            return re.compile(r'\b' + re.escape(keyword) + r'\b')
+        return re.compile(re.escape(keyword))
+
+    @staticmethod
+    def _list_signature(etf_list):
+        digest = hashlib.sha1()
+        for etf in etf_list:
+            digest.update(f"{etf['code']} {etf['name']}\n".encode('utf-8'))
+        return digest.hexdigest()
+
+    def ensure_index(self, etf_list):
+        """Build the name index, unless it was already built for this exact ETF list."""
+        signature = self._list_signature(etf_list)
+        if signature == self._signature:
+            return
+        self._index = NgramIndex([etf['name'] for etf in etf_list], self.ngram_sizes)
+        self._fallback = self._fallback_order(etf_list)
+        self._signature = signature
+        logger.info(f"Built ETF retrieval index over {len(etf_list)} ETFs")
+
+    @staticmethod
+    def _fallback_order(etf_list):
+        """
+        Padding order for weak or empty matches: one fund per theme group first
+        (largest themes first, plainest name within a theme), then the next fund
+        of each theme, so the padding covers as many themes as possible.
+        """
+        themes = {}
+        for position, etf in enumerate(etf_list):
+            themes.setdefault(etf_theme(etf['name']), []).append(position)
+        ordered = sorted(themes.items(), key=lambda item: (-len(item[1]), item[0]))
+        members = [sorted(positions, key=lambda p: (len(etf_list[p]['name']), etf_list[p]['code']))
+                   for _, positions in ordered]
+        return [p for row in zip_longest(*members) for p in row if p is not None]
+
+    def expand(self, tweet_text):
+        """
+        Map keywords in a tweet to A-share themes through the synonym table.
+
+        Returns:
+            List of theme strings (with repeats for keywords that share a theme)
+        """
+        lowered = (tweet_text or '').lower()
+        themes = []
+        for pattern, keyword_themes in self._synonym_patterns:
+            if pattern.search(lowered):
+                themes.extend(keyword_themes)
+        return themes
+
+    def select(self, tweet_text, etf_list, top_k=None):
+        """
+        Rank ETFs against a tweet and keep the best candidates.
+
+        Args:
+            tweet_text: Tweet content
+            etf_list: List of available ETFs, each as a dict with 'code' and 'name' keys
+            top_k: Override the configured number of candidates
+
+        Returns:
+            List of top_k ETF dicts (all of them if the list is shorter): matches
+            best first, padded with one fund per theme group when there are too few
+        """
+        top_k = top_k or self.top_k
+        if len(etf_list) <= top_k:
+            return etf_list
+
+        self.ensure_index(etf_list)
+        themes = self.expand(tweet_text)
+        theme_tokens = [token for theme in themes for token in tokenize(theme, self.ngram_sizes)]
+        ranked = self._index.search(tweet_text, top_k, extra_tokens=theme_tokens)
+
+        positions = dict.fromkeys(i for i, _ in ranked)
+        matched = len(positions)
+        # Too few hits (e.g. "Model Y is the best selling car"): let the LLM pick from a broad spread
+        for position in self._fallback:
+            if len(positions) >= top_k:
+                break
+            positions.setdefault(position)
+
+        candidates = [etf_list[i] for i in positions]
+        logger.info(
+            f"Retrieved {matched}/{len(etf_list)} ETF candidates, padded to {len(candidates)} "
+            f"(themes: {sorted(set(themes)) or 'none'})"
+        )
+        return candidates
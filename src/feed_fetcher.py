@@ -0,0 +1,177 @@
+"""
+Lightweight RSS fetcher for Nitter timelines.
+Pulls the instance's RSS feed over a pooled HTTP session and parses it with
+feedparser, so the headless browser is only needed when the feed is blocked.
+Safe to call from several threads: each thread gets its own session and the
+conditional-request validators are guarded by a lock.
+"""
+
+import hashlib
+import html
+import re
+import threading
+from urllib.parse import urlparse
+
+import feedparser
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.utils import DEFAULT_USER_AGENT, setup_logger
+
+logger = setup_logger('FeedFetcher')
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_BR_RE = re.compile(r'<br\s*/?>|</p>', re.IGNORECASE)
+
+# Returned by FeedFetcher.fetch when the feed has not changed since the last poll
+NOT_MODIFIED = object()
+
+
+def html_to_text(fragment):
+    """Convert an RSS description HTML fragment to plain text."""
+    text = _BR_RE.sub('\n', fragment or '')
+    text = _TAG_RE.sub('', text)
+    return html.unescape(text).strip()
+
+
+class FeedFetcher:
+    """Fetch and parse Nitter RSS feeds over a shared HTTP connection pool."""
+
+    def __init__(self, config=None):
+        """
+        Initialize the fetcher.
+
+        Args:
+            config: Dict with optional keys:
+                - timeout: HTTP timeout in seconds (default 10)
+                - min_entries: Treat feeds with fewer entries as incomplete (default 1)
+                - pool_size: Connections kept per host (default 4)
+        """
+        config = config or {}
+        self.timeout = config.get('timeout', 10)
+        self.min_entries = config.get('min_entries', 1)
+        self.pool_size = config.get('pool_size', 4)
+
+        # requests.Session is not thread-safe, so worker threads get one each
+        self._local = threading.local()
+        self._sessions = []
+        self._lock = threading.Lock()
+        # {url: {'etag': ..., 'last_modified': ..., 'digest': ...}}
+        self._validators = {}
+
+    @property
+    def session(self):
+        """HTTP session of the calling thread, created on first use."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update({
+                'User-Agent': DEFAULT_USER_AGENT,
+                'Accept': 'application/rss+xml, application/xml;q=0.9, */*;q=0.8'
+            })
+            self._local.session = session
+            with self._lock:
+                self._sessions.append(session)
+        return session
+
+    def get_feed_url(self, instance, handle='elonmusk'):
+        return f"{instance}/{handle}/rss"
+
+    def fetch(self, instance, handle='elonmusk'):
+        """
+        Fetch the timeline of an instance via RSS.
+
+        Args:
+            instance: Nitter instance base URL
+            handle: Account handle
+
+        Returns:
+            List of timeline item dicts (newest first) with keys
+            'id', 'href', 'text', 'date', 'is_reply', 'is_retweet',
+            NOT_MODIFIED if the feed is unchanged since the last successful fetch,
+            or None if the feed is blocked or incomplete
+        """
+        url = self.get_feed_url(instance, handle)
+        with self._lock:
+            cached = self._validators.get(url, {})
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            logger.warning(f"RSS request to {url} failed: {e}")
+            return None
+
+        if response.status_code == 304:
+            logger.info(f"RSS feed {url} not modified")
+            return NOT_MODIFIED
+
+        if response.status_code != 200:
+            logger.warning(f"RSS feed {url} returned HTTP {response.status_code}")
+            return None
+
+        # Many mirrors ignore conditional requests, so compare the body before parsing it
+        digest = hashlib.sha1(response.content).hexdigest()
+        if digest == cached.get('digest'):
+            logger.info(f"RSS feed {url} unchanged")
+            return NOT_MODIFIED
+
+        feed = feedparser.parse(response.content)
+        if not feed.entries:
+            # Bot-protection and "RSS disabled" pages come back as HTML with no entries
+            logger.warning(f"RSS feed {url} has no entries (content-type: {response.headers.get('Content-Type')})")
+            return None
+
+        items = []
+        for entry in feed.entries:
+            item = self._parse_entry(entry)
+            if item is None:
+                logger.warning(f"RSS feed {url} has an incomplete entry, treating feed as incomplete")
+                return None
+            items.append(item)
+
+        if len(items) < self.min_entries:
+            logger.warning(f"RSS feed {url} returned only {len(items)} entries")
+            return None
+
+        with self._lock:
+            self._validators[url] = {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'digest': digest
+            }
+        return items
+
+    def _parse_entry(self, entry):
+        """Convert a feedparser entry to a timeline item dict, or None if it lacks a status link."""
+        link = entry.get('link') or entry.get('id')
+        if not link or '/status/' not in link:
+            return None
+
+        parsed = urlparse(link)
+        tweet_id = parsed.path.rstrip('/').split('/')[-1]
+        if not tweet_id.isdigit():
+            return None
+
+        title = entry.get('title', '')
+        return {
+            'id': tweet_id,
+            'href': f"{parsed.path}#m",
+            'text': html_to_text(entry.get('description') or title),
+            'date': entry.get('published', 'Unknown time'),
+            'is_reply': title.startswith('R to @'),
+            'is_retweet': title.startswith('RT by @')
+        }
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
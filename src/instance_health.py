@@ -0,0 +1,175 @@
+"""
+Health registry for Nitter instances.
+Tracks an EWMA of latency and success rate per instance, quarantines failing
+mirrors with exponential backoff and ranks instances best-first. Scores are
+persisted under data/ so a restart does not have to relearn them.
+"""
+
+import json
+import os
+import time
+from src.utils import DATA_DIR, setup_logger
+
+logger = setup_logger('InstanceHealth')
+
+
+class InstanceHealth:
+    """Per-instance latency/success statistics with quarantine and persistence."""
+
+    def __init__(self, name, config=None):
+        """
+        Initialize the registry and load persisted scores.
+
+        Args:
+            name: Registry name, used for the persistence file (e.g. 'rss', 'browser')
+            config: Dict with optional keys:
+                - alpha: EWMA smoothing factor (default 0.3)
+                - default_latency: Assumed latency in seconds for unknown instances (default 5.0)
+                - base_backoff: First quarantine duration in seconds (default 60)
+                - max_backoff: Upper bound for the quarantine duration (default 3600)
+        """
+        config = config or {}
+        self.name = name
+        self.alpha = config.get('alpha', 0.3)
+        self.default_latency = config.get('default_latency', 5.0)
+        self.base_backoff = config.get('base_backoff', 60)
+        self.max_backoff = config.get('max_backoff', 3600)
+        self.path = os.path.join(DATA_DIR, f'instance_health_{name}.json')
+        self.stats = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load instance health from {self.path}: {e}")
+            return {}
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(self.stats, f, indent=2)
+        except OSError as e:
+            logger.warning(f"Failed to save instance health to {self.path}: {e}")
+
+    def _default_entry(self):
+        return {
+            'latency_ewma': self.default_latency,
+            'success_ewma': 1.0,
+            'successes': 0,
+            'failures': 0,
+            'consecutive_failures': 0,
+            'quarantined_until': 0,
+            'last_error': None
+        }
+
+    def _entry(self, instance):
+        if instance not in self.stats:
+            self.stats[instance] = self._default_entry()
+        return self.stats[instance]
+
+    def record_success(self, instance, latency):
+        """
+        Record a successful fetch.
+
+        Args:
+            instance: Instance base URL
+            latency: Time the fetch took in seconds
+        """
+        entry = self._entry(instance)
+        entry['latency_ewma'] = self.alpha * latency + (1 - self.alpha) * entry['latency_ewma']
+        entry['success_ewma'] = self.alpha + (1 - self.alpha) * entry['success_ewma']
+        entry['successes'] += 1
+        entry['consecutive_failures'] = 0
+        entry['quarantined_until'] = 0
+
+    def record_failure(self, instance, error=None, latency=None):
+        """
+        Record a failed fetch and quarantine the instance with exponential backoff.
+
+        Args:
+            instance: Instance base URL
+            error: Optional error description
+            latency: Time spent before the failure, in seconds
+        """
+        entry = self._entry(instance)
+        if latency is not None:
+            entry['latency_ewma'] = self.alpha * latency + (1 - self.alpha) * entry['latency_ewma']
+        entry['success_ewma'] = (1 - self.alpha) * entry['success_ewma']
+        entry['failures'] += 1
+        entry['consecutive_failures'] += 1
+        entry['last_error'] = str(error)[:200] if error else None
+
+        backoff = min(self.base_backoff * 2 ** (entry['consecutive_failures'] - 1), self.max_backoff)
+        entry['quarantined_until'] = time.time() + backoff
+        logger.info(f"[{self.name}] Quarantined {instance} for {backoff:.0f}s after {entry['consecutive_failures']} consecutive failures")
+
+    def score(self, instance):
+        """Higher is better: success rate per second of expected latency."""
+        entry = self.stats.get(instance)
+        if entry is None:
+            return 1.0 / self.default_latency
+        return entry['success_ewma'] / max(entry['latency_ewma'], 0.1)
+
+    def is_quarantined(self, instance):
+        entry = self.stats.get(instance)
+        return entry is not None and entry['quarantined_until'] > time.time()
+
+    def ranked(self, instances, include_quarantined=True):
+        """
+        Order instances best-first. Quarantined instances are either skipped until
+        their backoff expires or kept at the end, ordered by release time, as a last
+        resort once every healthy one has failed.
+
+        Args:
+            instances: Instance base URLs
+            include_quarantined: Append quarantined instances instead of skipping them
+
+        Returns:
+            Reordered list of instances
+        """
+        healthy = [i for i in instances if not self.is_quarantined(i)]
+        healthy.sort(key=self.score, reverse=True)
+        if not include_quarantined:
+            return healthy
+        quarantined = [i for i in instances if self.is_quarantined(i)]
+        quarantined.sort(key=lambda i: self.stats[i]['quarantined_until'])
+        return healthy + quarantined
+
+    def summary(self, instances=None):
+        """
+        Get per-instance statistics, best-first.
+
+        Args:
+            instances: Limit to these instances (default: all known)
+
+        Returns:
+            List of dicts with instance, score, latency, success rate and quarantine state
+        """
+        instances = instances if instances is not None else list(self.stats.keys())
+        now = time.time()
+        rows = []
+        for instance in self.ranked(instances):
+            entry = self.stats.get(instance) or self._default_entry()
+            rows.append({
+                'instance': instance,
+                'score': round(self.score(instance), 3),
+                'latency_ewma': round(entry['latency_ewma'], 2),
+                'success_ewma': round(entry['success_ewma'], 3),
+                'successes': entry['successes'],
+                'failures': entry['failures'],
+                'quarantine_remaining': max(0, round(entry['quarantined_until'] - now)),
+                'last_error': entry['last_error']
+            })
+        return rows
+
+    def log_summary(self, instances=None):
+        """Log one line per instance with its current health."""
+        for row in self.summary(instances):
+            state = f"quarantined {row['quarantine_remaining']}s" if row['quarantine_remaining'] else "ok"
+            logger.info(
+                f"[{self.name}] {row['instance']}: score={row['score']} latency={row['latency_ewma']}s "
+                f"success={row['success_ewma']} ({row['successes']}/{row['successes'] + row['failures']}) {state}"
+            )
@@ -0,0 +1,244 @@
+"""
+Tolerant parsing of JSON objects in LLM replies.
+Handles markdown fences, prose before or after the object, trailing commas,
+raw newlines inside strings and replies cut off mid-object (closed at the last
+complete member), so a slightly malformed reply is not thrown away.
+"""
+
+import json
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+
+def strip_fences(text):
+    """Remove a surrounding ```json ... ``` markdown block, if any."""
+    text = (text or '').strip()
+    if text.startswith('```'):
+        text = text[3:]
+        if text[:4].lower() == 'json':
+            text = text[4:]
+    if text.endswith('```'):
+        text = text[:-3]
+    return text.strip()
+
+
+def _json_start(text):
+    """Index of the first '{' or '[' in text, or -1."""
+    starts = [i for i in (text.find('{'), text.find('[')) if i >= 0]
+    return min(starts) if starts else -1
+
+
+def decode_complete(text):
+    """
+    Decode the first complete JSON object or array in text.
+
+    Used on a streaming buffer: returns None until the top-level value has been
+    closed, and ignores whatever follows it.
+
+    Returns:
+        Parsed value, or None if no complete value is present yet
+    """
+    start = _json_start(text)
+    if start < 0:
+        return None
+    try:
+        value, _ = json.JSONDecoder().raw_decode(text, start)
+    except json.JSONDecodeError:
+        return None
+    return value
+
+
+class MemberScanner:
+    """
+    Incremental scanner for the top-level members of a streamed JSON object.
+
+    feed() only looks at the text it is given, so scanning a whole reply is
+    O(n); each member is decoded as soon as its value ends, before the object
+    itself has closed.
+    """
+
+    def __init__(self):
+        self.members = {}
+        self.closed = False  # The top-level object has ended
+        self._parts = []
+        self._length = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._in_value = False  # Past the ':' of a top-level member
+        self._member_start = None
+
+    def feed(self, text):
+        """
+        Scan the next chunk of the reply.
+
+        Returns:
+            True once the top-level object has closed
+        """
+        offset = self._length
+        self._parts.append(text)
+        self._length += len(text)
+        for i, ch in enumerate(text, offset):
+            if self.closed:
+                break
+            if self._member_start is None:
+                if ch == '{':
+                    self._depth = 1
+                    self._member_start = i + 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == '\\':
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._in_value:
+                        self._finish(i + 1)
+            elif ch == '"':
+                self._in_string = True
+            elif ch in _CLOSERS:
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1 and self._in_value:
+                    self._finish(i + 1)
+                elif self._depth == 0:
+                    if self._in_value:
+                        # A number or literal ends at the closing brace
+                        self._finish(i)
+                    self.closed = True
+            elif self._depth == 1:
+                if ch == ':':
+                    self._in_value = True
+                elif ch == ',':
+                    if self._in_value:
+                        self._finish(i)
+                    self._member_start = i + 1
+        return self.closed
+
+    def _finish(self, end):
+        """Decode the member between the last separator and end."""
+        self._in_value = False
+        member = ''.join(self._parts)[self._member_start:end]
+        try:
+            self.members.update(json.loads('{' + member + '}'))
+        except json.JSONDecodeError:
+            pass
+
+
+def _scan(text):
+    """
+    Rewrite text into strict JSON where possible.
+
+    Drops trailing commas, escapes raw control characters inside strings and
+    records, for every member separator, the prefix before it and the brackets
+    still open there, so a truncated reply can be cut back to its last complete
+    member.
+
+    Returns:
+        Tuple of (cleaned text, open bracket stack, in_string, cut points)
+    """
+    out = []
+    stack = []
+    cuts = []  # (length of out, stack snapshot) at each ',' outside strings
+    in_string = False
+    escaped = False
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            elif ch == '\n':
+                ch = '\\n'
+            elif ch == '\t':
+                ch = '\\t'
+            elif ch == '\r':
+                ch = ''
+            out.append(ch)
+        elif ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            out.append(ch)
+        elif ch in '}]':
+            if stack:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                # Anything after the top-level value is prose
+                break
+        elif ch == ',':
+            rest = text[i + 1:].lstrip()
+            if not rest or rest[0] not in '}]':
+                cuts.append((len(out), tuple(stack)))
+                out.append(ch)
+        else:
+            out.append(ch)
+        i += 1
+    return ''.join(out), stack, in_string, cuts
+
+
+def _close(prefix, stack):
+    return prefix.rstrip().rstrip(',') + ''.join(_CLOSERS[b] for b in reversed(stack))
+
+
+def repair(text):
+    """
+    Best-effort repair of a malformed or truncated JSON reply.
+
+    Returns:
+        Candidate JSON strings, most complete first
+    """
+    text = strip_fences(text)
+    start = _json_start(text)
+    if start < 0:
+        return []
+    cleaned, stack, in_string, cuts = _scan(text[start:])
+
+    candidates = []
+    if not stack and not in_string:
+        candidates.append(cleaned)
+    else:
+        # Cut off mid-value: close the open string and brackets as-is first
+        candidates.append(_close(cleaned + ('"' if in_string else ''), stack))
+    # Then fall back to the last complete members
+    for length, snapshot in reversed(cuts):
+        candidates.append(_close(cleaned[:length], list(snapshot)))
+    return candidates
+
+
+def loads(text):
+    """
+    Parse the JSON object in an LLM reply, repairing it if needed.
+
+    Args:
+        text: Raw reply text
+
+    Returns:
+        Parsed JSON value
+
+    Raises:
+        json.JSONDecodeError: If no candidate parses (the raw reply is in `e.doc`)
+    """
+    stripped = strip_fences(text)
+    try:
+        return json.loads(stripped)
+    except json.JSONDecodeError as e:
+        error = e
+
+    value = decode_complete(stripped)
+    if value is not None:
+        return value
+
+    for candidate in repair(stripped):
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise json.JSONDecodeError(error.msg, text or '', error.pos)
@@ -0,0 +1,164 @@
+"""
+Content-addressed cache for parsed LLM responses.
+Keys combine the normalized tweet text, model, prompt version and a fingerprint
+of the candidate list, so a restart, dry run or the same tweet seen under a
+different link reuses the earlier answer without a network call. Entries expire
+after a TTL, the least recently used ones are evicted beyond the capacity, and
+the cache is persisted under data/cache as a snapshot plus an append-only
+journal that is periodically compacted into it.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from src.cache_manager import get_cache_manager
+from src.utils import setup_logger
+
+logger = setup_logger('LLMCache')
+
+_URL_RE = re.compile(r'https?://\S+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """
+    Lowercase, drop links and collapse whitespace, so trivially different copies share a key.
+
+    Links are kept when nothing else is left, so link-only tweets do not all
+    collapse onto one key.
+    """
+    text = text or ''
+    normalized = _SPACE_RE.sub(' ', _URL_RE.sub('', text)).strip().lower()
+    return normalized or _SPACE_RE.sub(' ', text).strip().lower()
+
+
+def fingerprint(items):
+    """Short digest of a candidate list (ETF lines, sector names, group catalog...)."""
+    digest = hashlib.sha1()
+    for item in items or []:
+        digest.update(f"{item}\n".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class LLMResponseCache:
+    """Persistent LRU + TTL cache of parsed LLM responses."""
+
+    def __init__(self, config=None, path=None):
+        """
+        Initialize the cache and load it from disk.
+
+        Args:
+            config: Dict with optional keys:
+                - ttl: Entry lifetime in seconds (default 7 days)
+                - capacity: Maximum number of entries (default 2000)
+            path: Snapshot file (default data/cache/llm_responses.json); the journal
+                sits next to it with a '.journal' suffix
+        """
+        config = config or {}
+        self.ttl = config.get('ttl', 7 * 86400)
+        self.capacity = config.get('capacity', 2000)
+        self.path = path or os.path.join(get_cache_manager().cache_dir, 'llm_responses.json')
+        self.journal_path = f"{os.path.splitext(self.path)[0]}.journal"
+        self.entries = OrderedDict()  # {key: {'value': ..., 'created_at': ...}}, oldest use first
+        # Analyzer worker threads share one cache
+        self.lock = threading.Lock()
+        self._journal_lines = 0
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries.update(json.load(f))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.warning(f"Failed to load LLM response cache: {e}")
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash mid-append
+                        continue
+                    self._insert(record['key'], {'value': record['value'], 'created_at': record['created_at']})
+                    self._journal_lines += 1
+
+    def _insert(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        """Write all entries as a snapshot and truncate the journal."""
+        with self.lock:
+            self._compact()
+
+    def _compact(self):
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            open(self.journal_path, 'w').close()
+            self._journal_lines = 0
+        except OSError as e:
+            logger.warning(f"Failed to save LLM response cache: {e}")
+
+    @staticmethod
+    def make_key(method, tweet_text, model, prompt_version, candidates=None):
+        """
+        Build a cache key.
+
+        Args:
+            method: Analyzer step, e.g. 'etfs' or 'sectors'
+            tweet_text: Tweet text (normalized before hashing)
+            model: Model name
+            prompt_version: Version of the prompt template
+            candidates: Candidate list shown to the model, if any
+
+        Returns:
+            Hex digest string, or None for an empty tweet (not cached)
+        """
+        text = normalize_text(tweet_text)
+        if not text:
+            return None
+        parts = [method, model, str(prompt_version), fingerprint(candidates), text]
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Get a cached value, or None if missing or expired."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry['created_at'] > self.ttl:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry['value']
+
+    def put(self, key, value):
+        """
+        Store a value, evicting the least recently used entries.
+
+        The entry is appended to the journal, so a put costs one short write;
+        the journal is compacted into the snapshot once it outgrows the capacity.
+        """
+        entry = {'value': value, 'created_at': time.time()}
+        line = json.dumps({'key': key, **entry}, ensure_ascii=False)
+        with self.lock:
+            self._insert(key, entry)
+            try:
+                with open(self.journal_path, 'a', encoding='utf-8') as f:
+                    f.write(f"{line}\n")
+                self._journal_lines += 1
+            except OSError as e:
+                logger.warning(f"Failed to append to LLM response cache journal: {e}")
+            if self._journal_lines > self.capacity:
+                self._compact()
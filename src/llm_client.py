@@ -0,0 +1,248 @@
+"""
+Resilient chat completion client.
+Wraps one or two OpenAI-compatible endpoints (`llm_config` and the optional
+`llm_config_fallback`) with per-request timeouts, jittered exponential retries
+on 429/5xx/timeouts, a circuit breaker per endpoint and failover (also on
+401/403/404, which point at a broken key or model rather than a bad request). Every retry,
+failure, breaker trip and failover is counted in src.metrics.
+"""
+
+import random
+import threading
+import time
+import openai
+from openai import OpenAI
+from src import metrics
+from src.utils import setup_logger
+
+logger = setup_logger('LLMClient')
+
+
+class LLMUnavailableError(Exception):
+    """Raised when no endpoint could serve a request."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast after repeated failures.
+
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `reset_timeout` seconds, then lets a single trial call through (half-open):
+    success closes the breaker, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half_open'
+        return 'open'
+
+    def allow(self):
+        """Whether a call may be attempted now."""
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release(self):
+        """Free the half-open trial slot after a call that says nothing about endpoint health."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failure; returns True if this failure opened the breaker."""
+        with self.lock:
+            self.failures += 1
+            was_open = self.opened_at is not None
+            if self.trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_in_flight = False
+            return self.opened_at is not None and not was_open
+
+
+def is_retryable(error):
+    """Rate limits, timeouts, connection errors and 5xx responses are worth retrying."""
+    if isinstance(error, (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def is_endpoint_error(error):
+    """Auth and not-found errors: this endpoint's key or model is broken, another endpoint may work."""
+    return isinstance(error, openai.APIStatusError) and error.status_code in (401, 403, 404)
+
+
+def _retry_after(error):
+    """Seconds from a Retry-After header, if the provider sent one."""
+    response = getattr(error, 'response', None)
+    value = response.headers.get('retry-after') if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class LLMEndpoint:
+    """One OpenAI-compatible endpoint with its own breaker."""
+
+    def __init__(self, name, llm_conf, breaker_conf):
+        self.name = name
+        self.model = llm_conf.get('model', 'gpt-3.5-turbo')
+        # Retries are handled by LLMClient, so the SDK's own retries are disabled
+        self.client = OpenAI(
+            base_url=llm_conf.get('api_base'),
+            api_key=llm_conf.get('api_key'),
+            timeout=llm_conf.get('timeout', 30),
+            max_retries=0
+        )
+        self.breaker = CircuitBreaker(
+            breaker_conf.get('circuit_failure_threshold', 5),
+            breaker_conf.get('circuit_reset_timeout', 60)
+        )
+
+
+class LLMClient:
+    """Chat completions with timeouts, retries, circuit breaking and failover."""
+
+    def __init__(self, config):
+        """
+        Initialize the endpoints.
+
+        Args:
+            config: Full config dict. 'llm_config' is the primary endpoint and
+                'llm_config_fallback' an optional secondary one. Resilience settings
+                are read from 'llm_config':
+                - timeout: Per-request timeout in seconds (default 30)
+                - max_retries: Retries per endpoint on retryable errors (default 3)
+                - retry_base_delay / retry_max_delay: Backoff bounds in seconds (default 1 / 20)
+                - deadline: Overall time budget for one call incl. retries and failover (default 120)
+                - circuit_failure_threshold: Consecutive failures that open the breaker (default 5)
+                - circuit_reset_timeout: Seconds before a trial call is allowed (default 60)
+        """
+        llm_conf = config.get('llm_config', {})
+        self.max_retries = llm_conf.get('max_retries', 3)
+        self.retry_base_delay = llm_conf.get('retry_base_delay', 1.0)
+        self.retry_max_delay = llm_conf.get('retry_max_delay', 20.0)
+        self.deadline = llm_conf.get('deadline', 120)
+
+        self.endpoints = [LLMEndpoint('primary', llm_conf, llm_conf)]
+        fallback_conf = config.get('llm_config_fallback')
+        if fallback_conf:
+            self.endpoints.append(LLMEndpoint('fallback', fallback_conf, llm_conf))
+        # Per-thread details of the last chat() call, for per-call metrics
+        self._local = threading.local()
+
+    @property
+    def model(self):
+        """Model of the primary endpoint."""
+        return self.endpoints[0].model
+
+    @property
+    def last_call(self):
+        """Model and retry count (extra attempts incl. failover) of this thread's last chat() call."""
+        return {
+            'model': getattr(self._local, 'model', self.model),
+            'retries': max(0, getattr(self._local, 'retries', 0)),
+        }
+
+    def _backoff(self, attempt, error):
+        """Full-jitter exponential backoff, at least the provider's Retry-After."""
+        delay = random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+        retry_after = _retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_max_delay))
+        return delay
+
+    def chat(self, messages, **kwargs):
+        """
+        Create a chat completion, failing over to the next endpoint when one is down.
+
+        Args:
+            messages: Chat messages
+            **kwargs: Extra arguments for chat.completions.create (model is set per endpoint)
+
+        Returns:
+            The chat completion response
+
+        Raises:
+            LLMUnavailableError: If every endpoint failed, is open or the deadline passed
+            openai.APIStatusError: For request errors (e.g. 400/422), unchanged and without failover
+        """
+        started_at = time.monotonic()
+        last_error = None
+        self._local.model = self.model
+        self._local.retries = -1
+
+        for index, endpoint in enumerate(self.endpoints):
+            if index > 0:
+                metrics.increment('llm_failovers')
+                logger.warning(f"Failing over to {endpoint.name} LLM endpoint")
+            if not endpoint.breaker.allow():
+                metrics.increment('llm_circuit_rejections')
+                logger.warning(f"Circuit open for {endpoint.name} LLM endpoint, skipping")
+                continue
+
+            self._local.model = endpoint.model
+            for attempt in range(self.max_retries + 1):
+                metrics.increment(f'llm_requests_{endpoint.name}')
+                self._local.retries += 1
+                try:
+                    response = endpoint.client.chat.completions.create(
+                        model=endpoint.model, messages=messages, **kwargs
+                    )
+                    endpoint.breaker.record_success()
+                    return response
+                except Exception as e:
+                    metrics.increment('llm_errors')
+                    if isinstance(e, openai.APITimeoutError):
+                        metrics.increment('llm_timeouts')
+                    if not is_retryable(e) and not is_endpoint_error(e):
+                        # The request itself is bad (e.g. 400/422); another attempt or endpoint will not help
+                        endpoint.breaker.release()
+                        raise
+                    last_error = e
+
+                if endpoint.breaker.record_failure():
+                    metrics.increment('llm_circuit_opened')
+                    logger.error(f"Circuit opened for {endpoint.name} LLM endpoint after repeated failures")
+                if is_endpoint_error(last_error):
+                    # Retrying a revoked key or unknown model on the same endpoint cannot succeed
+                    logger.error(f"{endpoint.name} LLM endpoint rejected the call: {last_error}")
+                    break
+                if endpoint.breaker.state != 'closed' or attempt == self.max_retries:
+                    break
+
+                delay = self._backoff(attempt, last_error)
+                if time.monotonic() - started_at + delay > self.deadline:
+                    break
+                metrics.increment('llm_retries')
+                logger.warning(
+                    f"LLM call to {endpoint.name} failed ({last_error}), "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+                )
+                time.sleep(delay)
+
+            if time.monotonic() - started_at > self.deadline:
+                break
+
+        raise LLMUnavailableError(f"No LLM endpoint available: {last_error}")
@@ -1,14 +1,19 @@
 import time
 import schedule
 import argparse
+import signal
 import sys
-from src.utils import load_config, setup_logger
+from concurrent.futures import ThreadPoolExecutor
+from src import metrics
+from src.utils import DATA_DIR, load_config, setup_logger
 from src.monitor import TwitterMonitor
 from src.analyzer import ETFAnalyzer
+from src.catalog_resolver import etf_resolver
 from src.market_data import MarketData
 from src.sector_data import SectorData
 from src.stock_hot import StockHot
 from src.notifier import Notifier
+from src.scheduler import AdaptiveScheduler
 
 logger = setup_logger('Main')
 
@@ -74,134 +79,275 @@ def process_sectors_and_concepts(tweet_text, sectors, concepts, sector_data, sto
     return result
 
 
-def job(monitor, analyzer, market_data, sector_data, stock_hot, notifier):
-    logger.info("Checking for new tweets...")
+def collect_etf_results(etf_codes, etf_list, market_data):
+    """
+    Look up holdings for the selected ETFs and rank their common stocks.
+
+    Args:
+        etf_codes: ETF codes chosen by the LLM
+        etf_list: List of available ETFs, each as a dict with 'code' and 'name' keys
+        market_data: MarketData instance
+
+    Returns:
+        Tuple of (etf_results, common_stocks):
+        - etf_results: List of {'code', 'name', 'holdings'} for ETFs with holdings data
+        - common_stocks: Top 10 stocks by occurrence across the ETFs, then total weight
+    """
+    etf_results = []
+    final_common_stocks = []
+    stock_stats = {}  # {code: {'name': name, 'count': 0, 'weight': 0.0}}
+
+    # Build ETF results from selected codes
+    resolver = etf_resolver(etf_list)
+    for code in etf_codes:
+        # Find ETF name from list (codes are usually canonical already, so this is a dict hit)
+        etf_info = resolver.items.get(resolver.resolve(code))
+        if not etf_info:
+            logger.warning(f"ETF code {code} not found in ETF list")
+            continue
+        code = etf_info['code']
+
+        holdings = market_data.get_holdings(code)
+        # Only include ETFs that have valid holdings data
+        if not holdings:
+            logger.info(f"ETF {etf_info['name']}({code}) has no holdings data, skipping")
+            continue
+
+        etf_results.append({
+            'code': code,
+            'name': etf_info['name'],
+            'holdings': holdings
+        })
+
+        # Deduplicate holdings by stock code within this ETF
+        # (akshare may return multiple records for the same stock)
+        unique_holdings = {}
+        for h in holdings:
+            s_code = h.get('股票代码')
+            if s_code and s_code not in unique_holdings:
+                unique_holdings[s_code] = h
+
+        # Accumulate stock stats for intersection (using deduplicated holdings)
+        for h in unique_holdings.values():
+            s_code = h.get('股票代码')
+            s_name = h.get('股票名称')
+            # '占净值比例' is usually a string like "10.5" or float
+            try:
+                weight = float(h.get('占净值比例', 0))
+            except:
+                weight = 0.0
+
+            if s_code not in stock_stats:
+                stock_stats[s_code] = {'name': s_name, 'count': 0, 'total_weight': 0.0}
+
+            stock_stats[s_code]['count'] += 1
+            stock_stats[s_code]['total_weight'] += weight
+
+    # Rank stocks: primarily by count (intersection), secondarily by total weight
+    ranked_stocks = sorted(
+        stock_stats.items(),
+        key=lambda x: (x[1]['count'], x[1]['total_weight']),
+        reverse=True
+    )
+
+    # Take top 10 common stocks
+    for s_code, stats in ranked_stocks[:10]:
+        final_common_stocks.append({
+            'code': s_code,
+            'name': stats['name'],
+            'occurrence': stats['count'],
+            'total_weight': stats['total_weight']
+        })
+
+    return etf_results, final_common_stocks
+
+
+def analyze_tweet(tweet, analyzer, market_data, sector_data, stock_hot, etf_list, sectors_list, concepts_list):
+    """
+    Run the full analysis pipeline for one tweet. Safe to call from worker threads.
+
+    Args:
+        tweet: Tweet dict from the monitor
+        etf_list: List of available ETFs (may be empty)
+        sectors_list: List of available sectors (may be empty)
+        concepts_list: List of available concepts (may be empty)
+
+    Returns:
+        Analysis result dict for Notifier.send_notification, or None if the
+        relevance gate rejected the tweet and no notification should be sent
+    """
+    logger.info(f"Processing new tweet from @{tweet['author']}: {tweet['id']}")
+
+    # 0. Skip the LLM entirely for memes, one-word replies and other chatter
+    gate = analyzer.relevance_gate
+    decision = gate.decide(tweet['text']) if gate is not None else None
+    if decision is not None:
+        # Logged now, so the decision is kept even if the analysis below fails
+        gate.log(tweet, decision)
+        metrics.increment('gate_passed' if decision['relevant'] else 'gate_skipped')
+    if decision is not None and not decision['relevant']:
+        if gate.on_skip == 'silent':
+            return None
+        # Empty result: the notification says no A-share relevance was found
+        return {
+            'etfs': [],
+            'common_stocks': [],
+            'summary': '',
+            'hot_sector_stocks': [],
+            'hot_concept_stocks': [],
+            'sector_names': [],
+            'concept_names': []
+        }
+
+    # 1. Analyze with LLM to get summary, ETF codes and (combined mode) sectors/concepts
+    summary = ""
+    etf_codes = []
+    relevant = None
+
+    # A theme group expands to its first member with holdings data (cached for step 2)
+    def has_holdings(code):
+        return bool(market_data.get_holdings(code))
+
+    if analyzer.combined_analysis:
+        analysis = analyzer.analyze_all(tweet['text'], etf_list or [], sectors_list, concepts_list,
+                                        accept_etf=has_holdings)
+        summary, etf_codes = analysis['summary'], analysis['etf_codes']
+        relevant = {'sectors': analysis['sectors'], 'concepts': analysis['concepts']}
+    elif etf_list:
+        summary, etf_codes = analyzer.analyze_relevant_etfs(tweet['text'], etf_list, accept_etf=has_holdings)
+
+    # 2. Get ETF details and holdings for selected ETFs
+    etf_results, final_common_stocks = [], []
+    if etf_codes and etf_list:
+        etf_results, final_common_stocks = collect_etf_results(etf_codes, etf_list, market_data)
+
+    # 3. Process sectors and concepts (new feature)
+    sector_result = {}
     try:
-        new_tweets = monitor.fetch_tweets()
+        if relevant is None:
+            # Analyze relevant sectors/concepts
+            relevant = analyzer.analyze_relevant_sectors(tweet['text'], sectors_list, concepts_list)
+
+        # Process and get hot stocks
+        sector_result = process_sectors_and_concepts(
+            tweet['text'],
+            relevant.get('sectors', []),
+            relevant.get('concepts', []),
+            sector_data,
+            stock_hot
+        )
+    except Exception as e:
+        logger.error(f"Error in sector/concept analysis: {e}", exc_info=True)
+
+    if decision is not None:
+        # The LLM outcome labels the logged decision as training data for the gate
+        found = bool(etf_codes or (relevant and (relevant.get('sectors') or relevant.get('concepts'))))
+        gate.log_outcome(tweet, found)
+
+    return {
+        'etfs': etf_results,
+        'common_stocks': final_common_stocks,
+        'summary': summary,
+        'hot_sector_stocks': sector_result.get('hot_sector_stocks', []),
+        'hot_concept_stocks': sector_result.get('hot_concept_stocks', []),
+        'sector_names': sector_result.get('sector_names', []),
+        'concept_names': sector_result.get('concept_names', [])
+    }
+
+
+def job(monitor, analyzer, market_data, sector_data, stock_hot, notifier, handles=None):
+    """
+    Poll accounts for new tweets and analyze/notify each of them.
+
+    Args:
+        handles: Accounts to poll (default: all configured accounts)
+
+    Returns:
+        Dict mapping handle to the number of new tweets found (0 on errors)
+    """
+    handles = handles or list(monitor.accounts)
+    logger.info(f"Checking for new tweets from {', '.join('@' + h for h in handles)}...")
+    counts = dict.fromkeys(handles, 0)
+    try:
+        results = monitor.fetch_many(handles)
+        counts.update({handle: len(tweets) for handle, tweets in results.items()})
+        new_tweets = [tweet for tweets in results.values() for tweet in tweets]
+        detected_at = time.monotonic()
         if not new_tweets:
             logger.info("No new tweets found.")
-            return
+            return counts
 
         # Get ETF list once for all tweets
         etf_list = market_data.get_etf_list_for_analysis()
         if not etf_list:
             logger.warning("ETF list not available, skipping ETF analysis")
 
-        for tweet in new_tweets:
-            logger.info(f"Processing new tweet: {tweet['id']}")
-
-            # 1. Analyze with LLM to get summary and ETF codes
-            summary = ""
-            etf_results = []
-            final_common_stocks = []
-
-            if etf_list:
-                summary, etf_codes = analyzer.analyze_relevant_etfs(tweet['text'], etf_list)
-
-                # 2. Get ETF details and holdings for selected ETFs
-                if etf_codes:
-                    stock_stats = {}  # {code: {'name': name, 'count': 0, 'weight': 0.0}}
-
-                    # Build ETF results from selected codes
-                    for code in etf_codes:
-                        # Find ETF name from list
-                        etf_info = next((e for e in etf_list if e['code'] == code), None)
-                        if not etf_info:
-                            logger.warning(f"ETF code {code} not found in ETF list")
-                            continue
-
-                        holdings = market_data.get_holdings(code)
-                        # Only include ETFs that have valid holdings data
-                        if not holdings:
-                            logger.info(f"ETF {etf_info['name']}({code}) has no holdings data, skipping")
-                            continue
-
-                        etf_results.append({
-                            'code': code,
-                            'name': etf_info['name'],
-                            'holdings': holdings
-                        })
-
-                        # Deduplicate holdings by stock code within this ETF
-                        # (akshare may return multiple records for the same stock)
-                        unique_holdings = {}
-                        for h in holdings:
-                            s_code = h.get('股票代码')
-                            if s_code and s_code not in unique_holdings:
-                                unique_holdings[s_code] = h
-
-                        # Accumulate stock stats for intersection (using deduplicated holdings)
-                        for h in unique_holdings.values():
-                            s_code = h.get('股票代码')
-                            s_name = h.get('股票名称')
-                            # '占净值比例' is usually a string like "10.5" or float
-                            try:
-                                weight = float(h.get('占净值比例', 0))
-                            except:
-                                weight = 0.0
-
-                            if s_code not in stock_stats:
-                                stock_stats[s_code] = {'name': s_name, 'count': 0, 'total_weight': 0.0}
-
-                            stock_stats[s_code]['count'] += 1
-                            stock_stats[s_code]['total_weight'] += weight
-
-                    # Rank stocks: primarily by count (intersection), secondarily by total weight
-                    ranked_stocks = sorted(
-                        stock_stats.items(),
-                        key=lambda x: (x[1]['count'], x[1]['total_weight']),
-                        reverse=True
-                    )
-
-                    # Take top 10 common stocks
-                    for s_code, stats in ranked_stocks[:10]:
-                        final_common_stocks.append({
-                            'code': s_code,
-                            'name': stats['name'],
-                            'occurrence': stats['count'],
-                            'total_weight': stats['total_weight']
-                        })
-
-            # 3. Process sectors and concepts (new feature)
-            sector_result = {}
-            try:
-                # Get sector and concept lists
-                sectors_list = sector_data.get_sector_list()
-                concepts_list = sector_data.get_concept_list()
-
-                # Analyze relevant sectors/concepts
-                relevant = analyzer.analyze_relevant_sectors(tweet['text'], sectors_list, concepts_list)
-
-                # Process and get hot stocks
-                sector_result = process_sectors_and_concepts(
-                    tweet['text'],
-                    relevant.get('sectors', []),
-                    relevant.get('concepts', []),
-                    sector_data,
-                    stock_hot
-                )
-            except Exception as e:
-                logger.error(f"Error in sector/concept analysis: {e}", exc_info=True)
-
-            # 5. Notify - combine results
-            notifier.send_notification(tweet, {
-                'etfs': etf_results,
-                'common_stocks': final_common_stocks,
-                'summary': summary,
-                'hot_sector_stocks': sector_result.get('hot_sector_stocks', []),
-                'hot_concept_stocks': sector_result.get('hot_concept_stocks', []),
-                'sector_names': sector_result.get('sector_names', []),
-                'concept_names': sector_result.get('concept_names', [])
-            })
+        # Get sector and concept lists once for all tweets
+        try:
+            sectors_list = sector_data.get_sector_list()
+            concepts_list = sector_data.get_concept_list()
+        except Exception as e:
+            logger.error(f"Error loading sector/concept lists: {e}", exc_info=True)
+            sectors_list, concepts_list = [], []
+
+        # Tweets are analyzed concurrently, but notified in their original order
+        max_workers = max(1, min(analyzer.max_concurrency, len(new_tweets)))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='analyze') as pool:
+            futures = [
+                pool.submit(analyze_tweet, tweet, analyzer, market_data, sector_data, stock_hot,
+                            etf_list, sectors_list, concepts_list)
+                for tweet in new_tweets
+            ]
+            for tweet, future in zip(new_tweets, futures):
+                try:
+                    analyze_result = future.result()
+                except Exception as e:
+                    logger.error(f"Error analyzing tweet {tweet['id']}: {e}", exc_info=True)
+                    continue
+                if analyze_result is None:
+                    continue
+
+                # 5. Notify - combine results
+                notifier.send_notification(tweet, analyze_result)
+                # From detection to alert: list loading, queueing, analysis and notification
+                metrics.observe('tweet_to_alert_seconds', time.monotonic() - detected_at)
 
     except Exception as e:
         logger.error(f"Error in job loop: {e}", exc_info=True)
 
+    metrics.maybe_log_summary(logger)
+    return counts
+
+
+def create_monitor(config):
+    """
+    Create the tweet monitor for the configured engine.
+
+    Args:
+        config: Loaded config dict; 'monitor_engine' selects 'sync' (default) or 'async'
+
+    Returns:
+        Object with `accounts` and blocking fetch_tweets(), fetch_many(),
+        log_instance_health() and close()
+    """
+    engine = config.get('monitor_engine', 'sync')
+    if engine == 'async':
+        from src.async_monitor import AsyncMonitorRunner
+        logger.info("Using async Playwright monitor engine")
+        return AsyncMonitorRunner()
+    return TwitterMonitor()
+
+
+def _handle_sigterm(signum, frame):
+    """Turn SIGTERM (systemd, docker stop) into KeyboardInterrupt so main() closes the browser."""
+    raise KeyboardInterrupt(f"received signal {signum}")
+
 
 def main():
     parser = argparse.ArgumentParser(description='Musk Tweet Monitor')
     parser.add_argument('--dry-run', action='store_true', help='Run once and exit, do not save processed tweets (not fully implemented in submodules but main loop will exit)')
     parser.add_argument('--test-notify', action='store_true', help='Send a test notification and exit')
+    parser.add_argument('--instance-stats', action='store_true', help='Print Nitter instance health scores and exit')
     args = parser.parse_args()
 
     try:
@@ -210,13 +356,24 @@ def main():
         logger.critical(f"Config load failed: {e}")
         sys.exit(1)
 
-    monitor = TwitterMonitor()
+    metrics_conf = config.get('metrics', {})
+    metrics.configure(
+        summary_interval=metrics_conf.get('summary_interval', 600),
+        export_dir=DATA_DIR if metrics_conf.get('export', True) else None
+    )
+
+    monitor = create_monitor(config)
+    signal.signal(signal.SIGTERM, _handle_sigterm)
     analyzer = ETFAnalyzer()
     market_data = MarketData()
     sector_data = SectorData()
     stock_hot = StockHot()
     notifier = Notifier(config.get('wechat_webhook_url'))
 
+    if args.instance_stats:
+        monitor.log_instance_health()
+        return
+
     if args.test_notify:
         logger.info("Sending test notification...")
         notifier.send_notification({
@@ -234,24 +391,52 @@ def main():
         })
         return
 
-    # If dry run, we might want to just fetch current RSS and print what we WOULD do
-    if args.dry_run:
-        logger.info("Dry run mode: Checking once...")
-        job(monitor, analyzer, market_data, sector_data, stock_hot, notifier)
-        return
-
-    # Schedule
-    interval = config.get('check_interval', 300)
-    schedule.every(interval).seconds.do(job, monitor, analyzer, market_data, sector_data, stock_hot, notifier)
-
-    logger.info(f"Monitor started. Checking every {interval} seconds.")
+    try:
+        # If dry run, we might want to just fetch current RSS and print what we WOULD do
+        if args.dry_run:
+            logger.info("Dry run mode: Checking once...")
+            job(monitor, analyzer, market_data, sector_data, stock_hot, notifier)
+            metrics.maybe_log_summary(logger, interval=0)
+            return
 
-    # Run once at startup
-    job(monitor, analyzer, market_data, sector_data, stock_hot, notifier)
+        interval = config.get('check_interval', 300)
+        # Accounts are ordered highest priority first
+        accounts = list(monitor.accounts.values())
+        adaptive_config = config.get('adaptive_schedule', {})
+        if adaptive_config.get('enabled', False):
+            # One scheduler per account; accounts that fall due together are polled in one job.
+            # Polls run back to back in this loop, so they can never overlap
+            schedulers = {a.handle: AdaptiveScheduler(adaptive_config, a.interval or interval) for a in accounts}
+            next_due = dict.fromkeys(schedulers, time.monotonic())
+            logger.info(f"Monitor started with adaptive schedule for {len(accounts)} accounts (base interval {interval} seconds).")
+            while True:
+                time.sleep(max(0, min(next_due.values()) - time.monotonic()))
+                now = time.monotonic()
+                due = [a.handle for a in accounts if next_due[a.handle] <= now]
+                counts = job(monitor, analyzer, market_data, sector_data, stock_hot, notifier, due)
+                for handle in due:
+                    next_due[handle] = time.monotonic() + schedulers[handle].next_delay(counts.get(handle, 0))
+
+        # Schedule each account on its own interval
+        for account in accounts:
+            account_interval = account.interval or interval
+            schedule.every(account_interval).seconds.do(
+                job, monitor, analyzer, market_data, sector_data, stock_hot, notifier, [account.handle]
+            )
+            logger.info(f"Monitoring @{account.handle} every {account_interval} seconds.")
+
+        logger.info(f"Monitor started for {len(accounts)} accounts.")
+
+        # Run once at startup
+        job(monitor, analyzer, market_data, sector_data, stock_hot, notifier)
 
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        logger.info("Shutting down...")
+    finally:
+        monitor.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,249 @@
+"""
+Process-wide metrics registry.
+Counters, fixed-bucket histograms (cheap enough to leave on: one bisect and two
+additions per observation) and a bounded list of recent per-call records, with
+a periodic log summary and JSON / Prometheus text exports.
+"""
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+# Seconds; covers fast cache-like calls up to slow LLM completions
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+_lock = threading.Lock()
+_counters = Counter()
+_histograms = {}  # {(name, labels): Histogram}, labels as a sorted tuple of (key, value)
+_calls = deque(maxlen=500)
+_last_summary_at = time.monotonic()
+_settings = {'summary_interval': 600, 'export_dir': None}
+
+
+class Histogram:
+    """Fixed-bucket histogram with sum and count, Prometheus style."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimate a quantile by linear interpolation within its bucket.
+
+        Values beyond the last bucket are reported as the last bucket bound.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def to_dict(self):
+        return {
+            'buckets': list(self.buckets),
+            'counts': list(self.counts),
+            'sum': self.sum,
+            'count': self.count,
+        }
+
+
+def _labels_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def increment(name, amount=1):
+    """Add `amount` to a named counter."""
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name):
+    """Current value of a counter (0 if never incremented)."""
+    with _lock:
+        return _counters[name]
+
+
+def snapshot():
+    """Copy of all counters as a plain dict."""
+    with _lock:
+        return dict(_counters)
+
+
+def observe(name, value, buckets=DEFAULT_BUCKETS, **labels):
+    """
+    Record a value in a labelled histogram.
+
+    Args:
+        name: Histogram name, e.g. 'llm_latency_seconds'
+        value: Observed value
+        buckets: Upper bounds, used when the histogram is first created
+        **labels: Label values, e.g. method='etfs'
+    """
+    key = (name, _labels_key(labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+
+def histogram(name, **labels):
+    """Copy of a histogram's data as a dict, or None if nothing was observed."""
+    with _lock:
+        histogram = _histograms.get((name, _labels_key(labels)))
+        return histogram.to_dict() if histogram is not None else None
+
+
+def record_call(**fields):
+    """
+    Keep a per-call record (e.g. method, model, latency, tokens, parse outcome).
+
+    Only the most recent 500 records are kept.
+    """
+    with _lock:
+        _calls.append({'at': time.time(), **fields})
+
+
+def recent_calls(limit=None):
+    """Most recent per-call records, oldest first."""
+    with _lock:
+        calls = list(_calls)
+    return calls[-limit:] if limit else calls
+
+
+def to_json():
+    """All metrics as a JSON-serializable dict."""
+    with _lock:
+        return {
+            'counters': dict(_counters),
+            'histograms': [
+                {'name': name, 'labels': dict(labels), **histogram.to_dict()}
+                for (name, labels), histogram in sorted(_histograms.items())
+            ],
+            'calls': list(_calls),
+        }
+
+
+def _format_labels(labels, extra=None):
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def to_prometheus(prefix='musk_monitor'):
+    """All counters and histograms in the Prometheus text exposition format."""
+    lines = []
+    with _lock:
+        for name, value in sorted(_counters.items()):
+            metric = f'{prefix}_{name}_total'
+            lines += [f'# TYPE {metric} counter', f'{metric} {value}']
+
+        typed = set()
+        for (name, labels), histogram in sorted(_histograms.items()):
+            metric = f'{prefix}_{name}'
+            if metric not in typed:
+                lines.append(f'# TYPE {metric} histogram')
+                typed.add(metric)
+            cumulative = 0
+            for bound, count in zip(list(histogram.buckets) + ['+Inf'], histogram.counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{_format_labels(labels, ("le", bound))} {cumulative}')
+            lines.append(f'{metric}_sum{_format_labels(labels)} {histogram.sum}')
+            lines.append(f'{metric}_count{_format_labels(labels)} {histogram.count}')
+    return '\n'.join(lines) + '\n'
+
+
+def summary():
+    """Human-readable multi-line summary of counters and histogram quantiles."""
+    with _lock:
+        counters = dict(_counters)
+        histograms = sorted(_histograms.items())
+        lines = [f"counters: {counters}"]
+        for (name, labels), h in histograms:
+            label_str = ','.join(f'{k}={v}' for k, v in labels)
+            lines.append(
+                f"{name}{{{label_str}}}: n={h.count} mean={h.sum / h.count if h.count else 0:.2f} "
+                f"p50={h.quantile(0.5):.2f} p95={h.quantile(0.95):.2f}"
+            )
+    return '\n'.join(lines)
+
+
+def dump(directory):
+    """Write metrics.json and metrics.prom (e.g. for a node_exporter textfile collector)."""
+    os.makedirs(directory, exist_ok=True)
+    for filename, content in (
+        ('metrics.json', json.dumps(to_json(), ensure_ascii=False, indent=2)),
+        ('metrics.prom', to_prometheus()),
+    ):
+        path = os.path.join(directory, filename)
+        with open(f'{path}.tmp', 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(f'{path}.tmp', path)
+
+
+def configure(summary_interval=600, export_dir=None):
+    """
+    Set the defaults used by maybe_log_summary().
+
+    Args:
+        summary_interval: Minimum seconds between logged summaries
+        export_dir: Directory for metrics.json / metrics.prom (None disables the dump)
+    """
+    _settings.update(summary_interval=summary_interval, export_dir=export_dir)
+
+
+def maybe_log_summary(logger, interval=None, directory=None):
+    """
+    Log the summary (and dump the exports to `directory`) at most every `interval` seconds.
+
+    Args:
+        logger: Logger to write the summary to
+        interval: Override the configured summary interval
+        directory: Override the configured export directory
+
+    Returns:
+        True if a summary was logged
+    """
+    global _last_summary_at
+    interval = _settings['summary_interval'] if interval is None else interval
+    directory = directory or _settings['export_dir']
+    with _lock:
+        now = time.monotonic()
+        if now - _last_summary_at < interval:
+            return False
+        _last_summary_at = now
+    logger.info(f"Metrics summary:\n{summary()}")
+    if directory:
+        try:
+            dump(directory)
+        except OSError as e:
+            logger.warning(f"Failed to dump metrics: {e}")
+    return True
+
+
+def reset():
+    """Clear all counters, histograms and call records."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _calls.clear()
@@ -1,173 +1,710 @@
 import time
-import random
-from playwright.sync_api import sync_playwright
-from src.utils import load_config, load_processed_tweets, save_processed_tweets, setup_logger, convert_to_beijing_time
+import hashlib
+from urllib.parse import urlparse
+from src.browser_pool import BrowserPool
+from src.feed_fetcher import FeedFetcher, NOT_MODIFIED
+from src.instance_health import InstanceHealth
+from src.nitter_parser import parse_html, parse_reply_context, parse_reply_threads, parse_timeline, timeline_hrefs
+from src.reply_cache import ReplyContextCache
+from src.tweet_store import TweetStore
+from src.utils import load_config, setup_logger, convert_to_beijing_time
 
 logger = setup_logger('TwitterMonitor')
 
+# Reads the first `limit` timeline items in one round trip, returning plain dicts
+TIMELINE_EXTRACT_JS = '''(limit) => {
+    const items = Array.from(document.querySelectorAll('.timeline-item')).slice(0, limit);
+    return items.map(item => {
+        const link = item.querySelector('a.tweet-link');
+        if (!link) return null;
+        const href = link.getAttribute('href');
+        const content = item.querySelector('.tweet-content');
+        const date = item.querySelector('.tweet-date a');
+        return {
+            id: href.split('/').pop().split('#')[0],
+            href: href,
+            text: content ? content.innerText : '',
+            date: date ? date.getAttribute('title') : 'Unknown time',
+            is_reply: item.querySelector('.replying-to') !== null,
+            is_retweet: item.querySelector('.retweet-header') !== null
+        };
+    }).filter(item => item !== null);
+}'''
+
+# (selector, script) pair returning the links of the first ten timeline items
+TIMELINE_FINGERPRINT_QUERY = (
+    '.timeline-item a.tweet-link',
+    'els => els.slice(0, 10).map(e => e.getAttribute("href"))'
+)
+
+# Reads the conversation above the main tweet of a detail page, oldest first.
+# Nitter wraps the ancestors in .before-tweet; older layouts put them as
+# .timeline-item siblings directly before .main-tweet.
+REPLY_CONTEXT_JS = '''() => {
+    const main = document.querySelector('.main-tweet');
+    if (!main) return null;
+
+    const toDict = item => {
+        const link = item.querySelector('a.tweet-link');
+        const content = item.querySelector('.tweet-content');
+        return {
+            id: link ? link.getAttribute('href').split('/').pop().split('#')[0] : null,
+            text: content ? content.innerText : null
+        };
+    };
+
+    const before = document.querySelector('.before-tweet');
+    if (before) {
+        return Array.from(before.querySelectorAll('.timeline-item')).map(toDict);
+    }
+
+    const ancestors = [];
+    let prev = main.previousElementSibling;
+    while (prev) {
+        if (prev.classList.contains('timeline-item')) {
+            ancestors.unshift(toDict(prev));
+        }
+        prev = prev.previousElementSibling;
+    }
+    return ancestors;
+}'''
+
+class Account:
+    """A monitored handle with its own schedule, dedupe store and timeline fingerprints."""
+
+    def __init__(self, handle, interval=None, priority=0, store_config=None):
+        """
+        Args:
+            handle: Twitter handle without '@'
+            interval: Poll interval in seconds (None: use check_interval)
+            priority: Higher priorities are polled first when several accounts are due
+            store_config: 'tweet_store' config section
+        """
+        store_config = store_config or {}
+        self.handle = handle
+        self.interval = interval
+        self.priority = priority
+        # Keep the original file name for the default account so existing state is reused
+        store_name = 'processed_tweets' if handle == 'elonmusk' else f'processed_tweets_{handle}'
+        self.processed_tweets = TweetStore(
+            name=store_name,
+            capacity=store_config.get('capacity', 1000),
+            watermark_slack=store_config.get('watermark_slack', 3600)
+        )
+        self.is_first_run = len(self.processed_tweets) == 0
+        # {instance: hash of the first timeline item links} seen on the last browser poll
+        self.timeline_fingerprints = {}
+
+
+def load_accounts(config):
+    """
+    Build Account objects from the 'accounts' config list, highest priority first.
+
+    Entries may be plain handles or dicts with 'handle', 'interval' and 'priority'.
+    Defaults to a single 'elonmusk' account.
+    """
+    entries = config.get('accounts') or ['elonmusk']
+    store_config = config.get('tweet_store', {})
+    accounts = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {'handle': entry}
+        accounts.append(Account(
+            entry['handle'].lstrip('@'),
+            interval=entry.get('interval'),
+            priority=entry.get('priority', 0),
+            store_config=store_config
+        ))
+    return sorted(accounts, key=lambda a: a.priority, reverse=True)
+
+
 class TwitterMonitor:
     def __init__(self):
         self.config = load_config()
         self.nitter_instances = self.config.get('nitter_instances', [])
         # We need to clean up nitter instances to just be the base URL
         self.nitter_instances = [url.rstrip('/') for url in self.nitter_instances]
-        loaded_ids = load_processed_tweets()
-        self.processed_tweets = set(loaded_ids)
-        self.is_first_run = len(loaded_ids) == 0
+        # All accounts share one browser, HTTP session and instance health registry
+        self.accounts = {account.handle: account for account in load_accounts(self.config)}
+        # Chromium is kept alive across polls instead of relaunching each run
+        self.browser_pool = BrowserPool(self.config.get('browser_pool', {}))
+        self.hedge_config = self.config.get('hedged_fetch', {})
+        # 'html' parses page.content() offline, 'evaluate' / 'elements' read the live DOM
+        self.timeline_extraction = self.config.get('timeline_extraction', 'html')
+        self.reply_config = self.config.get('reply_context', {})
+        self.reply_cache = ReplyContextCache(self.reply_config.get('cache_size', 500))
+        rss_config = self.config.get('rss_fast_path', {})
+        self.feed_fetcher = FeedFetcher(rss_config) if rss_config.get('enabled', True) else None
+        # RSS and browser availability differ per mirror, so they are scored separately
+        health_config = self.config.get('instance_health', {})
+        self.rss_health = InstanceHealth('rss', health_config)
+        self.browser_health = InstanceHealth('browser', health_config)
+        self.health_log_every = health_config.get('log_every', 12)
+        self._poll_count = 0
 
-    def get_profile_url(self, instance):
-        return f"{instance}/elonmusk"
+    def close(self):
+        """Release the shared browser and HTTP session. Call once at shutdown."""
+        self.browser_pool.close()
+        if self.feed_fetcher is not None:
+            self.feed_fetcher.close()
 
-    def fetch_tweets(self):
-        new_tweets = []
-        # Shuffle instances to distribute load
-        instances = self.nitter_instances.copy()
-        random.shuffle(instances)
-
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True)
-            
-            for instance in instances:
-                url = self.get_profile_url(instance)
-                logger.info(f"Trying to fetch tweets from {url}")
-                context = browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                    ignore_https_errors=True
-                )
-                page = context.new_page()
+    def get_profile_url(self, instance, handle='elonmusk'):
+        return f"{instance}/{handle}"
 
-                try:
-                    page.goto(url, timeout=30000)
-                    # Wait for timeline to load
-                    page.wait_for_selector('.timeline-item', timeout=30000)
-                    
-                    # Get timeline items
-                    timeline_items = page.query_selector_all('.timeline-item')
-                    
-                    if not timeline_items:
-                        logger.warning(f"No timeline items found on {instance}")
-                        continue
-
-                    logger.info(f"Successfully fetched {len(timeline_items)} items from {instance}")
-                    
-                    # Process entries
-                    for item in timeline_items[:10]:
-                        link_el = item.query_selector('a.tweet-link')
-                        if not link_el: continue
-                        tweet_link_suffix = link_el.get_attribute('href')
-                        tweet_id = tweet_link_suffix.split('/')[-1].split('#')[0]
-                        
-                        if tweet_id not in self.processed_tweets:
-                            # It's a new tweet
-                            if self.is_first_run:
-                                # Silent add for first run
-                                self.processed_tweets.add(tweet_id)
-                                continue
-
-                            # Normal processing
-                            full_link = f"{instance}{tweet_link_suffix}"
-                            content_el = item.query_selector('.tweet-content')
-                            text = content_el.inner_text() if content_el else ""
-                            date_el = item.query_selector('.tweet-date a')
-                            raw_published = date_el.get_attribute('title') if date_el else "Unknown time"
-                            published = convert_to_beijing_time(raw_published)
-                            
-                            replying_to_el = item.query_selector('.replying-to')
-                            is_reply = replying_to_el is not None
-                            
-                            final_text = text
-                            if is_reply:
-                                logger.info(f"Tweet {tweet_id} is a reply. Fetching context...")
-                                try:
-                                    # Open detail page to get context
-                                    # We can simply navigate the current page or open a new one. 
-                                    # Let's open a new page/tab for the detail to keep timeline intact or just navigate back?
-                                    # Navigating main page is fine since we are iterating elements handles matching DOM,
-                                    # BUT navigating away invalidates element handles. 
-                                    # So we must open a new page.
-                                    detail_page = context.new_page()
-                                    detail_page.goto(full_link, timeout=30000)
-                                    
-                                    # On detail page, find the main tweet's parent
-                                    # The container is usually .conversation
-                                    # The main tweet has class .main-tweet or ID 'm' sometimes
-                                    # The parent is the tweet immediately preceding the main tweet in the conversation flow
-                                    
-                                    detail_page.wait_for_selector('.main-tweet', timeout=10000)
-                                    
-                                    # Strategy: Find the .main-tweet, then look for previous sibling that is a tweet-body or timeline-item?
-                                    # Actually, Nitter structure:
-                                    # <div class="timeline-item thread">
-                                    #   <div class="timeline-item ">... parent ...</div>
-                                    #   <div class="timeline-item thread-last "> ... </div>
-                                    #   <div class="timeline-item main-tweet"> ... </div>
-                                    # </div>
-                                    # It varies. Safe bet: Look for all .timeline-item which are NOT replies to the main tweet (replies come after).
-                                    # The one closely before main-tweet is the parent.
-                                    
-                                    # Get all timeline items in the conversation
-                                    # We need to find the one where the next sibling is the main tweet?
-                                    # Let's try to just grab all text from items *before* the main tweet.
-                                    
-                                    # Simple robust logic:
-                                    # 1. Find .main-tweet
-                                    # 2. Look for .tweet-content inside items that appear before it.
-                                    
-                                    # Using playwright evaluation to get text of the PREVIOUS timeline item
-                                    parent_text = detail_page.evaluate('''() => {
-                                        const main = document.querySelector('.main-tweet');
-                                        if (!main) return null;
-                                        // The main-tweet div itself might be a timeline-item, or wrapped.
-                                        // Usually class="timeline-item main-tweet"
-                                        
-                                        // We want the previous sibling that is also a timeline-item (containing the parent tweet)
-                                        let prev = main.previousElementSibling;
-                                        while (prev && !prev.classList.contains('timeline-item')) {
-                                            prev = prev.previousElementSibling;
-                                        }
-                                        
-                                        if (prev) {
-                                            const content = prev.querySelector('.tweet-content');
-                                            return content ? content.innerText : null;
-                                        }
-                                        return null;
-                                    }''')
-                                    
-                                    if parent_text:
-                                        logger.info("Found parent tweet text.")
-                                        final_text = f"Context (Parent Tweet): {parent_text}\n\nReplying: {text}"
-                                    else:
-                                        logger.warning("Could not find parent tweet on detail page.")
-                                        # Fallback: maybe it's not in the DOM tree as sibling?
-                                        # Just allow normal text.
-                                    
-                                    detail_page.close()
-                                    
-                                except Exception as e:
-                                    logger.error(f"Failed to fetch context for {tweet_id}: {e}")
-                                    if 'detail_page' in locals():
-                                        detail_page.close()
-                        
-                            new_tweets.append({
-                                'id': tweet_id,
-                                'text': final_text,
-                                'link': full_link,
-                                'published': published
-                            })
-                            self.processed_tweets.add(tweet_id)
-                    
-                    if new_tweets or self.is_first_run:
-                        save_processed_tweets(list(self.processed_tweets))
-                    
-                    # If success, break
-                    break
+    def _account(self, handle):
+        """Look up an account, defaulting to the highest-priority one."""
+        if handle is None:
+            return next(iter(self.accounts.values()))
+        return self.accounts[handle]
+
+    def fetch_tweets(self, handle=None):
+        """
+        Poll one account for new tweets.
+
+        Args:
+            handle: Account handle (default: the highest-priority account)
+
+        Returns:
+            List of new tweet dicts {id, text, link, published, author}
+        """
+        account = self._account(handle)
+        # Between polls no page is open, so this is the one safe point to recycle
+        self.browser_pool.maybe_recycle()
+        try:
+            return self._fetch_tweets(account)
+        finally:
+            self.rss_health.save()
+            self.browser_health.save()
+            self._poll_count += 1
+            if self.health_log_every and self._poll_count % self.health_log_every == 0:
+                self.log_instance_health()
+
+    def fetch_many(self, handles=None):
+        """
+        Poll several accounts one after another, highest priority first.
+
+        Args:
+            handles: Account handles (default: all accounts)
+
+        Returns:
+            Dict mapping handle to its list of new tweet dicts
+        """
+        accounts = [self._account(h) for h in handles] if handles else list(self.accounts.values())
+        accounts.sort(key=lambda a: a.priority, reverse=True)
+        results = {}
+        for account in accounts:
+            try:
+                results[account.handle] = self.fetch_tweets(account.handle)
+            except Exception as e:
+                logger.error(f"Error fetching @{account.handle}: {e}", exc_info=True)
+                results[account.handle] = []
+        return results
+
+    def log_instance_health(self):
+        """Log the current health score of every configured instance."""
+        self.rss_health.log_summary(self.nitter_instances)
+        self.browser_health.log_summary(self.nitter_instances)
+
+    def _fetch_tweets(self, account):
+        # Cheap RSS fast path first, the browser is only a fallback
+        if self.feed_fetcher is not None:
+            # Quarantined mirrors are skipped here until their backoff expires
+            rss_instances = self.rss_health.ranked(self.nitter_instances, include_quarantined=False)
+            instance, items = self._fetch_feed_items(rss_instances, account.handle)
+            if items is NOT_MODIFIED:
+                return []
+            if items:
+                return self._process_items(instance, items, account)
+            logger.info("RSS fast path unavailable on all instances, falling back to browser")
+
+        # Best-scoring instances first instead of a random order, quarantined ones as a last resort
+        instances = self.browser_health.ranked(self.nitter_instances)
+
+        if self.hedge_config.get('enabled', False):
+            return self._fetch_tweets_hedged(instances, account)
+
+        for instance in instances:
+            url = self.get_profile_url(instance, account.handle)
+            logger.info(f"Trying to fetch tweets from {url}")
+            page = self.browser_pool.new_page()
+            started_at = time.monotonic()
+
+            try:
+                # The timeline is server-rendered, no need to wait for the full load event
+                page.goto(url, timeout=30000, wait_until='domcontentloaded')
+                # Wait for timeline to load
+                page.wait_for_selector('.timeline-item', timeout=30000)
+                self.browser_health.record_success(instance, time.monotonic() - started_at)
+
+                new_tweets = self._read_timeline(instance, page, account)
+                # If success, break
+                if new_tweets is not None:
+                    return new_tweets
+
+            except Exception as e:
+                logger.error(f"Error scraping {instance}: {e}")
+                self.browser_health.record_failure(instance, e, time.monotonic() - started_at)
+                continue
 
+            finally:
+                page.close()
+
+        return []
+
+    def _fetch_feed_items(self, instances, handle='elonmusk'):
+        """
+        Fetch the timeline over RSS without a browser.
+
+        Args:
+            instances: Instance base URLs in preference order
+            handle: Account handle
+
+        Returns:
+            Tuple of (instance, items); items is NOT_MODIFIED if the feed is unchanged,
+            or None if no instance served a usable feed
+        """
+        for instance in instances:
+            logger.info(f"Trying to fetch RSS feed from {instance}")
+            started_at = time.monotonic()
+            items = self.feed_fetcher.fetch(instance, handle)
+            if self._record_feed_result(instance, items, time.monotonic() - started_at):
+                return instance, items
+        return None, None
+
+    def _record_feed_result(self, instance, items, elapsed):
+        """
+        Update the RSS health of an instance from the result of FeedFetcher.fetch.
+
+        Returns:
+            True if the result is usable (items or NOT_MODIFIED)
+        """
+        if not items:
+            self.rss_health.record_failure(instance, "feed blocked or incomplete", elapsed)
+            return False
+
+        self.rss_health.record_success(instance, elapsed)
+        if items is not NOT_MODIFIED:
+            logger.info(f"Successfully fetched {len(items)} items from {instance} via RSS")
+        return True
+
+    def _fetch_tweets_hedged(self, instances, account):
+        """
+        Fetch the timeline by racing several instances and using the first that loads.
+
+        Built on BrowserPool.load_concurrently: a new instance is started every
+        `delay` seconds, or right away when one fails, up to `fanout` in flight.
+        If the first page to load has no usable timeline, the next one is tried;
+        once a timeline is read, the pages still loading are closed.
+
+        Args:
+            instances: Instance base URLs in preference order
+            account: Account to fetch
+
+        Returns:
+            List of new tweet dicts
+        """
+        urls = {self.get_profile_url(instance, account.handle): instance for instance in instances}
+        started_at = {}
+
+        def start(url):
+            logger.info(f"Racing timeline fetch from {url}")
+            started_at[url] = time.monotonic()
+            return True
+
+        loads = self.browser_pool.load_concurrently(
+            urls, '.timeline-item',
+            timeout=self.hedge_config.get('timeout', 30),
+            max_concurrency=max(1, self.hedge_config.get('fanout', 3)),
+            poll_interval_ms=self.hedge_config.get('poll_interval_ms', 100),
+            should_load=start,
+            hedge_delay=self.hedge_config.get('delay', 2.0),
+            error_selector='.error-panel'
+        )
+        try:
+            for url, page, error in loads:
+                instance = urls[url]
+                elapsed = time.monotonic() - started_at[url]
+                if page is None:
+                    logger.error(f"Error scraping {instance}: {error}")
+                    self.browser_health.record_failure(instance, error, elapsed)
+                    continue
+
+                self.browser_health.record_success(instance, elapsed)
+                logger.info(f"{instance} won the timeline race after {elapsed:.1f}s")
+                try:
+                    new_tweets = self._read_timeline(instance, page, account)
                 except Exception as e:
                     logger.error(f"Error scraping {instance}: {e}")
+                    continue
+                finally:
                     page.close()
+                if new_tweets is not None:
+                    return new_tweets
+        finally:
+            # Closes the losing pages
+            loads.close()
+
+        return []
+
+    def _read_timeline(self, instance, page, account):
+        """
+        Read a loaded profile page: skip it if the timeline is unchanged, otherwise
+        extract and process its items.
+
+        Args:
+            instance: Nitter instance base URL the page was loaded from
+            page: Playwright page showing the profile timeline
+            account: Account the timeline belongs to
+
+        Returns:
+            List of new tweet dicts, or None if the page had no timeline items
+        """
+        html = self._page_html(page)
+        fingerprint = self._timeline_fingerprint(page, html)
+        if self._timeline_unchanged(instance, account, fingerprint):
+            return []
+
+        # Only a changed timeline is parsed
+        document = parse_html(html) if html is not None else None
+        items = self._extract_timeline_items(instance, page, account, document)
+        if items is None:
+            self.browser_health.record_failure(instance, "no timeline items")
+            return None
+
+        new_tweets = self._process_items(instance, items, account)
+        account.timeline_fingerprints[instance] = fingerprint
+        return new_tweets
+
+    @staticmethod
+    def _timeline_unchanged(instance, account, fingerprint):
+        """Whether the timeline fingerprint matches the last one read from this instance."""
+        if fingerprint is not None and fingerprint == account.timeline_fingerprints.get(instance):
+            logger.info(f"Timeline of @{account.handle} on {instance} unchanged, skipping")
+            return True
+        return False
+
+    def _page_html(self, page):
+        """
+        Capture the page HTML once when timeline_extraction is 'html'.
+
+        Returns:
+            HTML string, or None for the live DOM extraction modes
+        """
+        if self.timeline_extraction != 'html':
+            return None
+        return page.content()
+
+    def _timeline_fingerprint(self, page, html=None):
+        """
+        Hash the links of the first timeline items, so an unchanged timeline can
+        be skipped before any extraction. Captured HTML is scanned without being
+        parsed; otherwise the links are read in a single round trip.
+
+        Args:
+            page: Playwright page showing the profile timeline
+            html: Page HTML from _page_html(), if captured
+
+        Returns:
+            Hex digest, or None if the page has no tweet links
+        """
+        if html is not None:
+            return self._hash_hrefs(timeline_hrefs(html))
+        return self._hash_hrefs(page.eval_on_selector_all(*TIMELINE_FINGERPRINT_QUERY))
+
+    @staticmethod
+    def _hash_hrefs(hrefs):
+        if not hrefs:
+            return None
+        return hashlib.sha1('\n'.join(hrefs).encode('utf-8')).hexdigest()
+
+    def _extract_timeline_items(self, instance, page, account, document=None):
+        """
+        Read timeline items from a loaded profile page.
+
+        Args:
+            instance: Nitter instance base URL the page was loaded from
+            page: Playwright page showing the profile timeline
+            account: Account the timeline belongs to
+            document: Parsed page HTML, if captured
+
+        Returns:
+            List of timeline item dicts, or None if the page had no timeline items
+        """
+        if document is not None:
+            items = parse_timeline(document, 10)
+        elif self.timeline_extraction == 'elements':
+            return self._extract_timeline_items_by_elements(instance, page, account)
+        else:
+            items = page.evaluate(TIMELINE_EXTRACT_JS, 10)
+        if not items:
+            logger.warning(f"No timeline items found on {instance}")
+            return None
+
+        logger.info(f"Successfully fetched {len(items)} items from {instance}")
+        return items
+
+    def _extract_timeline_items_by_elements(self, instance, page, account):
+        """
+        Read timeline items through per-element queries (one round trip per field).
+
+        Args:
+            instance: Nitter instance base URL the page was loaded from
+            page: Playwright page showing the profile timeline
+            account: Account the timeline belongs to
+
+        Returns:
+            List of timeline item dicts, or None if the page had no timeline items
+        """
+        # Get timeline items
+        timeline_items = page.query_selector_all('.timeline-item')
+
+        if not timeline_items:
+            logger.warning(f"No timeline items found on {instance}")
+            return None
+
+        logger.info(f"Successfully fetched {len(timeline_items)} items from {instance}")
+
+        items = []
+        for item in timeline_items[:10]:
+            link_el = item.query_selector('a.tweet-link')
+            if not link_el: continue
+            tweet_link_suffix = link_el.get_attribute('href')
+            tweet_id = tweet_link_suffix.split('/')[-1].split('#')[0]
+
+            # Already processed tweets only need their ID, skip the extra round trips
+            if tweet_id in account.processed_tweets:
+                items.append({'id': tweet_id, 'href': tweet_link_suffix})
+                continue
+
+            content_el = item.query_selector('.tweet-content')
+            date_el = item.query_selector('.tweet-date a')
+            items.append({
+                'id': tweet_id,
+                'href': tweet_link_suffix,
+                'text': content_el.inner_text() if content_el else "",
+                'date': date_el.get_attribute('title') if date_el else "Unknown time",
+                'is_reply': item.query_selector('.replying-to') is not None,
+                'is_retweet': item.query_selector('.retweet-header') is not None
+            })
+
+        return items
+
+    def _process_items(self, instance, items, account):
+        """
+        Turn timeline items into new tweet dicts and record them as processed.
+
+        Args:
+            instance: Nitter instance base URL the items came from
+            items: Timeline item dicts from the RSS or browser path
+            account: Account the timeline belongs to
+
+        Returns:
+            List of new tweet dicts
+        """
+        new_items = self._select_new_items(items, account)
+
+        # Reply contexts are resolved together so their detail pages load in parallel
+        replies = self._reply_links(instance, new_items)
+        contexts = self._resolve_reply_contexts(replies) if replies else {}
+
+        return self._build_tweets(instance, new_items, contexts, account)
+
+    def _select_new_items(self, items, account):
+        """Filter timeline items down to unprocessed ones (none on the silent first run)."""
+        new_items = []
+
+        # Process entries
+        for item in items[:10]:
+            tweet_id = item['id']
+
+            # Watermark check first, so old tweets never reach reply lookups
+            if not account.processed_tweets.is_processed(tweet_id, item.get('is_retweet', False)):
+                # It's a new tweet
+                if account.is_first_run:
+                    # Silent add for first run
+                    account.processed_tweets.add(tweet_id)
                     continue
-            
-            browser.close()
-                
+                new_items.append(item)
+
+        return new_items
+
+    def _reply_links(self, instance, new_items):
+        """List (tweet_id, detail_link) for the replies among new items."""
+        return [(item['id'], f"{instance}{item['href']}") for item in new_items if item.get('is_reply')]
+
+    def _build_tweets(self, instance, new_items, contexts, account):
+        """
+        Build tweet dicts, attach reply contexts and persist the processed IDs.
+
+        Args:
+            instance: Nitter instance base URL the items came from
+            new_items: Unprocessed timeline item dicts
+            contexts: Dict mapping tweet ID to parent tweet text
+            account: Account the timeline belongs to
+
+        Returns:
+            List of new tweet dicts
+        """
+        new_tweets = []
+        for item in new_items:
+            # Normal processing
+            tweet_id = item['id']
+            full_link = f"{instance}{item['href']}"
+            text = item.get('text', "")
+            published = convert_to_beijing_time(item.get('date', "Unknown time"))
+
+            final_text = text
+            parent_text = contexts.get(tweet_id)
+            if parent_text:
+                final_text = f"Context (Parent Tweet): {parent_text}\n\nReplying: {text}"
+
+            new_tweets.append({
+                'id': tweet_id,
+                'text': final_text,
+                'link': full_link,
+                'published': published,
+                'author': account.handle
+            })
+            account.processed_tweets.add(tweet_id)
+
+        account.processed_tweets.flush()
+        # Later polls notify normally once the first timeline has been recorded
+        account.is_first_run = False
+
         return new_tweets
 
+    def _cached_reply_contexts(self, replies):
+        """
+        Split replies into those whose parent is cached and those that need a detail page.
+
+        Args:
+            replies: List of (tweet_id, detail_link) tuples
+
+        Returns:
+            Tuple of (contexts, links): contexts maps tweet ID to cached parent text,
+            links maps detail link to tweet ID for the rest
+        """
+        contexts = {}
+        links = {}
+        for tweet_id, link in replies:
+            parent_text = self.reply_cache.get_parent_text(tweet_id)
+            if parent_text:
+                logger.info(f"Reply context for {tweet_id} served from cache")
+                contexts[tweet_id] = parent_text
+            else:
+                links[link] = tweet_id
+
+        if links:
+            logger.info(f"Fetching reply context for {len(links)} tweets...")
+        return contexts, links
+
+    def _resolve_from_cache(self, tweet_id, contexts):
+        """Re-check the cache right before loading a detail page; True if resolved."""
+        # An earlier detail page may already have revealed this reply's parent
+        parent_text = self.reply_cache.get_parent_text(tweet_id)
+        if parent_text:
+            logger.info(f"Reply context for {tweet_id} resolved from an earlier thread")
+            contexts[tweet_id] = parent_text
+            return True
+        return False
+
+    def _record_thread(self, tweet_id, ancestors, contexts, threads=()):
+        """Cache the conversation around a loaded reply and pick its parent text."""
+        self.reply_cache.add_thread(tweet_id, ancestors)
+        self.reply_cache.add_replies(threads)
+        parent_text = ancestors[-1].get('text') if ancestors else None
+        if parent_text:
+            logger.info(f"Found parent tweet text for {tweet_id}.")
+            contexts[tweet_id] = parent_text
+        else:
+            logger.warning(f"Could not find parent tweet on detail page of {tweet_id}.")
+
+    def _read_reply_context(self, detail_page, tweet_id):
+        """
+        Read the conversation around a loaded detail page, offline in 'html' mode.
+
+        Returns:
+            Tuple of (ancestors, threads): ancestors oldest first, threads the reply
+            chains below the main tweet (see parse_reply_threads)
+        """
+        document = parse_html(detail_page.content())
+        if self.timeline_extraction == 'html':
+            ancestors = parse_reply_context(document)
+        else:
+            ancestors = detail_page.evaluate(REPLY_CONTEXT_JS)
+        return ancestors or [], parse_reply_threads(document, tweet_id)
+
+    def _parent_page(self, link, links, pending):
+        """
+        Detail link of the parent revealed by the first page of a burst.
+
+        Worth loading only when several replies are still unresolved: the
+        parent's page lists its replies, so siblings resolve from that one page.
+
+        Args:
+            link: Detail link of the reply loaded first
+            links: Dict mapping detail link to tweet ID
+            pending: Detail links still unresolved
+
+        Returns:
+            Tuple of (parent link, parent ID), or (None, None)
+        """
+        parent_id = self.reply_cache.get_parent_id(links[link])
+        if parent_id is None or len(pending) < 2:
+            return None, None
+        parsed = urlparse(link)
+        return f"{parsed.scheme}://{parsed.netloc}/i/status/{parent_id}", parent_id
+
+    def _load_reply_pages(self, ordered, links, contexts, check_cache=True):
+        """Load detail pages in parallel and cache the conversations they show."""
+        should_load = (lambda link: not self._resolve_from_cache(links[link], contexts)) if check_cache else None
+        for link, detail_page, error in self.browser_pool.load_concurrently(
+                ordered, '.main-tweet',
+                timeout=self.reply_config.get('timeout', 20),
+                max_concurrency=self.reply_config.get('concurrency', 3),
+                should_load=should_load):
+            tweet_id = links[link]
+            if detail_page is None:
+                logger.error(f"Failed to fetch context for {tweet_id}: {error}")
+                continue
+
+            try:
+                ancestors, threads = self._read_reply_context(detail_page, tweet_id)
+                self._record_thread(tweet_id, ancestors, contexts, threads)
+            except Exception as e:
+                logger.error(f"Failed to fetch context for {tweet_id}: {e}")
+            finally:
+                detail_page.close()
+
+    def _resolve_reply_contexts(self, replies):
+        """
+        Get the parent tweet text for a batch of replies.
+
+        Cached parents are used directly. Of the rest, the newest reply's page is
+        loaded first: the conversation above and below it is cached and often
+        covers the rest of the burst. If several replies are still unresolved, its
+        parent's page is loaded next, since it lists sibling replies. Whatever is
+        left is loaded in parallel, re-checking the cache before each page starts.
+
+        Args:
+            replies: List of (tweet_id, detail_link) tuples
+
+        Returns:
+            Dict mapping tweet ID to parent text for the replies that could be resolved
+        """
+        contexts, links = self._cached_reply_contexts(replies)
+
+        ordered = sorted(links, key=lambda link: int(links[link]), reverse=True)
+        if len(ordered) > 1:
+            first, ordered = ordered[0], ordered[1:]
+            self._load_reply_pages([first], links, contexts)
+            ordered = [link for link in ordered if not self._resolve_from_cache(links[link], contexts)]
+            parent_link, parent_id = self._parent_page(first, links, ordered)
+            if parent_link is not None:
+                logger.info(f"Loading parent {parent_id} to resolve {len(ordered)} sibling replies")
+                links[parent_link] = parent_id
+                self._load_reply_pages([parent_link], links, contexts, check_cache=False)
+        self._load_reply_pages(ordered, links, contexts)
+
+        self.reply_cache.save()
+        return contexts
@@ -0,0 +1,196 @@
+"""
+Offline parser for Nitter timeline and tweet detail pages.
+Works on raw HTML (from page.content(), an HTTP response or a saved file) with
+lxml, so parsing does not depend on live DOM handles and saved pages can be
+replayed, e.g. `python -m src.nitter_parser saved_timeline.html`.
+"""
+
+import html as html_lib
+import json
+import re
+import sys
+import lxml.html
+
+# XPath equivalent of a CSS class selector
+_CLASS_XPATH = "contains(concat(' ', normalize-space(@class), ' '), ' {} ')"
+
+
+def _has_class(name):
+    return _CLASS_XPATH.format(name)
+
+
+_TIMELINE_ITEM = f".//*[{_has_class('timeline-item')}]"
+_TWEET_LINK = f".//a[{_has_class('tweet-link')}]"
+_TWEET_CONTENT = f".//*[{_has_class('tweet-content')}]"
+_TWEET_DATE = f".//*[{_has_class('tweet-date')}]//a"
+_REPLYING_TO = f".//*[{_has_class('replying-to')}]"
+_RETWEET_HEADER = f".//*[{_has_class('retweet-header')}]"
+_MAIN_TWEET = f".//*[{_has_class('main-tweet')}]"
+_BEFORE_TWEET = f".//*[{_has_class('before-tweet')}]"
+# Opening tags of tweet links, for fingerprinting raw HTML without building a document
+_TWEET_LINK_TAG_RE = re.compile(r'<a\s[^>]*class="[^"]*\btweet-link\b[^"]*"[^>]*>')
+_HREF_RE = re.compile(r'\shref="([^"]*)"')
+_AFTER_TWEET = f".//*[{_has_class('after-tweet')}]"
+_REPLY_THREAD = f".//*[{_has_class('replies')}]/*[{_has_class('reply')}]"
+
+
+def parse_html(html):
+    """Parse a page into an lxml document; already parsed documents are returned as-is."""
+    if isinstance(html, (str, bytes)):
+        return lxml.html.fromstring(html)
+    return html
+
+
+def _first(element, xpath):
+    found = element.xpath(xpath)
+    return found[0] if found else None
+
+
+def _tweet_id(href):
+    return href.split('/')[-1].split('#')[0]
+
+
+def _inner_text(element):
+    """Text of an element with <br> turned into newlines, like innerText."""
+    if element is None:
+        return ''
+    for br in element.iter('br'):
+        br.tail = '\n' + (br.tail or '')
+        br.tag = 'span'  # converted once, so repeated calls do not add more newlines
+    return element.text_content().strip()
+
+
+def timeline_hrefs(html, limit=10):
+    """
+    Get the tweet links of the first timeline items, for fingerprinting.
+
+    Raw HTML is scanned with a regular expression instead of being parsed, so an
+    unchanged timeline is recognised without building a document at all.
+
+    Args:
+        html: Page HTML or a document from parse_html()
+        limit: Number of items to read
+
+    Returns:
+        List of href strings
+    """
+    if isinstance(html, (str, bytes)):
+        text = html.decode('utf-8', 'replace') if isinstance(html, bytes) else html
+        hrefs = []
+        for tag in _TWEET_LINK_TAG_RE.finditer(text):
+            href = _HREF_RE.search(tag.group(0))
+            if href:
+                hrefs.append(html_lib.unescape(href.group(1)))
+                if len(hrefs) == limit:
+                    break
+        return hrefs
+
+    document = html
+    links = document.xpath(f"//*[{_has_class('timeline-item')}]//a[{_has_class('tweet-link')}]")
+    return [link.get('href') for link in links[:limit]]
+
+
+def parse_timeline(html, limit=10):
+    """
+    Parse the timeline items of a profile page.
+
+    Args:
+        html: Page HTML or a document from parse_html()
+        limit: Number of items to read
+
+    Returns:
+        List of dicts with id, href, text, date, is_reply and is_retweet
+    """
+    document = parse_html(html)
+    items = []
+    for item in document.xpath(_TIMELINE_ITEM)[:limit]:
+        link = _first(item, _TWEET_LINK)
+        if link is None:
+            continue
+        href = link.get('href')
+        date = _first(item, _TWEET_DATE)
+        items.append({
+            'id': _tweet_id(href),
+            'href': href,
+            'text': _inner_text(_first(item, _TWEET_CONTENT)),
+            'date': date.get('title') if date is not None else 'Unknown time',
+            'is_reply': _first(item, _REPLYING_TO) is not None,
+            'is_retweet': _first(item, _RETWEET_HEADER) is not None
+        })
+    return items
+
+
+def _ancestor_dict(item):
+    link = _first(item, _TWEET_LINK)
+    content = _first(item, _TWEET_CONTENT)
+    return {
+        'id': _tweet_id(link.get('href')) if link is not None else None,
+        'text': _inner_text(content) if content is not None else None
+    }
+
+
+def parse_reply_context(html):
+    """
+    Parse the conversation above the main tweet of a detail page.
+
+    Nitter wraps the ancestors in .before-tweet; older layouts put them as
+    .timeline-item siblings directly before .main-tweet.
+
+    Args:
+        html: Page HTML or a document from parse_html()
+
+    Returns:
+        List of {'id': ..., 'text': ...}, oldest first, or None if the page has no main tweet
+    """
+    document = parse_html(html)
+    main = _first(document, _MAIN_TWEET)
+    if main is None:
+        return None
+
+    before = _first(document, _BEFORE_TWEET)
+    if before is not None:
+        return [_ancestor_dict(item) for item in before.xpath(_TIMELINE_ITEM)]
+
+    siblings = main.xpath(f"preceding-sibling::*[{_has_class('timeline-item')}]")
+    return [_ancestor_dict(item) for item in siblings]
+
+
+def parse_reply_threads(html, main_id):
+    """
+    Parse the conversation below the main tweet of a detail page.
+
+    The author's own continuation (.after-tweet) and every thread in .replies
+    become a chain starting at the main tweet, so each tweet in it can be
+    linked to the one above without loading its own detail page.
+
+    Args:
+        html: Page HTML or a document from parse_html()
+        main_id: Tweet ID of the detail page (the main tweet has no tweet-link)
+
+    Returns:
+        List of chains, each a list of {'id': ..., 'text': ...} with the main tweet first;
+        empty if the page has no main tweet or nothing below it
+    """
+    document = parse_html(html)
+    main = _first(document, _MAIN_TWEET)
+    if main is None:
+        return []
+
+    main_dict = {'id': main_id, 'text': _inner_text(_first(main, _TWEET_CONTENT)) or None}
+    containers = document.xpath(_AFTER_TWEET) + document.xpath(_REPLY_THREAD)
+    chains = []
+    for container in containers:
+        items = [_ancestor_dict(item) for item in container.xpath(_TIMELINE_ITEM)]
+        items = [item for item in items if item['id']]
+        if items:
+            chains.append([main_dict] + items)
+    return chains
+
+
+if __name__ == '__main__':
+    # Replay saved pages: python -m src.nitter_parser page.html [page2.html ...]
+    for path in sys.argv[1:]:
+        with open(path, 'rb') as f:
+            document = parse_html(f.read())
+        result = parse_timeline(document) or parse_reply_context(document)
+        print(json.dumps({'file': path, 'result': result}, ensure_ascii=False, indent=2))
@@ -29,7 +29,9 @@ class Notifier:
             logger.warning("WeChat webhook URL not configured. Skipping notification.")
             return
 
-        text_content = f"【马斯克推特新动态】\n\n内容：{tweet['text']}\n\n链接：{tweet['link']}\n时间：{tweet['published']}\n"
+        author = tweet.get('author', 'elonmusk')
+        header = "马斯克推特新动态" if author == 'elonmusk' else f"@{author} 推特新动态"
+        text_content = f"【{header}】\n\n内容：{tweet['text']}\n\n链接：{tweet['link']}\n时间：{tweet['published']}\n"
         text_content += "--------------------------------\n"
 
         etfs = analyze_result.get('etfs', [])
@@ -0,0 +1,88 @@
+"""
+Token-bucket rate limiting for LLM requests.
+Two buckets, requests per minute and tokens per minute, are shared by all
+analyzer worker threads. Token usage is reserved from an estimate before the
+call and settled with the provider's reported usage afterwards.
+"""
+
+import threading
+import time
+from src.utils import setup_logger
+
+logger = setup_logger('RateLimiter')
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        """
+        Args:
+            rate_per_minute: Refill rate
+            capacity: Burst size (default: one minute's worth)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.level = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, amount=1):
+        """
+        Block until `amount` can be taken, then take it.
+
+        Requests larger than the capacity wait for a full bucket instead of forever.
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return waited
+                wait = (amount - self.level) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def adjust(self, amount):
+        """Take (positive) or return (negative) tokens without blocking; the level may go negative."""
+        with self.lock:
+            self._refill()
+            self.level = min(self.capacity, self.level - amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits; a limit of 0 disables it."""
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    def acquire(self, estimated_tokens=0):
+        """
+        Wait for a request slot and the estimated token budget.
+
+        Args:
+            estimated_tokens: Expected prompt + completion tokens of the request
+        """
+        waited = 0.0
+        if self.requests is not None:
+            waited += self.requests.acquire(1)
+        if self.tokens is not None and estimated_tokens:
+            waited += self.tokens.acquire(estimated_tokens)
+        if waited >= 1:
+            logger.info(f"Rate limited LLM request for {waited:.1f}s")
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token bucket once the provider reports the real usage."""
+        if self.tokens is not None and actual_tokens:
+            self.tokens.adjust(actual_tokens - estimated_tokens)
@@ -0,0 +1,247 @@
+"""
+Local relevance gate in front of the LLM analysis.
+Scores a tweet with keyword/entity dictionaries and length/emoji heuristics,
+optionally blended with a small naive Bayes model trained from earlier gate
+decisions, so memes and one-word replies skip the ETF/sector LLM calls. Every
+decision is appended to data/gate_log.jsonl as soon as it is made; tweets that
+went through the full analysis get a separate outcome entry, and the pair
+becomes training data.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from src.etf_retriever import DEFAULT_SYNONYMS
+from src.text_index import tokenize
+from src.utils import DATA_DIR, setup_logger
+
+logger = setup_logger('RelevanceGate')
+
+GATE_LOG_FILE = os.path.join(DATA_DIR, 'gate_log.jsonl')
+
+# Market and company vocabulary on top of the ETF synonym keywords
+GATE_KEYWORDS = [
+    'stock', 'stocks', 'market', 'markets', 'economy', 'inflation', 'rates', 'recession', 'gdp',
+    'earnings', 'revenue', 'deliveries', 'production', 'factory', 'gigafactory', 'launch',
+    'model', 'cybercab', 'falcon', 'dragon', 'x.com', 'payments', 'compute', 'datacenter',
+    'lithium', 'nuclear', 'grid', 'trade', 'tariffs', 'sanctions', 'dollar', 'debt', 'ipo',
+    '股票', '市场', '经济', '关税', '芯片', '电池', '卫星', '火箭', '机器人', '人工智能',
+]
+
+_URL_RE = re.compile(r'https?://\S+')
+_MENTION_RE = re.compile(r'@\w+')
+_CASHTAG_RE = re.compile(r'\$[A-Za-z]{1,6}\b')
+_WORD_RE = re.compile(r'[A-Za-z0-9一-鿿]')
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over text_index tokens, with Laplace smoothing."""
+
+    def __init__(self, samples):
+        """
+        Train the model.
+
+        Args:
+            samples: Iterable of (text, relevant) pairs
+        """
+        self.doc_counts = Counter()
+        self.token_counts = {True: Counter(), False: Counter()}
+        for text, relevant in samples:
+            relevant = bool(relevant)
+            self.doc_counts[relevant] += 1
+            self.token_counts[relevant].update(tokenize(text))
+        self.vocabulary = set(self.token_counts[True]) | set(self.token_counts[False])
+        self.totals = {label: sum(counts.values()) for label, counts in self.token_counts.items()}
+
+    def probability(self, text):
+        """Probability that a tweet is market relevant."""
+        total_docs = sum(self.doc_counts.values())
+        vocab_size = len(self.vocabulary) or 1
+        log_scores = {}
+        for label in (True, False):
+            score = math.log((self.doc_counts[label] + 1) / (total_docs + 2))
+            for token in tokenize(text):
+                if token in self.vocabulary:
+                    score += math.log((self.token_counts[label][token] + 1) / (self.totals[label] + vocab_size))
+            log_scores[label] = score
+        # Softmax over the two classes, shifted for numerical stability
+        top = max(log_scores.values())
+        relevant = math.exp(log_scores[True] - top)
+        return relevant / (relevant + math.exp(log_scores[False] - top))
+
+
+class RelevanceGate:
+    """Decide cheaply whether a tweet is worth the LLM analysis."""
+
+    def __init__(self, config=None, path=None):
+        """
+        Initialize the gate and, if enabled, train the model from the gate log.
+
+        Args:
+            config: Dict with optional keys:
+                - threshold: Minimum score to run the LLM analysis (default 0.35)
+                - min_words: Tweets with fewer words count as short replies (default 4)
+                - keywords: Extra relevance keywords
+                - model: Blend in the naive Bayes model trained from the log (default true)
+                - min_samples: Labelled decisions needed per class to train it (default 20)
+                - on_skip: 'notify' sends a short "no relevance" notification, 'silent' none (default 'notify')
+            path: Decision log (default data/gate_log.jsonl)
+        """
+        config = config or {}
+        self.threshold = config.get('threshold', 0.35)
+        self.min_words = config.get('min_words', 4)
+        self.on_skip = config.get('on_skip', 'notify')
+        self.keywords = {k.lower() for k in list(DEFAULT_SYNONYMS) + GATE_KEYWORDS + config.get('keywords', [])}
+        # tokenize() splits on punctuation, so keywords such as 'x.com' are matched on the text
+        phrases = sorted(k for k in self.keywords if k.isascii() and tokenize(k) != [k])
+        self.phrase_re = re.compile(
+            r'(?<![\w.])(?:' + '|'.join(map(re.escape, phrases)) + r')(?![\w])'
+        ) if phrases else None
+        self.path = path or GATE_LOG_FILE
+        # Analyzer worker threads append concurrently
+        self.lock = threading.Lock()
+        self.model = None
+        if config.get('model', True):
+            self.model = self._train(config.get('min_samples', 20))
+
+    def _train(self, min_samples):
+        texts = {}  # {tweet_id: text} from decision entries
+        labels = {}  # {tweet_id: relevant} from outcome entries
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        if entry.get('event') == 'outcome':
+                            labels[entry.get('id')] = entry.get('relevant')
+                            continue
+                        texts[entry.get('id')] = entry.get('text', '')
+                        # Older logs stored the outcome on the decision entry itself
+                        if entry.get('relevant') is not None:
+                            labels[entry.get('id')] = entry['relevant']
+            except OSError as e:
+                logger.warning(f"Failed to read gate log: {e}")
+        samples = [(texts[i], relevant) for i, relevant in labels.items() if i in texts and relevant is not None]
+
+        positives = sum(1 for _, relevant in samples if relevant)
+        if min(positives, len(samples) - positives) < min_samples:
+            logger.info(f"Relevance model not trained: {positives}/{len(samples)} relevant samples logged so far")
+            return None
+        logger.info(f"Trained relevance model on {len(samples)} logged decisions ({positives} relevant)")
+        return NaiveBayesModel(samples)
+
+    def _heuristic(self, text):
+        """
+        Rule-based score and the reasons behind it.
+
+        Returns:
+            Tuple of (score between 0 and 1, list of reason strings)
+        """
+        if _CASHTAG_RE.search(text):
+            return 1.0, ['cashtag']
+        stripped = _MENTION_RE.sub('', _URL_RE.sub('', text))
+        if not _WORD_RE.search(stripped):
+            return 0.0, ['emoji/link only']
+
+        tokens = tokenize(stripped)
+        hits = sorted(self.keywords.intersection(tokens))
+        if not hits and self.phrase_re is not None:
+            hits = sorted(set(self.phrase_re.findall(stripped.lower())))
+        if hits:
+            return 1.0, [f"keywords: {', '.join(hits[:5])}"]
+        # Mostly CJK text is tokenized into n-grams, so match keywords as substrings there
+        lowered = stripped.lower()
+        hits = sorted(k for k in self.keywords if not k.isascii() and k in lowered)
+        if hits:
+            return 1.0, [f"keywords: {', '.join(hits[:5])}"]
+
+        words = len(stripped.split())
+        if words < self.min_words:
+            return 0.1, [f"short ({words} words)"]
+        if words >= 15:
+            return 0.6, [f"long ({words} words)"]
+        return 0.4, [f"{words} words, no keywords"]
+
+    def decide(self, text):
+        """
+        Score a tweet.
+
+        Args:
+            text: Tweet text (including any reply context)
+
+        Returns:
+            Dict with 'relevant' (bool), 'score', 'reasons' and 'latency_ms'
+        """
+        started_at = time.perf_counter()
+        score, reasons = self._heuristic(text or '')
+        if self.model is not None:
+            probability = self.model.probability(text or '')
+            reasons.append(f"model {probability:.2f}")
+            score = (score + probability) / 2
+        latency_ms = (time.perf_counter() - started_at) * 1000
+        return {
+            'relevant': score >= self.threshold,
+            'score': round(score, 3),
+            'reasons': reasons,
+            'latency_ms': round(latency_ms, 3),
+        }
+
+    def _append(self, entry):
+        with self.lock:
+            try:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            except OSError as e:
+                logger.warning(f"Failed to write gate log: {e}")
+
+    def log(self, tweet, decision):
+        """
+        Record a gate decision, right after it is made.
+
+        Args:
+            tweet: Tweet dict from the monitor
+            decision: Dict from decide()
+        """
+        verdict = 'analyze' if decision['relevant'] else 'skip'
+        logger.info(
+            f"Gate {verdict} tweet {tweet.get('id')}: score {decision['score']} "
+            f"({'; '.join(decision['reasons'])}) in {decision['latency_ms']:.2f}ms"
+        )
+        self._append({
+            'event': 'decision',
+            'id': tweet.get('id'),
+            'author': tweet.get('author'),
+            'text': tweet.get('text', ''),
+            'decided_at': time.time(),
+            'passed': decision['relevant'],
+            'score': decision['score'],
+            'reasons': decision['reasons'],
+            'latency_ms': decision['latency_ms'],
+        })
+
+    def log_outcome(self, tweet, found):
+        """
+        Record the outcome of the LLM analysis of a tweet that passed the gate.
+
+        Paired with the decision entry of the same tweet ID, it labels that tweet
+        for training the model on the next start.
+
+        Args:
+            tweet: Tweet dict from the monitor
+            found: Whether the analysis found any ETF, sector or concept
+        """
+        logger.info(f"Gate outcome for tweet {tweet.get('id')}: {'relevant' if found else 'nothing found'}")
+        self._append({
+            'event': 'outcome',
+            'id': tweet.get('id'),
+            'author': tweet.get('author'),
+            'analyzed_at': time.time(),
+            'relevant': found,
+        })
@@ -0,0 +1,108 @@
+"""
+Small persistent LRU cache for reply contexts.
+Parent tweet texts are stored once per parent ID and replies point at their
+parent, so every reply in a thread shares the same cached parent. Links are
+learned from both directions of a detail page: the ancestors above the main
+tweet and the reply threads below it, which also covers sibling replies.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from src.utils import DATA_DIR, setup_logger
+
+logger = setup_logger('ReplyCache')
+
+REPLY_CACHE_FILE = os.path.join(DATA_DIR, 'reply_context_cache.json')
+
+
+class ReplyContextCache:
+    """LRU cache mapping reply ID -> parent ID and parent ID -> parent text."""
+
+    def __init__(self, capacity=500, path=REPLY_CACHE_FILE):
+        """
+        Initialize the cache and load it from disk.
+
+        Args:
+            capacity: Maximum number of entries kept in each map
+            path: Persistence file
+        """
+        self.capacity = capacity
+        self.path = path
+        self.parents = OrderedDict()  # {parent_id: parent_text}
+        self.replies = OrderedDict()  # {reply_id: parent_id}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.parents.update(data.get('parents', {}))
+            self.replies.update(data.get('replies', {}))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Failed to load reply context cache: {e}")
+
+    def save(self):
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'parents': self.parents, 'replies': self.replies}, f, ensure_ascii=False)
+        except OSError as e:
+            logger.warning(f"Failed to save reply context cache: {e}")
+
+    def _put(self, mapping, key, value):
+        mapping[key] = value
+        mapping.move_to_end(key)
+        while len(mapping) > self.capacity:
+            mapping.popitem(last=False)
+
+    def get_parent_id(self, reply_id):
+        """Cached parent ID of a reply, or None."""
+        return self.replies.get(reply_id)
+
+    def get_parent_text(self, reply_id):
+        """
+        Get the cached parent text of a reply.
+
+        Args:
+            reply_id: Tweet ID of the reply
+
+        Returns:
+            Parent tweet text, or None on a cache miss
+        """
+        parent_id = self.replies.get(reply_id)
+        if parent_id is None or parent_id not in self.parents:
+            return None
+        self.replies.move_to_end(reply_id)
+        self.parents.move_to_end(parent_id)
+        return self.parents[parent_id]
+
+    def add_thread(self, reply_id, ancestors):
+        """
+        Record the conversation above a reply.
+
+        Every ancestor is cached by ID and linked to the one above it, so replies
+        further up the same thread resolve without loading their own detail page.
+
+        Args:
+            reply_id: Tweet ID of the reply whose detail page was loaded
+            ancestors: List of {'id': ..., 'text': ...}, oldest first
+        """
+        chain = [a for a in ancestors if a.get('id')] + [{'id': reply_id}]
+        for ancestor in chain[:-1]:
+            if ancestor.get('text'):
+                self._put(self.parents, ancestor['id'], ancestor['text'])
+        for child, parent in zip(chain[1:], chain[:-1]):
+            self._put(self.replies, child['id'], parent['id'])
+
+    def add_replies(self, threads):
+        """
+        Record the conversation below a loaded tweet.
+
+        Args:
+            threads: Reply chains from parse_reply_threads(), each starting at the loaded tweet
+        """
+        for chain in threads:
+            if len(chain) > 1:
+                self.add_thread(chain[-1]['id'], chain[:-1])
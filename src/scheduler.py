@@ -0,0 +1,98 @@
+"""
+Adaptive polling scheduler.
+Tightens the poll interval right after new tweets and inside configured hot
+windows (e.g. A-share trading hours), backs off exponentially while the
+account is quiet and adds jitter so polls do not align with other clients.
+"""
+
+import random
+from datetime import datetime, time as dt_time, timedelta, timezone
+from src.utils import setup_logger
+
+logger = setup_logger('Scheduler')
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+
+def parse_window(window):
+    """Parse a 'HH:MM-HH:MM' window into a (start, end) pair of datetime.time."""
+    start_str, end_str = window.split('-')
+    start = datetime.strptime(start_str.strip(), '%H:%M').time()
+    end = datetime.strptime(end_str.strip(), '%H:%M').time()
+    return start, end
+
+
+class AdaptiveScheduler:
+    """Compute the delay before the next poll from recent activity and the clock."""
+
+    def __init__(self, config=None, base_interval=300):
+        """
+        Initialize the scheduler.
+
+        Args:
+            config: Dict with optional keys:
+                - min_interval: Interval right after new tweets, in seconds (default 30)
+                - max_interval: Upper bound while quiet (default 4x base_interval)
+                - backoff_factor: Multiplier per quiet poll (default 1.5)
+                - jitter: Random +/- fraction applied to every delay (default 0.1)
+                - hot_windows: List of 'HH:MM-HH:MM' Beijing-time windows (default ['09:00-15:00'])
+                - hot_interval: Maximum interval inside a hot window (default 60)
+                - hot_weekdays_only: Only treat Monday-Friday as hot (default True)
+            base_interval: The configured check_interval, used as the starting point
+        """
+        config = config or {}
+        self.base_interval = base_interval
+        self.min_interval = config.get('min_interval', 30)
+        self.max_interval = config.get('max_interval', base_interval * 4)
+        self.backoff_factor = config.get('backoff_factor', 1.5)
+        self.jitter = config.get('jitter', 0.1)
+        self.hot_windows = [parse_window(w) for w in config.get('hot_windows', ['09:00-15:00'])]
+        self.hot_interval = config.get('hot_interval', 60)
+        self.hot_weekdays_only = config.get('hot_weekdays_only', True)
+
+        self.current_interval = base_interval
+        self.quiet_polls = 0
+
+    def in_hot_window(self, now=None):
+        """Check whether a time (default: now) falls in a hot window, in Beijing time."""
+        now = (now or datetime.now(timezone.utc)).astimezone(BEIJING_TZ)
+        if self.hot_weekdays_only and now.weekday() >= 5:
+            return False
+        current = dt_time(now.hour, now.minute)
+        for start, end in self.hot_windows:
+            if start <= end:
+                if start <= current < end:
+                    return True
+            elif current >= start or current < end:
+                # Window wraps past midnight
+                return True
+        return False
+
+    def next_delay(self, new_tweet_count, now=None):
+        """
+        Decide how long to wait before the next poll and log the decision.
+
+        Args:
+            new_tweet_count: Number of new tweets the last poll found
+            now: Current time (timezone-aware), for testing
+
+        Returns:
+            Delay in seconds
+        """
+        if new_tweet_count:
+            self.quiet_polls = 0
+            self.current_interval = self.min_interval
+            reason = f"{new_tweet_count} new tweets"
+        else:
+            self.quiet_polls += 1
+            self.current_interval = min(self.current_interval * self.backoff_factor, self.max_interval)
+            reason = f"quiet for {self.quiet_polls} polls"
+
+        interval = self.current_interval
+        if self.in_hot_window(now):
+            interval = min(interval, self.hot_interval)
+            reason += ", hot window"
+
+        delay = max(1.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+        logger.info(f"Next poll in {delay:.0f}s ({reason}, interval {interval:.0f}s)")
+        return delay
@@ -0,0 +1,164 @@
+"""
+Theme groups over the Eastmoney sector and concept lists.
+Every sector/concept name is assigned to one or more coarse theme groups by
+keyword, so the LLM can first pick a few groups from a compact catalog and
+then choose among the members of those groups only. Names that match no theme
+are split into numbered '其他' groups, so every name stays reachable.
+"""
+
+import hashlib
+from src.cache_manager import get_cache_manager
+from src.utils import setup_logger
+
+logger = setup_logger('SectorGroups')
+
+# Theme group -> keywords matched against sector/concept names (case-insensitive)
+THEME_KEYWORDS = {
+    '新能源汽车': ['汽车', '新能源车', '充电', '锂电', '电池', '无人驾驶', '智能驾驶', '整车', '零部件', '特斯拉'],
+    '人工智能与算力': ['人工智能', 'AI', '算力', 'ChatGPT', '大模型', '数据中心', '云计算', 'CPO', '光模块', '液冷', '服务器', 'Sora'],
+    '半导体与电子': ['芯片', '半导体', '存储', '电子', '元件', 'PCB', '光刻', '封装', '面板', '消费电子', '传感器'],
+    '航天军工': ['航天', '航空', '军工', '卫星', '北斗', '大飞机', '低空', '无人机', '国防', '船舶'],
+    '通信与互联网': ['通信', '5G', '6G', '互联网', '传媒', '游戏', '短剧', '软件', '信创', '网络安全', '数字', '数据'],
+    '机器人与高端制造': ['机器人', '减速器', '工业母机', '机械', '自动化', '智能制造', '设备', '仪器'],
+    '能源电力': ['光伏', '风电', '储能', '电力', '电网', '氢', '核电', '能源', '煤', '石油', '油气', '天然气', '特高压'],
+    '医药生物': ['医', '药', '生物', '疫苗', '基因', '脑机', '健康', '养老'],
+    '金融': ['银行', '证券', '保险', '金融', '区块链', '数字货币', '券商', '支付', '多元金融'],
+    '消费': ['消费', '食品', '饮料', '白酒', '酿酒', '旅游', '酒店', '家电', '零售', '纺织', '服装', '美容', '教育'],
+    '材料化工': ['化工', '化学', '材料', '稀土', '有色', '钢', '铝', '铜', '黄金', '贵金属', '小金属', '石墨', '塑料', '玻璃'],
+    '地产基建': ['房地产', '地产', '建筑', '建材', '基建', '水泥', '装修', '装饰', '工程'],
+    '交运物流': ['物流', '航运', '港口', '铁路', '公路', '机场', '交通', '快递', '运输'],
+    '农业环保': ['农', '养殖', '种业', '环保', '水务', '垃圾', '林业', '渔业'],
+}
+
+
+def names_signature(sector_names, concept_names):
+    """Digest of both name lists, used to detect when the groups need rebuilding."""
+    digest = hashlib.sha1()
+    for name in sector_names + ['\0'] + concept_names:
+        digest.update(f"{name}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_groups(sector_names, concept_names, other_chunk_size=80):
+    """
+    Assign every sector and concept name to theme groups.
+
+    Args:
+        sector_names: Industry sector names
+        concept_names: Concept sector names
+        other_chunk_size: Maximum size of each '其他' group for unmatched names
+
+    Returns:
+        Dict mapping group name to {'sectors': [...], 'concepts': [...]}
+    """
+    lowered_keywords = {group: [k.lower() for k in keywords] for group, keywords in THEME_KEYWORDS.items()}
+    groups = {group: {'sectors': [], 'concepts': []} for group in THEME_KEYWORDS}
+    unmatched = []
+
+    for kind, names in (('sectors', sector_names), ('concepts', concept_names)):
+        for name in names:
+            lowered = name.lower()
+            matched = False
+            for group, keywords in lowered_keywords.items():
+                if any(k in lowered for k in keywords):
+                    groups[group][kind].append(name)
+                    matched = True
+            if not matched:
+                unmatched.append((kind, name))
+
+    for start in range(0, len(unmatched), other_chunk_size):
+        group = groups.setdefault(f'其他{start // other_chunk_size + 1}', {'sectors': [], 'concepts': []})
+        for kind, name in unmatched[start:start + other_chunk_size]:
+            group[kind].append(name)
+
+    return {group: members for group, members in groups.items() if members['sectors'] or members['concepts']}
+
+
+class SectorGroups:
+    """Cached theme groups with a compact catalog for group selection."""
+
+    def __init__(self, config=None, cache=None):
+        """
+        Initialize the group catalog.
+
+        Args:
+            config: Dict with optional keys:
+                - other_chunk_size: Maximum size of each '其他' group (default 80)
+                - sample_size: Example members shown per group in the catalog (default 8)
+            cache: CacheManager instance (default: the shared one)
+        """
+        config = config or {}
+        self.other_chunk_size = config.get('other_chunk_size', 80)
+        self.sample_size = config.get('sample_size', 8)
+        self.cache = cache or get_cache_manager()
+        self._groups = None
+        self._signature = None
+
+    def get_groups(self, sector_names, concept_names):
+        """
+        Get the theme groups for the current name lists.
+
+        Groups are cached on disk alongside the concept list (same expiry) and
+        rebuilt whenever either name list changes.
+
+        Returns:
+            Dict mapping group name to {'sectors': [...], 'concepts': [...]}
+        """
+        # Sorted, so source ordering changes do not rebuild the groups or alter the catalog text
+        sector_names, concept_names = sorted(sector_names), sorted(concept_names)
+        signature = names_signature(sector_names, concept_names)
+        if signature == self._signature:
+            return self._groups
+
+        def build():
+            groups = build_groups(sector_names, concept_names, self.other_chunk_size)
+            logger.info(f"Built {len(groups)} theme groups over {len(sector_names)} sectors and {len(concept_names)} concepts")
+            return {'signature': signature, 'groups': groups}
+
+        cached = self.cache.get('sector_groups', build, 'concept_list', 'json')
+        if not cached or cached.get('signature') != signature:
+            self.cache.clear_key('sector_groups')
+            cached = self.cache.get('sector_groups', build, 'concept_list', 'json')
+
+        self._groups = cached['groups']
+        self._signature = signature
+        return self._groups
+
+    def catalog(self, groups):
+        """
+        Format groups as one compact line each: name, size and example members.
+
+        Args:
+            groups: Dict from get_groups()
+
+        Returns:
+            Catalog string for the group selection prompt
+        """
+        lines = []
+        for group, members in groups.items():
+            names = members['concepts'] + members['sectors']
+            examples = '、'.join(names[:self.sample_size])
+            more = '等' if len(names) > self.sample_size else ''
+            lines.append(f"{group}（{len(names)}个）：{examples}{more}")
+        return '\n'.join(lines)
+
+    @staticmethod
+    def members(groups, chosen):
+        """
+        Collect the sectors and concepts of the chosen groups.
+
+        Args:
+            groups: Dict from get_groups()
+            chosen: Group names picked in the first stage (unknown names are ignored)
+
+        Returns:
+            Tuple of (sector_names, concept_names), deduplicated in catalog order
+        """
+        sectors, concepts = {}, {}
+        for group in chosen:
+            members = groups.get(group)
+            if not members:
+                continue
+            sectors.update(dict.fromkeys(members['sectors']))
+            concepts.update(dict.fromkeys(members['concepts']))
+        return list(sectors), list(concepts)
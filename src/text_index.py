@@ -0,0 +1,102 @@
+"""
+Small offline text index.
+Tokenizes mixed Chinese/Latin text into character n-grams (CJK runs) and
+lowercased words (Latin runs) and ranks documents by TF-IDF cosine similarity
+through an inverted index.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+
+# Runs of CJK characters, or of ASCII letters/digits
+_TOKEN_RUN_RE = re.compile(r'[一-鿿]+|[A-Za-z0-9]+')
+
+
+def _is_cjk(run):
+    return '一' <= run[0] <= '鿿'
+
+
+def tokenize(text, ngram_sizes=(2, 3)):
+    """
+    Split text into index tokens.
+
+    CJK runs become character n-grams of the given sizes (a run shorter than the
+    smallest size is kept whole); Latin runs become lowercased words.
+
+    Args:
+        text: Text to tokenize
+        ngram_sizes: Character n-gram sizes for CJK runs
+
+    Returns:
+        List of tokens (with repeats)
+    """
+    tokens = []
+    for run in _TOKEN_RUN_RE.findall(text or ''):
+        if not _is_cjk(run):
+            tokens.append(run.lower())
+            continue
+        if len(run) < min(ngram_sizes):
+            tokens.append(run)
+            continue
+        for n in ngram_sizes:
+            tokens.extend(run[i:i + n] for i in range(len(run) - n + 1))
+    return tokens
+
+
+class NgramIndex:
+    """TF-IDF index over a fixed list of short documents."""
+
+    def __init__(self, documents, ngram_sizes=(2, 3)):
+        """
+        Build the index.
+
+        Args:
+            documents: List of document strings; results refer to positions in this list
+            ngram_sizes: Character n-gram sizes for CJK runs
+        """
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.size = len(documents)
+
+        doc_tokens = [Counter(tokenize(doc, self.ngram_sizes)) for doc in documents]
+        doc_freq = Counter(token for tokens in doc_tokens for token in tokens)
+        # Smoothed IDF, so tokens found in every document still count a little
+        self.idf = {token: math.log((self.size + 1) / (df + 1)) + 1 for token, df in doc_freq.items()}
+
+        self.postings = defaultdict(list)  # {token: [(doc_index, weight)]}
+        for doc_index, tokens in enumerate(doc_tokens):
+            vector = self._weigh(tokens)
+            for token, weight in vector.items():
+                self.postings[token].append((doc_index, weight))
+
+    def _weigh(self, tokens):
+        """L2-normalized TF-IDF vector of a token counter (unknown tokens dropped)."""
+        vector = {t: count * self.idf[t] for t, count in tokens.items() if t in self.idf}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if not norm:
+            return {}
+        return {t: w / norm for t, w in vector.items()}
+
+    def search(self, query, top_k=10, extra_tokens=None):
+        """
+        Rank documents by cosine similarity to a query.
+
+        Args:
+            query: Query text
+            top_k: Maximum number of results
+            extra_tokens: Additional query tokens (e.g. from synonym expansion)
+
+        Returns:
+            List of (doc_index, score) with score > 0, best first
+        """
+        tokens = Counter(tokenize(query, self.ngram_sizes))
+        if extra_tokens:
+            tokens.update(extra_tokens)
+
+        scores = defaultdict(float)
+        for token, weight in self._weigh(tokens).items():
+            for doc_index, doc_weight in self.postings.get(token, ()):
+                scores[doc_index] += weight * doc_weight
+
+        ranked = sorted(scores.items(), key=lambda entry: entry[1], reverse=True)
+        return ranked[:top_k]
@@ -0,0 +1,141 @@
+"""
+Processed tweet ID store.
+Keeps a numeric high-watermark plus a bounded set of the newest IDs, backed by
+an append-only journal that is periodically compacted into a snapshot.
+"""
+
+import heapq
+import json
+import os
+from src.utils import DATA_DIR, setup_logger
+
+logger = setup_logger('TweetStore')
+
+# Twitter snowflake IDs carry a millisecond timestamp in their upper bits
+SNOWFLAKE_EPOCH_MS = 1288834974657
+
+
+def snowflake_timestamp_ms(tweet_id):
+    """Unix time in milliseconds encoded in a snowflake tweet ID."""
+    return (int(tweet_id) >> 22) + SNOWFLAKE_EPOCH_MS
+
+
+class TweetStore:
+    """Dedupe store for processed tweet IDs with a numeric watermark."""
+
+    def __init__(self, name='processed_tweets', capacity=1000, watermark_slack=3600):
+        """
+        Load the snapshot and replay the journal.
+
+        Args:
+            name: Base file name under data/ ('<name>.json' snapshot, '<name>.journal' journal)
+            capacity: Number of newest IDs kept in the in-memory set
+            watermark_slack: Seconds below the watermark in which IDs are still checked
+                against the set, so tweets surfacing late on a lagging mirror are not lost
+        """
+        self.capacity = capacity
+        self.watermark_slack_ms = watermark_slack * 1000
+        self.snapshot_path = os.path.join(DATA_DIR, f'{name}.json')
+        self.journal_path = os.path.join(DATA_DIR, f'{name}.journal')
+
+        self.watermark = 0
+        self._ids = set()
+        self._heap = []  # min-heap of numeric IDs, for eviction by ID order
+        self._pending = []  # IDs added since the last flush
+        self._journal_lines = 0
+
+        self._load()
+
+    def _load(self):
+        if os.path.exists(self.snapshot_path):
+            try:
+                with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                # Older versions stored a plain list of ID strings
+                ids = data if isinstance(data, list) else data.get('ids', [])
+                for tweet_id in ids:
+                    self._insert(tweet_id)
+                if isinstance(data, dict):
+                    self.watermark = max(self.watermark, int(data.get('watermark', 0)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Failed to load processed tweets snapshot: {e}")
+
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.isdigit():
+                        self._insert(line)
+                        self._journal_lines += 1
+
+    def _insert(self, tweet_id):
+        tweet_id = str(tweet_id)
+        if not tweet_id.isdigit() or tweet_id in self._ids:
+            return
+        numeric_id = int(tweet_id)
+        self._ids.add(tweet_id)
+        heapq.heappush(self._heap, numeric_id)
+        self.watermark = max(self.watermark, numeric_id)
+        while len(self._heap) > self.capacity:
+            self._ids.discard(str(heapq.heappop(self._heap)))
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, tweet_id):
+        return str(tweet_id) in self._ids
+
+    def is_processed(self, tweet_id, is_retweet=False):
+        """
+        Check whether a tweet was already handled.
+
+        IDs well below the watermark are skipped without a set lookup. Retweets
+        carry the original tweet's (older) ID, so only the set is consulted for them.
+
+        Args:
+            tweet_id: Tweet ID string
+            is_retweet: Whether the timeline item is a retweet
+
+        Returns:
+            True if the tweet should be skipped
+        """
+        tweet_id = str(tweet_id)
+        if tweet_id in self._ids:
+            return True
+        if is_retweet or not tweet_id.isdigit() or not self.watermark:
+            return False
+        return snowflake_timestamp_ms(tweet_id) < snowflake_timestamp_ms(self.watermark) - self.watermark_slack_ms
+
+    def add(self, tweet_id):
+        """Mark a tweet as processed. Call flush() to persist."""
+        tweet_id = str(tweet_id)
+        if tweet_id in self._ids:
+            return
+        self._insert(tweet_id)
+        self._pending.append(tweet_id)
+
+    def flush(self):
+        """Append pending IDs to the journal, compacting it once it outgrows the set."""
+        if not self._pending:
+            return
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(f"{tweet_id}\n" for tweet_id in self._pending))
+        self._journal_lines += len(self._pending)
+        self._pending = []
+
+        if self._journal_lines > self.capacity:
+            self.compact()
+
+    def compact(self):
+        """Write the current set and watermark as a snapshot and truncate the journal."""
+        data = {
+            'watermark': str(self.watermark),
+            'ids': [str(i) for i in sorted(self._heap)]
+        }
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.snapshot_path)
+        open(self.journal_path, 'w').close()
+        self._journal_lines = 0
+        logger.info(f"Compacted processed tweets store ({len(self._ids)} IDs, watermark {self.watermark})")
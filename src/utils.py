@@ -1,4 +1,5 @@
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 import json
 import os
 import logging
@@ -6,7 +7,7 @@ import locale
 
 CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config.json')
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data')
-PROCESSED_TWEETS_FILE = os.path.join(DATA_DIR, 'processed_tweets.json')
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
@@ -14,6 +15,7 @@ if not os.path.exists(DATA_DIR):
 def convert_to_beijing_time(time_str):
     """
     Convert Nitter time string (e.g. 'Jan 18, 2026 · 11:36 PM UTC') to Beijing Time string.
+    RFC 822 dates from RSS feeds are accepted as well.
     """
     try:
         # Save current locale
@@ -44,6 +46,14 @@ def convert_to_beijing_time(time_str):
             # Restore locale
             locale.setlocale(locale.LC_TIME, old_locale)
     except Exception as e:
+        # RSS feeds use RFC 822 dates (e.g. 'Sun, 18 Jan 2026 23:36:00 GMT')
+        try:
+            dt = parsedate_to_datetime(time_str)
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            return dt.astimezone(timezone(timedelta(hours=8))).strftime('%Y-%m-%d %H:%M:%S')
+        except (TypeError, ValueError, IndexError):
+            pass
         logger = logging.getLogger('Utils')
         logger.warning(f"Failed to parse time '{time_str}': {e}")
         return time_str
@@ -54,25 +64,6 @@ def load_config():
     with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def load_processed_tweets():
-    if not os.path.exists(PROCESSED_TWEETS_FILE):
-        return []
-    with open(PROCESSED_TWEETS_FILE, 'r', encoding='utf-8') as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return []
-
-def save_processed_tweets(tweet_ids):
-    # Ensure unique and sorted
-    unique_ids = sorted(list(set(tweet_ids)))
-    # Keep only last 1000 to prevent infinite growth
-    if len(unique_ids) > 1000:
-        unique_ids = unique_ids[-1000:]
-        
-    with open(PROCESSED_TWEETS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(unique_ids, f, indent=2)
-
 def setup_logger(name):
     logger = logging.getLogger(name)
     logger.setLevel(logging.INFO)
@@ -0,0 +1,132 @@
+import json
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from src import metrics
+from src.analyzer import ETFAnalyzer
+
+ETFS = [{'code': '515030', 'name': '新能源车ETF'}, {'code': '159819', 'name': '人工智能ETF'}]
+SECTORS = [{'板块名称': '汽车整车'}, {'板块名称': '半导体'}]
+CONCEPTS = [{'板块名称': '特斯拉'}, {'板块名称': '人形机器人'}]
+
+
+def chunk(content=None, usage=None):
+    choices = [SimpleNamespace(delta=SimpleNamespace(content=content))] if content is not None else []
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+class FakeStream:
+    """Streamed completion that records how far it was read and whether it was closed."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for item in self.chunks:
+            self.read += 1
+            yield item
+
+    def close(self):
+        self.closed = True
+
+
+def analyzer(stream):
+    instance = ETFAnalyzer.__new__(ETFAnalyzer)
+    instance.client = SimpleNamespace(chat=lambda **kwargs: stream)
+    return instance
+
+
+class FakeClient:
+    """LLMClient stand-in that records the messages and answers with canned JSON replies."""
+
+    model = 'fake-model'
+    last_call = {'model': 'fake-model', 'retries': 0}
+
+    def __init__(self, config):
+        self.replies = []
+        self.requests = []
+
+    def chat(self, messages, **kwargs):
+        self.requests.append(messages)
+        message = SimpleNamespace(content=json.dumps(self.replies.pop(0), ensure_ascii=False))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def offline_analyzer(**llm_config):
+    """ETFAnalyzer on a FakeClient, with the cache, gate, retrieval and encodings off."""
+    config = {
+        'llm_config': {'stream': False, **llm_config},
+        'llm_cache': {'enabled': False},
+        'relevance_gate': {'enabled': False},
+        'etf_retrieval': {'enabled': False},
+        'catalog_encoding': {'enabled': False},
+        'sector_selection': {'mode': 'flat'},
+    }
+    with mock.patch('src.analyzer.load_config', return_value=config), \
+            mock.patch('src.analyzer.LLMClient', FakeClient):
+        return ETFAnalyzer()
+
+
+class TestCombinedAnalysis(unittest.TestCase):
+    def test_one_call_returns_all_validated_fields(self):
+        analyzer = offline_analyzer(combined_analysis=True)
+        analyzer.client.replies.append({
+            'summary': '特斯拉交付创新高', 'etf_codes': ['515030', '000000'],
+            'sectors': ['汽车整车', '不存在'], 'concepts': ['特斯拉概念'],
+        })
+        result = analyzer.analyze_all('Tesla deliveries hit a record', ETFS, SECTORS, CONCEPTS)
+
+        self.assertEqual(len(analyzer.client.requests), 1)
+        self.assertEqual(result, {'summary': '特斯拉交付创新高', 'etf_codes': ['515030'],
+                                  'sectors': ['汽车整车'], 'concepts': ['特斯拉']})
+
+
+class TestPromptLayout(unittest.TestCase):
+    def test_static_prefix_is_shared_and_tweet_comes_last(self):
+        analyzer = offline_analyzer()
+        tweets = ['Tesla deliveries hit a record', 'Optimus is learning to fold laundry']
+        for tweet in tweets:
+            analyzer.client.replies.append({'summary': '', 'etf_codes': []})
+            analyzer.analyze_relevant_etfs(tweet, ETFS)
+
+        prompts = [messages[-1]['content'] for messages in analyzer.client.requests]
+        prefixes = [prompt.split(tweet)[0] for prompt, tweet in zip(prompts, tweets)]
+        self.assertEqual(prefixes[0], prefixes[1])
+        self.assertIn('515030 新能源车ETF', prefixes[0])
+        for prompt, tweet in zip(prompts, tweets):
+            self.assertTrue(prompt.rstrip().endswith(f'"{tweet}"'))
+        # The system message does not vary per tweet either
+        self.assertEqual(analyzer.client.requests[0][0], analyzer.client.requests[1][0])
+
+
+class TestStreamingComplete(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def test_stops_once_required_keys_parse(self):
+        stream = FakeStream([
+            chunk('{"summary": "特斯拉'), chunk('交付", "etf_'), chunk('codes": ["515030"]'),
+            chunk(', "reason": "电动车'), chunk('板块受益"}'), chunk(usage=SimpleNamespace(total_tokens=90)),
+        ])
+        content, usage, ttft = analyzer(stream)._complete([], True, True, ('summary', 'etf_codes'))
+        self.assertEqual(content, '{"summary": "特斯拉交付", "etf_codes": ["515030"]}')
+        self.assertIsNone(usage)
+        self.assertIsNotNone(ttft)
+        self.assertEqual(stream.read, 3)
+        self.assertTrue(stream.closed)
+        self.assertEqual(metrics.get('llm_stream_early_stops'), 1)
+
+    def test_complete_reply_read_to_usage_chunk(self):
+        usage = SimpleNamespace(total_tokens=42)
+        stream = FakeStream([chunk('{"groups": '), chunk('["金融", "汽车"]}'), chunk(usage=usage)])
+        content, reported, _ = analyzer(stream)._complete([], True, True, ('groups', 'missing'))
+        self.assertEqual(content, '{"groups": ["金融", "汽车"]}')
+        self.assertIs(reported, usage)
+        self.assertEqual(stream.read, 3)
+        self.assertEqual(metrics.get('llm_stream_early_stops'), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
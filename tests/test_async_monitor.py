@@ -0,0 +1,88 @@
+import asyncio
+import tempfile
+import time
+import unittest
+from unittest import mock
+from src.async_monitor import AsyncTwitterMonitor
+from src.instance_health import InstanceHealth
+
+
+class FakeAsyncPage:
+    """Page whose navigation to a URL takes a fixed time, then shows the timeline or fails."""
+
+    def __init__(self, site):
+        self.site = site  # {url: (seconds, ok)}
+        self.url = None
+        self.closed = False
+
+    async def goto(self, url, **kwargs):
+        self.url = url
+        await asyncio.sleep(self.site[url][0])
+
+    async def wait_for_selector(self, selector, **kwargs):
+        if not self.site[self.url][1]:
+            raise TimeoutError(f"{selector} not found on {self.url}")
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAsyncPool:
+    def __init__(self, site):
+        self.site = site
+        self.pages = []
+
+    async def new_page(self):
+        page = FakeAsyncPage(self.site)
+        self.pages.append(page)
+        return page
+
+
+class TestAsyncRace(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        patcher = mock.patch('src.instance_health.DATA_DIR', self.tmpdir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def race(self, site, delay, fanout=3):
+        monitor = AsyncTwitterMonitor.__new__(AsyncTwitterMonitor)
+        monitor.hedge_config = {'enabled': True, 'fanout': fanout, 'delay': delay}
+        monitor.browser_pool = FakeAsyncPool(site)
+        monitor.browser_health = InstanceHealth('browser')
+        instances = [url.rsplit('/', 1)[0] for url in site]
+        started_at = time.monotonic()
+        result = asyncio.run(monitor._race_timeline_async(instances, 'elonmusk'))
+        return result, monitor, time.monotonic() - started_at
+
+    def test_first_loaded_page_wins_and_losers_are_closed(self):
+        (instance, page, remaining), monitor, _ = self.race({
+            'https://slow.test/elonmusk': (5, True),
+            'https://fast.test/elonmusk': (0.05, True),
+            'https://spare.test/elonmusk': (0, True),
+        }, delay=0.02, fanout=2)
+
+        self.assertEqual(instance, 'https://fast.test')
+        slow, fast = monitor.browser_pool.pages
+        self.assertIs(page, fast)
+        self.assertFalse(fast.closed)
+        # The slow load was cancelled, which closes its page
+        self.assertTrue(slow.closed)
+        self.assertEqual(remaining, ['https://spare.test'])
+
+    def test_failure_starts_next_instance_without_waiting(self):
+        (instance, page, _), monitor, elapsed = self.race({
+            'https://broken.test/elonmusk': (0, False),
+            'https://ok.test/elonmusk': (0, True),
+        }, delay=5)
+
+        self.assertEqual(instance, 'https://ok.test')
+        self.assertLess(elapsed, 1)
+        self.assertEqual(monitor.browser_health.stats['https://broken.test']['consecutive_failures'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import unittest
+from unittest import mock
+from src.browser_pool import BrowserPool
+
+SELECTORS = {'ready': '.timeline-item', 'error': '.error-panel'}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakePage:
+    """Page whose URL turns 'ready' or 'error' a fixed number of seconds after it was started."""
+
+    def __init__(self, clock, outcomes):
+        self.clock = clock
+        self.outcomes = outcomes  # {url: (state, seconds)}
+        self.url = None
+        self.started_at = None
+        self.closed = False
+        self.handlers = {}
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def evaluate(self, script, url):
+        self.url = url
+        self.started_at = self.clock.now
+
+    def query_selector(self, selector):
+        state, seconds = self.outcomes[self.url]
+        if self.clock.now - self.started_at >= seconds and SELECTORS[state] == selector:
+            return object()
+        return None
+
+    def wait_for_timeout(self, ms):
+        self.clock.now += ms / 1000
+
+    def close(self):
+        self.closed = True
+        self.handlers['close'](self)
+
+
+class FakeContext:
+    def __init__(self, clock, outcomes):
+        self.clock = clock
+        self.outcomes = outcomes
+        self.pages = []
+
+    def new_page(self):
+        page = FakePage(self.clock, self.outcomes)
+        self.pages.append(page)
+        return page
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+
+def fake_pool(outcomes, config=None):
+    clock = FakeClock()
+    pool = BrowserPool(config or {})
+    pool._browser = FakeBrowser()
+    pool._context = FakeContext(clock, outcomes)
+    return pool, clock
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url, frame_url='https://nitter.test/elonmusk', navigation=False):
+        self.resource_type = resource_type
+        self.url = url
+        self.frame = type('Frame', (), {'url': frame_url})()
+        self.navigation = navigation
+
+    def is_navigation_request(self):
+        return self.navigation
+
+
+class FakeRoute:
+    def __init__(self, request):
+        self.request = request
+        self.action = None
+
+    def abort(self):
+        self.action = 'abort'
+
+    def continue_(self):
+        self.action = 'continue'
+
+
+class TestRequestBlocking(unittest.TestCase):
+    def route(self, pool, *args, **kwargs):
+        route = FakeRoute(FakeRequest(*args, **kwargs))
+        pool._route_request(route)
+        return route.action
+
+    def test_non_essential_and_third_party_requests_aborted(self):
+        pool = BrowserPool()
+        for resource_type in ('image', 'font', 'media', 'stylesheet'):
+            self.assertEqual(self.route(pool, resource_type, 'https://nitter.test/pic/1.jpg'), 'abort', resource_type)
+        self.assertEqual(self.route(pool, 'script', 'https://ads.example/tag.js'), 'abort')
+        self.assertEqual(self.route(pool, 'script', 'https://nitter.test/js/app.js'), 'continue')
+        self.assertEqual(self.route(pool, 'xhr', 'https://nitter.test/api'), 'continue')
+        # Navigations to another mirror are never third-party
+        self.assertEqual(self.route(pool, 'document', 'https://other.test/elonmusk', navigation=True), 'continue')
+
+    def test_allowlist_and_third_party_are_configurable(self):
+        pool = BrowserPool({'resource_allowlist': ['document', 'script', 'image'], 'block_third_party': False})
+        self.assertEqual(self.route(pool, 'image', 'https://nitter.test/pic/1.jpg'), 'continue')
+        self.assertEqual(self.route(pool, 'script', 'https://cdn.example/lib.js'), 'continue')
+        self.assertEqual(self.route(pool, 'font', 'https://nitter.test/font.woff'), 'abort')
+
+
+class TestLoadConcurrently(unittest.TestCase):
+    def load(self, pool, clock, urls, **kwargs):
+        with mock.patch('src.browser_pool.time.monotonic', clock.monotonic):
+            loads = pool.load_concurrently(urls, '.timeline-item', error_selector='.error-panel', **kwargs)
+            try:
+                return next(loads)
+            finally:
+                loads.close()
+
+    def test_hedge_returns_first_ready_page_and_closes_losers(self):
+        pool, clock = fake_pool({'a': ('ready', 10), 'b': ('ready', 1), 'c': ('ready', 1)})
+        url, page, error = self.load(pool, clock, ['a', 'b', 'c'], hedge_delay=2, poll_interval_ms=100)
+
+        self.assertEqual((url, error), ('b', None))
+        # 'c' was due at 4s, but 'b' won at 3s
+        slow, winner = pool._context.pages
+        self.assertIs(page, winner)
+        self.assertGreaterEqual(winner.started_at, 2)
+        self.assertTrue(slow.closed)
+        self.assertEqual(pool._open_pages, {winner})
+
+    def test_failure_starts_next_url_without_waiting_for_hedge_delay(self):
+        pool, clock = fake_pool({'a': ('error', 0.5), 'b': ('ready', 1)})
+        with mock.patch('src.browser_pool.time.monotonic', clock.monotonic):
+            loads = pool.load_concurrently(['a', 'b'], '.timeline-item', error_selector='.error-panel',
+                                           hedge_delay=5, poll_interval_ms=100)
+            results = [(url, page is not None) for url, page, _ in loads]
+
+        self.assertEqual(results, [('a', False), ('b', True)])
+        failed, loaded = pool._context.pages
+        self.assertTrue(failed.closed)
+        self.assertLess(loaded.started_at, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
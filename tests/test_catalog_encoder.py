@@ -0,0 +1,67 @@
+import unittest
+from src.catalog_encoder import CatalogEncoder, encode_etfs, encode_names, estimate_tokens, etf_theme
+
+ETFS = [
+    {'code': '515030', 'name': '新能源车ETF'},
+    {'code': '159806', 'name': '新能源车ETF易方达'},
+    {'code': '516390', 'name': '华夏新能源车ETF'},
+    {'code': '512480', 'name': '半导体ETF'},
+]
+
+
+class MemoryCache:
+    """In-memory stand-in for CacheManager's get/clear_key."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key, fetch_func, cache_time_key, file_type='json'):
+        if key not in self.data:
+            self.data[key] = fetch_func()
+        return self.data[key]
+
+    def clear_key(self, key):
+        self.data.pop(key, None)
+
+
+class TestCatalogEncoder(unittest.TestCase):
+    def test_etf_theme_strips_fund_company(self):
+        self.assertEqual(etf_theme('新能源车ETF易方达'), '新能源车')
+        self.assertEqual(etf_theme('华夏新能源车ETF'), '新能源车')
+
+    def test_same_theme_shares_one_group(self):
+        encoding = encode_etfs(ETFS)
+        self.assertEqual(len(encoding['groups']), 2)
+        group = encoding['groups'][encoding['code_to_id']['159806']]
+        self.assertEqual(group['codes'][0], '515030')
+        self.assertEqual(group['label'], '新能源车ETF')
+
+    def test_lines_and_expansion(self):
+        encoder = CatalogEncoder({'sector_ids': True}, cache=MemoryCache())
+        lines = encoder.etf_lines(ETFS, ETFS)
+        self.assertEqual(len(lines), 2)
+        group_id = lines[1].split()[0]
+        self.assertEqual(encoder.expand_etfs(ETFS, [group_id.lower(), '512480']), ['515030', '512480'])
+        # Members are tried in order when the representative is not accepted
+        self.assertEqual(encoder.expand_etfs(ETFS, [group_id], accept=lambda code: code != '515030'), ['516390'])
+        self.assertEqual(encoder.expand_etfs(ETFS, [group_id, '512480'], accept=lambda code: False), ['512480'])
+
+        names = ['半导体', '5G概念', '人工智能']
+        entries = encoder.name_lines('concepts', names, ['半导体'])
+        self.assertEqual(entries, [f"{encode_names(names)['name_to_id']['半导体']}:半导体"])
+        self.assertEqual(encoder.expand_names('concepts', names, ['1', '2:人工智能', '5G概念']),
+                         ['5G概念', '人工智能', '5G概念'])
+
+    def test_encoding_rebuilt_when_catalog_changes(self):
+        encoder = CatalogEncoder(cache=MemoryCache())
+        first = encoder.etf_encoding(ETFS)
+        second = encoder.etf_encoding(ETFS + [{'code': '159995', 'name': '芯片ETF'}])
+        self.assertNotEqual(first['version'], second['version'])
+        self.assertEqual(len(second['groups']), 3)
+
+    def test_estimate_tokens(self):
+        self.assertGreater(estimate_tokens('515030 新能源车ETF'), estimate_tokens('E2 新能源车ETF'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from unittest import mock
+from src.catalog_resolver import CatalogResolver, ETFResolver, name_resolver, normalize_key
+
+
+class TestCatalogResolver(unittest.TestCase):
+    def setUp(self):
+        self.resolver = CatalogResolver({name: [name] for name in ['半导体', '新能源车', 'ChatGPT概念', '卫星导航']})
+
+    def test_normalize_key(self):
+        self.assertEqual(normalize_key('半导体概念'), '半导体')
+        self.assertEqual(normalize_key('ＣｈａｔＧＰＴ 概念'), 'chatgpt')
+        self.assertEqual(normalize_key('sh15030'), '015030')
+        self.assertEqual(normalize_key('512480.SH'), '512480')
+
+    def test_exact_normalized_and_fuzzy(self):
+        self.assertEqual(self.resolver.resolve('半导体'), '半导体')
+        self.assertEqual(self.resolver.resolve('半导体板块'), '半导体')
+        self.assertEqual(self.resolver.resolve('新能源汽车'), '新能源车')
+
+    def test_weak_matches_are_dropped(self):
+        self.assertIsNone(self.resolver.resolve('白酒'))
+        self.assertIsNone(self.resolver.resolve('卫星互联网'))
+        self.assertEqual(self.resolver.resolve_many('半导体'), [])
+
+    def test_resolve_many_dedups_and_limits(self):
+        self.assertEqual(self.resolver.resolve_many(['半导体', '半导体概念', '白酒', '新能源车', '卫星导航'], 2),
+                         ['半导体', '新能源车'])
+
+    def test_etf_codes_and_names(self):
+        resolver = ETFResolver([{'code': '512480', 'name': '半导体ETF'}, {'code': '159806', 'name': '新能源车ETF'}])
+        self.assertEqual(resolver.resolve_many(['sz159806', 512480, '新能源车ETF']), ['159806', '512480'])
+        self.assertEqual(resolver.items['512480']['name'], '半导体ETF')
+
+    def test_shared_resolver_rebuilt_on_change(self):
+        first = name_resolver('test', ['a1', 'b2'])
+        self.assertIs(name_resolver('test', ['a1', 'b2']), first)
+        self.assertIsNot(name_resolver('test', ['a1', 'c3']), first)
+
+    def test_same_catalog_list_skips_fingerprint(self):
+        names = ['a1', 'b2']
+        first = name_resolver('identity', names)
+        with mock.patch('src.catalog_resolver.fingerprint') as fingerprint:
+            self.assertIs(name_resolver('identity', names), first)
+            fingerprint.assert_not_called()
+        # Grown in place: the length check catches it and the resolver is rebuilt
+        names.append('c3')
+        self.assertEqual(name_resolver('identity', names).resolve('c3'), 'c3')
+
+
+if __name__ == '__main__':
+    unittest.main()
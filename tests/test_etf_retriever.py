@@ -0,0 +1,52 @@
+import unittest
+from src.etf_retriever import ETFRetriever
+
+ETF_LIST = [
+    {'code': '515030', 'name': '新能源车ETF'},
+    {'code': '159869', 'name': '游戏ETF'},
+    {'code': '512660', 'name': '军工ETF'},
+    {'code': '159206', 'name': '卫星ETF'},
+    {'code': '515070', 'name': '人工智能ETF'},
+    {'code': '518880', 'name': '黄金ETF'},
+    {'code': '512800', 'name': '银行ETF'},
+]
+
+
+class TestETFRetriever(unittest.TestCase):
+    def setUp(self):
+        self.retriever = ETFRetriever({'top_k': 2})
+
+    def test_synonyms_map_english_keywords_to_themes(self):
+        codes = [etf['code'] for etf in self.retriever.select('Tesla deliveries hit a new record', ETF_LIST)]
+        self.assertEqual(codes[0], '515030')
+
+        codes = [etf['code'] for etf in self.retriever.select('Starlink is now live in 100 countries', ETF_LIST)]
+        self.assertIn('159206', codes)
+
+    def test_whole_word_keywords_and_no_match(self):
+        # 'said' must not trigger the 'ai' synonym
+        self.assertEqual(self.retriever.expand('He said nothing'), [])
+        self.assertEqual(len(self.retriever.select('lol', ETF_LIST)), 2)
+
+    def test_weak_matches_are_padded_to_top_k(self):
+        retriever = ETFRetriever({'top_k': 4})
+        etfs = ETF_LIST + [{'code': '159806', 'name': '新能源车ETF易方达'}]
+        candidates = retriever.select('Interest rates are way too high now', etfs)
+        codes = [etf['code'] for etf in candidates]
+        self.assertEqual(len(codes), 4)
+        self.assertEqual(codes[0], '512800')
+        self.assertEqual(len(set(codes)), 4)
+        # Padding spreads over themes before repeating one
+        self.assertNotIn('159806', codes)
+
+    def test_index_rebuilt_only_when_list_changes(self):
+        self.retriever.ensure_index(ETF_LIST)
+        index = self.retriever._index
+        self.retriever.ensure_index(list(ETF_LIST))
+        self.assertIs(self.retriever._index, index)
+        self.retriever.ensure_index(ETF_LIST + [{'code': '588000', 'name': '科创50ETF'}])
+        self.assertIsNot(self.retriever._index, index)
+
+
+if __name__ == '__main__':
+    unittest.main()
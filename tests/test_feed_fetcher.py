@@ -0,0 +1,105 @@
+import unittest
+from unittest import mock
+from src.feed_fetcher import NOT_MODIFIED, FeedFetcher
+
+INSTANCE = 'https://nitter.example'
+
+RSS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>Elon Musk / @elonmusk</title>
+<item>
+  <title>R to @nasa: Congrats!</title>
+  <link>https://nitter.example/elonmusk/status/1003#m</link>
+  <description>&lt;p&gt;Congrats!&lt;br&gt;Next stop &amp;amp; beyond&lt;/p&gt;</description>
+  <pubDate>Mon, 12 Jan 2026 12:00:00 GMT</pubDate>
+</item>
+<item>
+  <title>RT by @elonmusk: Starship flight 12</title>
+  <link>https://nitter.example/SpaceX/status/1002#m</link>
+  <description>Starship flight 12</description>
+</item>
+<item>
+  <title>Tesla deliveries</title>
+  <link>https://nitter.example/elonmusk/status/1001#m</link>
+  <description>Tesla deliveries</description>
+</item>
+</channel></rss>'''
+
+INCOMPLETE_RSS = b'''<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel>
+<item><title>Tesla</title><link>https://nitter.example/elonmusk/status/1001#m</link></item>
+<item><title>No status link</title><link>https://nitter.example/elonmusk</link></item>
+</channel></rss>'''
+
+
+def response(status_code=200, content=b'', headers=None):
+    return mock.Mock(status_code=status_code, content=content, headers=headers or {})
+
+
+class TestFeedFetcher(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('src.feed_fetcher.requests.Session')
+        self.session = patcher.start().return_value
+        self.addCleanup(patcher.stop)
+        self.fetcher = FeedFetcher()
+
+    def sent_headers(self):
+        return self.session.get.call_args.kwargs['headers']
+
+    def test_entries_parsed(self):
+        self.session.get.return_value = response(content=RSS)
+        items = self.fetcher.fetch(INSTANCE)
+
+        self.session.get.assert_called_once()
+        self.assertEqual(self.session.get.call_args.args[0], f'{INSTANCE}/elonmusk/rss')
+        self.assertEqual([item['id'] for item in items], ['1003', '1002', '1001'])
+        self.assertEqual(items[0]['href'], '/elonmusk/status/1003#m')
+        self.assertEqual(items[0]['text'], 'Congrats!\nNext stop & beyond')
+        self.assertEqual(items[0]['date'], 'Mon, 12 Jan 2026 12:00:00 GMT')
+        self.assertEqual([item['is_reply'] for item in items], [True, False, False])
+        self.assertEqual([item['is_retweet'] for item in items], [False, True, False])
+        self.assertEqual(items[2]['date'], 'Unknown time')
+
+    def test_conditional_request_not_modified(self):
+        self.session.get.return_value = response(content=RSS, headers={
+            'ETag': '"v1"', 'Last-Modified': 'Mon, 12 Jan 2026 12:00:00 GMT'
+        })
+        self.assertEqual(len(self.fetcher.fetch(INSTANCE)), 3)
+        self.assertEqual(self.sent_headers(), {})
+
+        self.session.get.return_value = response(status_code=304)
+        self.assertIs(self.fetcher.fetch(INSTANCE), NOT_MODIFIED)
+        self.assertEqual(self.sent_headers(), {
+            'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 12 Jan 2026 12:00:00 GMT'
+        })
+
+    def test_unchanged_body_short_circuits(self):
+        # Mirrors that ignore conditional requests resend the same body with HTTP 200
+        self.session.get.return_value = response(content=RSS)
+        self.fetcher.fetch(INSTANCE)
+        with mock.patch('src.feed_fetcher.feedparser.parse') as parse:
+            self.assertIs(self.fetcher.fetch(INSTANCE), NOT_MODIFIED)
+            parse.assert_not_called()
+
+    def test_incomplete_feed_falls_back(self):
+        self.session.get.return_value = response(content=INCOMPLETE_RSS)
+        self.assertIsNone(self.fetcher.fetch(INSTANCE))
+
+        # A rejected feed leaves no validators behind, so the next poll is unconditional
+        self.session.get.return_value = response(content=RSS)
+        self.assertEqual(len(self.fetcher.fetch(INSTANCE)), 3)
+        self.assertEqual(self.sent_headers(), {})
+
+    def test_blocked_feed_falls_back(self):
+        self.session.get.return_value = response(content=b'<html><body>Verifying your browser</body></html>')
+        self.assertIsNone(self.fetcher.fetch(INSTANCE))
+        self.session.get.return_value = response(status_code=429)
+        self.assertIsNone(self.fetcher.fetch(INSTANCE))
+
+    def test_too_few_entries_is_incomplete(self):
+        fetcher = FeedFetcher({'min_entries': 5})
+        self.session.get.return_value = response(content=RSS)
+        self.assertIsNone(fetcher.fetch(INSTANCE))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import os
+import unittest
+from src.instance_health import InstanceHealth
+
+
+class TestInstanceHealth(unittest.TestCase):
+    def setUp(self):
+        self.health = InstanceHealth('unittest')
+
+    def tearDown(self):
+        if os.path.exists(self.health.path):
+            os.remove(self.health.path)
+
+    def test_fast_instance_ranked_first(self):
+        self.health.record_success('https://slow', 8.0)
+        self.health.record_success('https://fast', 0.5)
+        self.assertEqual(self.health.ranked(['https://slow', 'https://fast']), ['https://fast', 'https://slow'])
+
+    def test_failing_instance_quarantined_with_backoff(self):
+        self.health.record_failure('https://bad', 'timeout')
+        first = self.health.stats['https://bad']['quarantined_until']
+        self.health.record_failure('https://bad', 'timeout')
+        second = self.health.stats['https://bad']['quarantined_until']
+        self.assertTrue(self.health.is_quarantined('https://bad'))
+        self.assertGreater(second, first)
+        self.assertEqual(self.health.ranked(['https://bad', 'https://new']), ['https://new', 'https://bad'])
+
+    def test_quarantined_instances_skipped_or_last(self):
+        self.health.record_failure('https://bad', 'timeout')
+        self.health.record_failure('https://bad', 'timeout')
+        self.health.record_failure('https://worse', 'timeout')
+        instances = ['https://bad', 'https://worse']
+        # Every instance quarantined: the RSS tier gets none, the browser tier all by release time
+        self.assertEqual(self.health.ranked(instances, include_quarantined=False), [])
+        self.assertEqual(self.health.ranked(instances), ['https://worse', 'https://bad'])
+        self.assertEqual(self.health.ranked(instances + ['https://new'], include_quarantined=False), ['https://new'])
+
+    def test_success_clears_quarantine(self):
+        self.health.record_failure('https://flaky')
+        self.health.record_success('https://flaky', 1.0)
+        self.assertFalse(self.health.is_quarantined('https://flaky'))
+
+    def test_scores_persist(self):
+        self.health.record_success('https://fast', 0.5)
+        self.health.save()
+        reloaded = InstanceHealth('unittest')
+        self.assertEqual(reloaded.stats['https://fast']['successes'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
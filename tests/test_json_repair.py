@@ -0,0 +1,40 @@
+import json
+import unittest
+from src.json_repair import MemberScanner, decode_complete, loads
+
+
+class TestJsonRepair(unittest.TestCase):
+    def test_fenced_reply_with_trailing_commas(self):
+        self.assertEqual(loads('```json\n{"etf_codes": ["515030", "159806",],}\n```'),
+                         {'etf_codes': ['515030', '159806']})
+
+    def test_prose_around_object(self):
+        self.assertEqual(loads('好的，结果如下：{"sectors": ["汽车整车"]} 希望有帮助'), {'sectors': ['汽车整车']})
+
+    def test_truncated_reply_keeps_complete_members(self):
+        self.assertEqual(loads('{"summary": "特斯拉交付", "etf_'), {'summary': '特斯拉交付'})
+        self.assertEqual(loads('{"summary": "第一行\n第二行", "etf_codes": ["515030"'),
+                         {'summary': '第一行\n第二行', 'etf_codes': ['515030']})
+
+    def test_unparseable_reply_raises(self):
+        with self.assertRaises(json.JSONDecodeError) as ctx:
+            loads('无法回答')
+        self.assertEqual(ctx.exception.doc, '无法回答')
+
+    def test_decode_complete_waits_for_closing_brace(self):
+        self.assertIsNone(decode_complete('{"groups": ["金融"'))
+        self.assertEqual(decode_complete('{"groups": ["金融"]}\n```'), {'groups': ['金融']})
+
+    def test_member_scanner_decodes_members_as_they_end(self):
+        scanner = MemberScanner()
+        self.assertFalse(scanner.feed('```json\n{"summary": "a, \\"b\\"}", "n'))
+        self.assertEqual(scanner.members, {'summary': 'a, "b"}'})
+        scanner.feed('": 3, "codes": [["1"], {"x": 2}]')
+        self.assertEqual(scanner.members, {'summary': 'a, "b"}', 'n': 3, 'codes': [['1'], {'x': 2}]})
+        self.assertFalse(scanner.closed)
+        self.assertTrue(scanner.feed(', "ok": true}\n```'))
+        self.assertTrue(scanner.members['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from src.llm_cache import LLMResponseCache
+
+
+class TestLLMResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'llm_responses.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_key_ignores_links_case_and_whitespace(self):
+        a = LLMResponseCache.make_key('etfs', 'Tesla  is great https://t.co/abc', 'm', 1, ['x'])
+        b = LLMResponseCache.make_key('etfs', 'tesla is great', 'm', 1, ['x'])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, LLMResponseCache.make_key('etfs', 'tesla is great', 'm', 2, ['x']))
+        self.assertNotEqual(a, LLMResponseCache.make_key('etfs', 'tesla is great', 'm', 1, ['y']))
+
+    def test_link_only_tweets_do_not_share_a_key(self):
+        a = LLMResponseCache.make_key('etfs', 'https://t.co/abc', 'm', 1)
+        b = LLMResponseCache.make_key('etfs', 'https://t.co/xyz', 'm', 1)
+        self.assertNotEqual(a, b)
+        self.assertIsNone(LLMResponseCache.make_key('etfs', '  ', 'm', 1))
+
+    def test_lru_eviction_ttl_and_persistence(self):
+        cache = LLMResponseCache({'capacity': 2, 'ttl': 60}, path=self.path)
+        cache.put('a', {'v': 1})
+        cache.put('b', {'v': 2})
+        cache.get('a')
+        cache.put('c', {'v': 3})
+        self.assertIsNone(cache.get('b'))
+
+        reloaded = LLMResponseCache({'capacity': 2, 'ttl': 60}, path=self.path)
+        self.assertEqual(reloaded.get('a'), {'v': 1})
+
+        reloaded.entries['c']['created_at'] -= 120
+        self.assertIsNone(reloaded.get('c'))
+
+    def test_put_appends_to_journal_and_compacts(self):
+        cache = LLMResponseCache({'capacity': 3}, path=self.path)
+        cache.put('a', {'v': 1})
+        cache.put('b', {'v': 2})
+        self.assertFalse(os.path.exists(self.path))
+        with open(cache.journal_path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        for key in 'cde':
+            cache.put(key, {'v': key})
+        self.assertTrue(os.path.exists(self.path))
+        with open(cache.journal_path, encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 1)
+
+        reloaded = LLMResponseCache({'capacity': 3}, path=self.path)
+        self.assertEqual(list(reloaded.entries), ['c', 'd', 'e'])
+        self.assertEqual(reloaded.get('e'), {'v': 'e'})
+
+
+if __name__ == '__main__':
+    unittest.main()
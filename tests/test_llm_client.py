@@ -0,0 +1,85 @@
+import time
+import unittest
+from types import SimpleNamespace
+import httpx
+import openai
+from src.llm_client import CircuitBreaker, LLMClient
+
+CONFIG = {
+    'llm_config': {'api_key': 'primary-key', 'model': 'primary-model', 'max_retries': 2, 'retry_base_delay': 0},
+    'llm_config_fallback': {'api_key': 'fallback-key', 'model': 'fallback-model'},
+}
+
+
+def status_error(error_class, status_code):
+    response = httpx.Response(status_code, request=httpx.Request('POST', 'https://llm.example/v1/chat/completions'))
+    return error_class(f"HTTP {status_code}", response=response, body=None)
+
+
+class FakeEndpoint:
+    """Stands in for the OpenAI client of one endpoint: raises `error` or returns a reply."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        return SimpleNamespace(reply=kwargs['model'])
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self.assertFalse(breaker.record_failure())
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+
+    def test_half_open_allows_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+        for _ in range(3):
+            breaker.record_failure()
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+        self.assertEqual(breaker.state, 'open')
+
+
+class TestLLMClient(unittest.TestCase):
+    def client(self, primary_error):
+        client = LLMClient(CONFIG)
+        self.primary, self.fallback = FakeEndpoint(primary_error), FakeEndpoint()
+        client.endpoints[0].client, client.endpoints[1].client = self.primary, self.fallback
+        return client
+
+    def test_auth_error_fails_over(self):
+        client = self.client(status_error(openai.AuthenticationError, 401))
+        self.assertEqual(client.chat([]).reply, 'fallback-model')
+        # Not retried on the same endpoint, and counted against its breaker
+        self.assertEqual(len(self.primary.calls), 1)
+        self.assertEqual(len(self.fallback.calls), 1)
+        self.assertEqual(client.endpoints[0].breaker.failures, 1)
+
+    def test_bad_request_raised_without_failover(self):
+        client = self.client(status_error(openai.BadRequestError, 400))
+        with self.assertRaises(openai.BadRequestError):
+            client.chat([])
+        self.assertEqual(self.fallback.calls, [])
+        self.assertEqual(client.endpoints[0].breaker.failures, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
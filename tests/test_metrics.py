@@ -0,0 +1,53 @@
+import json
+import logging
+import os
+import tempfile
+import unittest
+from src import metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        metrics.reset()
+
+    def tearDown(self):
+        metrics.reset()
+
+    def test_histogram_quantiles(self):
+        for value in [0.2] * 90 + [8] * 10:
+            metrics.observe('llm_latency_seconds', value, method='etfs')
+        data = metrics.histogram('llm_latency_seconds', method='etfs')
+        self.assertEqual(data['count'], 100)
+        histogram = metrics.Histogram()
+        for value in [0.2] * 90 + [8] * 10:
+            histogram.observe(value)
+        self.assertLessEqual(histogram.quantile(0.5), 0.25)
+        self.assertGreater(histogram.quantile(0.95), 5)
+        self.assertIsNone(metrics.histogram('llm_latency_seconds', method='sectors'))
+
+    def test_prometheus_and_json_exports(self):
+        metrics.increment('llm_calls', 2)
+        metrics.observe('llm_ttft_seconds', 0.3, method='all')
+        metrics.record_call(method='all', parse='ok', latency_seconds=1.2)
+
+        text = metrics.to_prometheus()
+        self.assertIn('musk_monitor_llm_calls_total 2', text)
+        self.assertIn('musk_monitor_llm_ttft_seconds_bucket{method="all",le="0.5"} 1', text)
+        self.assertIn('musk_monitor_llm_ttft_seconds_bucket{method="all",le="+Inf"} 1', text)
+        self.assertIn('musk_monitor_llm_ttft_seconds_count{method="all"} 1', text)
+
+        exported = json.loads(json.dumps(metrics.to_json()))
+        self.assertEqual(exported['counters'], {'llm_calls': 2})
+        self.assertEqual(exported['calls'][0]['parse'], 'ok')
+
+    def test_periodic_summary_and_dump(self):
+        logger = logging.getLogger('test_metrics')
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertTrue(metrics.maybe_log_summary(logger, interval=0, directory=directory))
+            self.assertFalse(metrics.maybe_log_summary(logger, interval=3600, directory=directory))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'metrics.prom')))
+            self.assertTrue(os.path.exists(os.path.join(directory, 'metrics.json')))
+
+
+if __name__ == '__main__':
+    unittest.main()
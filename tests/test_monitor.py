@@ -0,0 +1,296 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from src.browser_pool import BrowserPool
+from src.nitter_parser import parse_timeline, timeline_hrefs
+from src.reply_cache import ReplyContextCache
+from src.monitor import TwitterMonitor
+
+INSTANCE = 'https://nitter.test'
+
+TIMELINE_HTML = '''
+<div class="timeline">
+  <div class="timeline-item"><a class="tweet-link" href="/elonmusk/status/1002#m"></a>
+    <div class="tweet-content">Starship flight</div></div>
+  <div class="timeline-item"><a class="tweet-link" href="/elonmusk/status/1001#m"></a>
+    <div class="tweet-content">Falcon launch</div></div>
+</div>'''
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+
+class FakePage:
+    """
+    Page on a fake site: {url: html} or {url: (html, seconds)}, where the page
+    only shows its HTML that many (fake) seconds after navigation started.
+    """
+
+    def __init__(self, site, clock):
+        self.site = site
+        self.clock = clock
+        self.url = None
+        self.started_at = 0.0
+        self.closed = False
+        self.handlers = {}
+        self.calls = []
+
+    def _html(self):
+        entry = self.site.get(self.url, '')
+        html, seconds = entry if isinstance(entry, tuple) else (entry, 0)
+        return html if self.clock.now - self.started_at >= seconds else ''
+
+    def on(self, event, handler):
+        self.handlers[event] = handler
+
+    def goto(self, url, **kwargs):
+        self.calls.append('goto')
+        self.url = url
+
+    def evaluate(self, script, *args):
+        self.calls.append('evaluate')
+        if 'window.location.href' in script:
+            self.url, self.started_at = args[0], self.clock.now
+            return None
+        # Stands in for TIMELINE_EXTRACT_JS running in the browser
+        return parse_timeline(self._html(), *args)
+
+    def eval_on_selector_all(self, selector, script):
+        self.calls.append('eval_on_selector_all')
+        return timeline_hrefs(self._html())
+
+    def query_selector(self, selector):
+        self.calls.append('query_selector')
+        return object() if f'class="{selector[1:]}' in self._html() else None
+
+    def query_selector_all(self, selector):
+        self.calls.append('query_selector_all')
+        return []
+
+    def wait_for_selector(self, selector, **kwargs):
+        if not self.query_selector(selector):
+            raise TimeoutError(f"{selector} not found on {self.url}")
+
+    def wait_for_timeout(self, ms):
+        self.clock.now += ms / 1000
+
+    def content(self):
+        self.calls.append('content')
+        return self._html()
+
+    def close(self):
+        self.closed = True
+        self.handlers['close'](self)
+
+
+class FakeContext:
+    def __init__(self, site, clock):
+        self.site = site
+        self.clock = clock
+        self.pages = []
+
+    def new_page(self):
+        page = FakePage(self.site, self.clock)
+        self.pages.append(page)
+        return page
+
+    def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+    def close(self):
+        self.connected = False
+
+
+class FakeBrowserPool(BrowserPool):
+    """BrowserPool whose launch opens a context on a fake site instead of Chromium."""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.site = {}
+        self.clock = FakeClock()
+        self.contexts = []
+
+    def _start(self):
+        self._browser = FakeBrowser()
+        self._context = FakeContext(self.site, self.clock)
+        self.contexts.append(self._context)
+        self._pages_served = 0
+
+    @property
+    def pages(self):
+        return [page for context in self.contexts for page in context.pages]
+
+
+class MonitorTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        data_dir = self.tmpdir.name
+        for target in ('src.tweet_store.DATA_DIR', 'src.instance_health.DATA_DIR'):
+            patcher = mock.patch(target, data_dir)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def monitor(self, site, **config):
+        config = {'nitter_instances': [INSTANCE], 'rss_fast_path': {'enabled': False},
+                  'browser_pool': {'max_memory_mb': 0}, **config}
+        with mock.patch('src.monitor.load_config', return_value=config), \
+                mock.patch('src.monitor.BrowserPool', FakeBrowserPool):
+            monitor = TwitterMonitor()
+        monitor.reply_cache = ReplyContextCache(path=os.path.join(self.tmpdir.name, 'reply_cache.json'))
+        monitor.browser_pool.site.update(site)
+        return monitor
+
+
+class TestBrowserReuse(MonitorTestCase):
+    def test_polls_share_one_browser_and_recycle_between_polls(self):
+        monitor = self.monitor({f'{INSTANCE}/elonmusk': TIMELINE_HTML}, browser_pool={'max_pages': 2, 'max_memory_mb': 0})
+        pool = monitor.browser_pool
+        with mock.patch.object(pool, 'maybe_recycle', wraps=pool.maybe_recycle) as maybe_recycle:
+            for _ in range(3):
+                monitor.fetch_tweets()
+
+        self.assertEqual(maybe_recycle.call_count, 3)
+        # Two polls on the first browser, then it hit max_pages and was replaced before the third
+        self.assertEqual([len(context.pages) for context in pool.contexts], [2, 1])
+        self.assertTrue(all(page.closed for page in pool.pages))
+        self.assertEqual(pool._open_pages, set())
+
+    def test_recycle_waits_for_open_pages(self):
+        pool = FakeBrowserPool({'max_pages': 1, 'max_memory_mb': 0})
+        page = pool.new_page()
+        self.assertFalse(pool.maybe_recycle())
+        page.close()
+        self.assertTrue(pool.maybe_recycle())
+        pool.new_page()
+        self.assertEqual(len(pool.contexts), 2)
+
+
+class TestTimelineExtraction(MonitorTestCase):
+    def poll(self, mode):
+        monitor = self.monitor({f'{INSTANCE}/elonmusk': TIMELINE_HTML}, timeline_extraction=mode)
+        account = monitor._account(None)
+        account.is_first_run = False
+        tweets = monitor.fetch_tweets()
+        page, = monitor.browser_pool.pages
+        return tweets, page.calls
+
+    def test_evaluate_mode_reads_timeline_in_one_round_trip(self):
+        tweets, calls = self.poll('evaluate')
+        self.assertEqual([t['id'] for t in tweets], ['1002', '1001'])
+        self.assertEqual(tweets[0]['text'], 'Starship flight')
+        self.assertEqual(calls.count('evaluate'), 1)
+        self.assertNotIn('query_selector_all', calls)
+        self.assertNotIn('content', calls)
+
+    def test_html_mode_parses_captured_content(self):
+        tweets, calls = self.poll('html')
+        self.assertEqual([t['id'] for t in tweets], ['1002', '1001'])
+        self.assertEqual(calls.count('content'), 1)
+        self.assertNotIn('evaluate', calls)
+
+
+class TestHedgedFetch(MonitorTestCase):
+    INSTANCES = ['https://slow.test', 'https://fast.test', 'https://spare.test']
+
+    def hedged_poll(self, site):
+        monitor = self.monitor(site, nitter_instances=self.INSTANCES,
+                               hedged_fetch={'enabled': True, 'delay': 2, 'fanout': 3})
+        monitor._account(None).is_first_run = False
+        pool = monitor.browser_pool
+        with mock.patch('src.browser_pool.time.monotonic', pool.clock.monotonic):
+            tweets = monitor.fetch_tweets()
+        return tweets, {page.url: page for page in pool.pages}, monitor
+
+    def test_first_timeline_wins_and_losers_are_closed(self):
+        tweets, pages, monitor = self.hedged_poll({
+            'https://slow.test/elonmusk': (TIMELINE_HTML, 10),
+            'https://fast.test/elonmusk': (TIMELINE_HTML, 1),
+            'https://spare.test/elonmusk': TIMELINE_HTML,
+        })
+        self.assertEqual({t['link'].split('/status')[0] for t in tweets}, {'https://fast.test/elonmusk'})
+        # The spare was due 2s after the fast mirror started, which had already won
+        self.assertEqual(set(pages), {'https://slow.test/elonmusk', 'https://fast.test/elonmusk'})
+        self.assertTrue(all(page.closed for page in pages.values()))
+        self.assertEqual(monitor.browser_pool._open_pages, set())
+        self.assertEqual(monitor.browser_health.stats['https://fast.test']['successes'], 1)
+        self.assertNotIn('https://slow.test', monitor.browser_health.stats)
+
+    def test_empty_timeline_falls_through_to_next_page(self):
+        empty = '<div class="timeline-item show-more"><a href="?cursor=a">Load more</a></div>'
+        tweets, pages, _ = self.hedged_poll({
+            'https://slow.test/elonmusk': (TIMELINE_HTML, 3),
+            'https://fast.test/elonmusk': (empty, 0),
+            'https://spare.test/elonmusk': (TIMELINE_HTML, 10),
+        })
+        self.assertEqual({t['link'].split('/status')[0] for t in tweets}, {'https://slow.test/elonmusk'})
+        self.assertTrue(all(page.closed for page in pages.values()))
+
+
+def reply_item(tweet_id):
+    return (f'<div class="timeline-item"><a class="tweet-link" href="/elonmusk/status/{tweet_id}#m"></a>'
+            f'<div class="replying-to">Replying to @spacex</div><div class="tweet-content">reply {tweet_id}</div></div>')
+
+
+REPLIES_HTML = '<div class="timeline">' + ''.join(reply_item(i) for i in (203, 202, 201)) + '</div>'
+
+DETAIL_HTML = '''
+<div class="conversation">
+  <div class="before-tweet thread-line">
+    <div class="timeline-item"><a class="tweet-link" href="/spacex/status/100#m"></a><div class="tweet-content">Launch today</div></div>
+  </div>
+  <div class="main-thread"><div class="main-tweet"><div class="tweet-content">reply 203</div></div></div>
+</div>'''
+
+PARENT_HTML = '''
+<div class="conversation">
+  <div class="main-thread"><div class="main-tweet"><div class="tweet-content">Launch today</div></div></div>
+  <div class="replies">''' + ''.join(
+    f'<div class="reply thread thread-line">{reply_item(i)}</div>' for i in (203, 202, 201)
+) + '''</div>
+</div>'''
+
+
+class TestReplyContexts(MonitorTestCase):
+    def test_sibling_replies_resolve_from_one_parent_page(self):
+        monitor = self.monitor({
+            f'{INSTANCE}/elonmusk': REPLIES_HTML,
+            f'{INSTANCE}/elonmusk/status/203#m': DETAIL_HTML,
+            f'{INSTANCE}/i/status/100': PARENT_HTML,
+        })
+        monitor._account(None).is_first_run = False
+        pool = monitor.browser_pool
+        with mock.patch('src.browser_pool.time.monotonic', pool.clock.monotonic):
+            tweets = monitor.fetch_tweets()
+
+        self.assertEqual([page.url for page in pool.pages], [
+            f'{INSTANCE}/elonmusk', f'{INSTANCE}/elonmusk/status/203#m', f'{INSTANCE}/i/status/100'
+        ])
+        self.assertEqual([t['id'] for t in tweets], ['203', '202', '201'])
+        for tweet in tweets:
+            self.assertTrue(tweet['text'].startswith('Context (Parent Tweet): Launch today'), tweet['text'])
+
+        # A later reply in the same thread needs no detail page at all
+        self.assertEqual(monitor._resolve_reply_contexts([('202', f'{INSTANCE}/elonmusk/status/202#m')]),
+                         {'202': 'Launch today'})
+        self.assertEqual(len(pool.pages), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+from src.nitter_parser import parse_html, parse_reply_context, parse_reply_threads, parse_timeline, timeline_hrefs
+
+TIMELINE_HTML = '''
+<div class="timeline">
+  <div class="timeline-item ">
+    <a class="tweet-link" href="/elonmusk/status/1002#m"></a>
+    <div class="retweet-header">retweeted</div>
+    <span class="tweet-date"><a href="#" title="Jan 12, 2026 · 12:00 PM UTC">1h</a></span>
+    <div class="tweet-content media-body">First line<br>second &amp; <a href="/x">@x</a></div>
+  </div>
+  <div class="timeline-item">
+    <a class="tweet-link" href="/elonmusk/status/1001#m"></a>
+    <div class="replying-to">Replying to @x</div>
+    <div class="tweet-content media-body">A reply</div>
+  </div>
+  <div class="timeline-item show-more"><a href="?cursor=abc">Load more</a></div>
+</div>
+'''
+
+
+class TestNitterParser(unittest.TestCase):
+    def test_parse_timeline(self):
+        items = parse_timeline(TIMELINE_HTML)
+        self.assertEqual([item['id'] for item in items], ['1002', '1001'])
+        self.assertEqual(items[0]['text'], 'First line\nsecond & @x')
+        self.assertEqual(items[0]['date'], 'Jan 12, 2026 · 12:00 PM UTC')
+        self.assertTrue(items[0]['is_retweet'])
+        self.assertTrue(items[1]['is_reply'])
+        self.assertEqual(items[1]['date'], 'Unknown time')
+        self.assertEqual(timeline_hrefs(TIMELINE_HTML), ['/elonmusk/status/1002#m', '/elonmusk/status/1001#m'])
+
+    def test_timeline_hrefs_scan_matches_parse(self):
+        html = TIMELINE_HTML.replace('<a class="tweet-link" href="/elonmusk/status/1001#m">',
+                                     '<a href="/elonmusk/status/1001?a=1&amp;b=2#m" class="tweet-link pinned">')
+        self.assertEqual(timeline_hrefs(html), timeline_hrefs(parse_html(html)))
+        self.assertEqual(timeline_hrefs(html.encode('utf-8'), limit=1), ['/elonmusk/status/1002#m'])
+
+    def test_parse_reply_context(self):
+        threaded = '''
+        <div class="conversation">
+          <div class="before-tweet thread-line">
+            <div class="timeline-item"><a class="tweet-link" href="/a/status/1#m"></a><div class="tweet-content">root</div></div>
+            <div class="timeline-item"><a class="tweet-link" href="/b/status/2#m"></a><div class="tweet-content">parent</div></div>
+          </div>
+          <div class="main-thread"><div class="main-tweet"></div></div>
+        </div>'''
+        self.assertEqual(parse_reply_context(threaded), [{'id': '1', 'text': 'root'}, {'id': '2', 'text': 'parent'}])
+
+        siblings = '''<div><div class="timeline-item"><a class="tweet-link" href="/a/status/1#m"></a>
+            <div class="tweet-content">parent</div></div><div class="main-tweet"></div></div>'''
+        self.assertEqual(parse_reply_context(siblings), [{'id': '1', 'text': 'parent'}])
+        self.assertIsNone(parse_reply_context('<div class="timeline"></div>'))
+
+    def test_parse_reply_threads(self):
+        html = '''
+        <div class="conversation">
+          <div class="main-thread">
+            <div class="main-tweet"><div class="tweet-content">main</div></div>
+            <div class="after-tweet thread-line">
+              <div class="timeline-item"><a class="tweet-link" href="/a/status/6#m"></a><div class="tweet-content">more</div></div>
+            </div>
+          </div>
+          <div class="replies">
+            <div class="reply thread thread-line">
+              <div class="timeline-item"><a class="tweet-link" href="/b/status/7#m"></a><div class="tweet-content">reply</div></div>
+            </div>
+          </div>
+        </div>'''
+        main = {'id': '5', 'text': 'main'}
+        self.assertEqual(parse_reply_threads(html, '5'), [
+            [main, {'id': '6', 'text': 'more'}],
+            [main, {'id': '7', 'text': 'reply'}],
+        ])
+        self.assertEqual(parse_reply_threads('<div class="timeline"></div>', '5'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
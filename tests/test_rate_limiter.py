@@ -0,0 +1,29 @@
+import time
+import unittest
+from src.rate_limiter import RateLimiter, TokenBucket
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_bucket_waits_for_refill(self):
+        bucket = TokenBucket(rate_per_minute=600, capacity=2)  # 10 per second
+        bucket.acquire()
+        bucket.acquire()
+        started = time.monotonic()
+        bucket.acquire()
+        self.assertGreaterEqual(time.monotonic() - started, 0.05)
+
+    def test_settle_charges_actual_usage(self):
+        limiter = RateLimiter(tokens_per_minute=1000)
+        limiter.acquire(estimated_tokens=100)
+        limiter.settle(estimated_tokens=100, actual_tokens=400)
+        self.assertAlmostEqual(limiter.tokens.level, 600, delta=5)
+
+    def test_zero_limits_disable_buckets(self):
+        limiter = RateLimiter()
+        self.assertIsNone(limiter.requests)
+        self.assertIsNone(limiter.tokens)
+        limiter.acquire(10 ** 6)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+from src.relevance_gate import NaiveBayesModel, RelevanceGate
+
+
+class TestRelevanceGate(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'gate_log.jsonl')
+        self.gate = RelevanceGate({'model': False}, path=self.path)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_chatter_is_skipped(self):
+        for text in ['true', '!!', '🔥🔥 https://t.co/abc', '@someone Exactly']:
+            self.assertFalse(self.gate.decide(text)['relevant'], text)
+
+    def test_market_topics_pass(self):
+        for text in ['Starship launch next week', '$TSLA', 'Grok 5 training has started', '特斯拉交付创新高',
+                     'X.com is the everything app']:
+            self.assertTrue(self.gate.decide(text)['relevant'], text)
+        # A link to x.com is not a mention of it
+        self.assertIn('no keywords', self.gate.decide('lol check this https://x.com/i/status/1 wow')['reasons'][0])
+
+    def test_log_labels_train_model(self):
+        for i in range(3):
+            relevant = {'id': f'r{i}', 'author': 'elonmusk', 'text': 'rocket factory output'}
+            chatter = {'id': f'c{i}', 'author': 'elonmusk', 'text': 'so funny lol'}
+            self.gate.log(relevant, self.gate.decide(relevant['text']))
+            self.gate.log(chatter, self.gate.decide(chatter['text']))
+            self.gate.log_outcome(relevant, True)
+            self.gate.log_outcome(chatter, False)
+        # A decision whose analysis never finished is logged but not labelled
+        self.gate.log({'id': 'x', 'text': 'rocket'}, self.gate.decide('rocket'))
+        with open(self.path, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 13)
+        self.assertEqual(entries[0]['event'], 'decision')
+        self.assertIn('latency_ms', entries[0])
+        self.assertEqual(entries[2], {**entries[2], 'event': 'outcome', 'id': 'r0', 'relevant': True})
+
+        trained = RelevanceGate({'min_samples': 3}, path=self.path)
+        self.assertIsNotNone(trained.model)
+        self.assertGreater(trained.model.probability('factory'), 0.5)
+        self.assertLess(trained.model.probability('lol'), 0.5)
+
+    def test_model_not_trained_without_enough_samples(self):
+        self.assertIsNone(RelevanceGate({'min_samples': 1}, path=self.path).model)
+
+    def test_naive_bayes_prior(self):
+        model = NaiveBayesModel([('a', True), ('b', False), ('c', False)])
+        self.assertLess(model.probability('unseen'), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from src.nitter_parser import parse_reply_threads
+from src.reply_cache import ReplyContextCache
+
+
+class TestReplyContextCache(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        os.remove(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_ancestors_resolve_replies_higher_up(self):
+        cache = ReplyContextCache(path=self.path)
+        cache.add_thread('4', [{'id': '1', 'text': 'root'}, {'id': '2', 'text': 'middle'}, {'id': '3', 'text': 'parent'}])
+        self.assertEqual(cache.get_parent_text('4'), 'parent')
+        # Older replies in the same thread resolve without their own page
+        self.assertEqual(cache.get_parent_text('3'), 'middle')
+        self.assertEqual(cache.get_parent_text('2'), 'root')
+        self.assertIsNone(cache.get_parent_text('1'))
+        self.assertEqual(cache.get_parent_id('4'), '3')
+
+    def test_sibling_replies_resolve_from_parent_page(self):
+        html = '''
+        <div class="conversation">
+          <div class="main-thread"><div class="main-tweet"><div class="tweet-content">parent</div></div></div>
+          <div class="replies">
+            <div class="reply thread thread-line">
+              <div class="timeline-item"><a class="tweet-link" href="/elonmusk/status/11#m"></a><div class="tweet-content">first</div></div>
+              <div class="timeline-item"><a class="tweet-link" href="/x/status/12#m"></a><div class="tweet-content">answer</div></div>
+            </div>
+            <div class="reply thread thread-line">
+              <div class="timeline-item"><a class="tweet-link" href="/elonmusk/status/13#m"></a><div class="tweet-content">second</div></div>
+            </div>
+          </div>
+        </div>'''
+        cache = ReplyContextCache(path=self.path)
+        cache.add_replies(parse_reply_threads(html, '10'))
+        self.assertEqual(cache.get_parent_text('11'), 'parent')
+        self.assertEqual(cache.get_parent_text('13'), 'parent')
+        self.assertEqual(cache.get_parent_text('12'), 'first')
+
+    def test_least_recently_used_entries_evicted(self):
+        cache = ReplyContextCache(capacity=2, path=self.path)
+        cache.add_thread('r1', [{'id': 'p1', 'text': 'one'}])
+        cache.add_thread('r2', [{'id': 'p2', 'text': 'two'}])
+        self.assertEqual(cache.get_parent_text('r1'), 'one')
+        cache.add_thread('r3', [{'id': 'p3', 'text': 'three'}])
+        self.assertEqual(cache.get_parent_text('r1'), 'one')
+        self.assertIsNone(cache.get_parent_text('r2'))
+        self.assertEqual(len(cache.parents), 2)
+        self.assertEqual(len(cache.replies), 2)
+
+    def test_entries_persist(self):
+        cache = ReplyContextCache(path=self.path)
+        cache.add_thread('r1', [{'id': 'p1', 'text': 'one'}])
+        cache.save()
+        reloaded = ReplyContextCache(path=self.path)
+        self.assertEqual(reloaded.get_parent_text('r1'), 'one')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+from datetime import datetime, timezone
+from src.scheduler import AdaptiveScheduler
+
+# Saturday 2026-01-17 12:00 Beijing time, outside any weekday hot window
+QUIET_TIME = datetime(2026, 1, 17, 4, 0, tzinfo=timezone.utc)
+# Monday 2026-01-19 10:00 Beijing time, inside the default 09:00-15:00 window
+HOT_TIME = datetime(2026, 1, 19, 2, 0, tzinfo=timezone.utc)
+
+
+class TestAdaptiveScheduler(unittest.TestCase):
+    def setUp(self):
+        self.scheduler = AdaptiveScheduler({'jitter': 0, 'min_interval': 30, 'max_interval': 600}, 300)
+
+    def test_backs_off_while_quiet(self):
+        delays = [self.scheduler.next_delay(0, QUIET_TIME) for _ in range(5)]
+        self.assertEqual(delays[0], 450)
+        self.assertEqual(delays[-1], 600)
+
+    def test_tightens_after_new_tweets(self):
+        self.scheduler.next_delay(0, QUIET_TIME)
+        self.assertEqual(self.scheduler.next_delay(2, QUIET_TIME), 30)
+
+    def test_hot_window_caps_interval(self):
+        self.assertTrue(self.scheduler.in_hot_window(HOT_TIME))
+        self.assertFalse(self.scheduler.in_hot_window(QUIET_TIME))
+        self.assertEqual(self.scheduler.next_delay(0, HOT_TIME), 60)
+
+    def test_jitter_stays_in_bounds(self):
+        scheduler = AdaptiveScheduler({'jitter': 0.2}, 100)
+        for _ in range(50):
+            delay = scheduler.next_delay(1, QUIET_TIME)
+            self.assertTrue(24 <= delay <= 36)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,28 @@
+import unittest
+from src.sector_groups import SectorGroups, build_groups
+
+
+class TestSectorGroups(unittest.TestCase):
+    def test_every_name_is_reachable(self):
+        sectors = ['汽车整车', '银行', '某冷门行业']
+        concepts = ['人形机器人', '商业航天', '卫星互联网', '冷门概念A', '冷门概念B', '冷门概念C']
+        groups = build_groups(sectors, concepts, other_chunk_size=2)
+
+        self.assertIn('汽车整车', groups['新能源汽车']['sectors'])
+        self.assertIn('卫星互联网', groups['航天军工']['concepts'])
+        # Unmatched names are split into bounded '其他' groups
+        self.assertEqual(sum(1 for g in groups if g.startswith('其他')), 2)
+
+        reached_sectors, reached_concepts = SectorGroups.members(groups, list(groups))
+        self.assertEqual(set(reached_sectors), set(sectors))
+        self.assertEqual(set(reached_concepts), set(concepts))
+
+    def test_members_of_chosen_groups_only(self):
+        groups = build_groups(['银行'], ['人形机器人', '商业航天'])
+        sectors, concepts = SectorGroups.members(groups, ['航天军工', '不存在的分组'])
+        self.assertEqual(sectors, [])
+        self.assertEqual(concepts, ['商业航天'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import os
+import unittest
+from src.tweet_store import TweetStore
+
+
+def make_id(seconds_after_epoch):
+    """Build a snowflake ID for a timestamp relative to the snowflake epoch."""
+    return str((seconds_after_epoch * 1000) << 22)
+
+
+class TestTweetStore(unittest.TestCase):
+    def setUp(self):
+        self.store = TweetStore(name='unittest_tweets', capacity=3, watermark_slack=60)
+
+    def tearDown(self):
+        for path in (self.store.snapshot_path, self.store.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_eviction_keeps_newest_ids_numerically(self):
+        # '999' sorts after '1000' as a string but is the oldest ID
+        for tweet_id in ['999', '1000', '1001', '1002']:
+            self.store.add(tweet_id)
+        self.assertNotIn('999', self.store)
+        self.assertIn('1002', self.store)
+        self.assertEqual(self.store.watermark, 1002)
+
+    def test_watermark_skips_old_ids_but_not_retweets(self):
+        self.store.add(make_id(100000))
+        old_id = make_id(100000 - 3600)
+        self.assertTrue(self.store.is_processed(old_id))
+        self.assertFalse(self.store.is_processed(old_id, is_retweet=True))
+        # Inside the slack window only the set decides
+        self.assertFalse(self.store.is_processed(make_id(100000 - 30)))
+
+    def test_journal_replay_and_compaction(self):
+        for tweet_id in ['1', '2', '3']:
+            self.store.add(tweet_id)
+        self.store.flush()
+        reloaded = TweetStore(name='unittest_tweets', capacity=3)
+        self.assertIn('2', reloaded)
+
+        self.store.add('4')
+        self.store.flush()  # journal now exceeds capacity and is compacted
+        self.assertEqual(os.path.getsize(self.store.journal_path), 0)
+        reloaded = TweetStore(name='unittest_tweets', capacity=3)
+        self.assertEqual(sorted(int(i) for i in ['2', '3', '4']), sorted(reloaded._heap))
+        self.assertEqual(reloaded.watermark, 4)
+
+    def test_legacy_list_snapshot(self):
+        with open(self.store.snapshot_path, 'w', encoding='utf-8') as f:
+            f.write('["10", "9"]')
+        reloaded = TweetStore(name='unittest_tweets', capacity=3)
+        self.assertIn('9', reloaded)
+        self.assertEqual(reloaded.watermark, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()